@@ -3,37 +3,75 @@ TOKO ANAK BANGSA - Flask API
 Main application entry point
 """
 import os
+import startup  # First import: starts the startup report clock
+from startup import ensure_firebase, report
 from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Firebase Admin SDK
-try:
-    # Try to initialize with service account file
-    service_account_path = os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH')
-    if service_account_path and os.path.exists(service_account_path):
-        cred = credentials.Certificate(service_account_path)
-        firebase_admin.initialize_app(cred)
-        print("✅ Firebase Admin SDK initialized with service account")
-    else:
-        # Fallback: Initialize with default credentials (for deployment)
-        firebase_admin.initialize_app()
-        print("✅ Firebase Admin SDK initialized with default credentials")
-except ValueError as e:
-    # App already initialized
-    print("ℹ️  Firebase Admin SDK already initialized")
-except Exception as e:
-    print(f"⚠️  Firebase initialization error: {e}")
-    print("   Some features may not work without Firebase configuration")
+
+def start_background_services():
+    """Start per-process background work (runs in each worker)"""
+    # Lazy startup: build Firebase app, storage and service singletons off the request path,
+    # then open the Firestore channel and prime signing keys and role caches
+    if startup.is_lazy() or os.getenv('WARMUP_ON_START', 'false').lower() == 'true':
+        from services.warmup import run_warmup
+        startup.start_background_warmup(extra=lambda: run_warmup(report=report))
+
+    # Stack capture of requests running past SLOW_REQUEST_THRESHOLD_MS
+    from observability.watchdog import watchdog
+    watchdog.start()
+
+    # Background revocation of expired tenant memberships
+    if os.getenv('MEMBERSHIP_SWEEPER_ENABLED', 'false').lower() == 'true':
+        from services.role_service import get_role_service
+        get_role_service().start_membership_sweeper()
+
+
+def reinitialize_after_fork():
+    """
+    Re-create Firebase app, Firestore clients and service singletons in a forked worker
+
+    gRPC channels, watch streams and threads created before fork() (gunicorn
+    preload_app) are not usable in the child, so everything is rebuilt here.
+    """
+    from services import reset_services
+    from storage import set_async_storage, set_storage
+
+    startup.reset_firebase()
+
+    set_storage(None)
+    set_async_storage(None)
+    reset_services()
+
+    if not startup.is_lazy():
+        ensure_firebase()
+    start_background_services()
+
+
+# Initialize Firebase Admin SDK (deferred to first use / background warmup in lazy mode)
+if not startup.is_lazy():
+    ensure_firebase()
 
 # Initialize Flask app
 app = Flask(__name__)
 
+# Request metrics (first before_request hook, so rate-limited requests are counted)
+from observability.http import instrument_app
+instrument_app(app)
+
+# Request spans with W3C traceparent propagation (TRACE_EXPORTER, off by default);
+# its before_request hook is inserted first, so spans cover the whole request
+from observability.tracing import Tracing
+Tracing(app)
+
+# orjson-based JSON encoding (Firestore types, pydantic models)
+from json_provider import OrjsonProvider
+app.json = OrjsonProvider(app)
+
 # Load Flask config from environment
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-this')
 app.config['DEBUG'] = os.getenv('FLASK_ENV') == 'development'
@@ -48,16 +86,42 @@ CORS(app, resources={
     }
 })
 
-# Initialize rate limiter
+# Response compression (gzip/brotli)
+from middleware.compression import Compression
+Compression(app)
+
+# Per-request storage accounting: Server-Timing, N+1 findings, read budgets
+# (registered after Compression so its after_request runs first)
+from observability.storage import StorageAccounting
+StorageAccounting(app)
+
+# On-demand sampling profiler for requests flagged with a signed/super_admin X-Profile header
+from observability.profiler import RequestProfiler
+RequestProfiler(app)
+
+# In-flight request tracking for the slow-request watchdog (started in start_background_services)
+from observability.watchdog import watchdog
+watchdog.init_app(app)
+
+# Initialize rate limiter (RATELIMIT_ENABLED=false turns it off, e.g. for load tests)
 from extensions import limiter
+app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', 'true').lower() != 'false'
 limiter.init_app(app)
 
 # Register blueprints
 from routes.auth import auth_bp
 from routes.roles import roles_bp
+from routes.ops import ops_bp
 
 app.register_blueprint(auth_bp)
 app.register_blueprint(roles_bp)
+app.register_blueprint(ops_bp)
+
+report.mark_ready()
+
+# Background work starts per worker when preloaded by gunicorn (see gunicorn.conf.py)
+if os.getenv('GUNICORN_PRELOAD', 'false').lower() != 'true':
+    start_background_services()
 
 # Error handlers
 @app.errorhandler(404)
@@ -88,7 +152,7 @@ def health_check():
     return jsonify({
         "status": "ok",
         "service": "TOKO ANAK BANGSA API",
-        "firebase": "initialized" if firebase_admin._apps else "not initialized"
+        "firebase": "initialized" if startup.firebase_initialized() else "not initialized"
     })
 
 # Example API endpoint
@@ -0,0 +1,246 @@
+"""
+TOKO ANAK BANGSA - ASGI entry point (async execution mode)
+Serves the hot read endpoints with async handlers (Quart) on top of the async
+services, and every other route through the existing Flask app.
+
+Async routes get request metrics, tracing spans, CORS headers and compression.
+Storage accounting (Server-Timing, read budgets), the slow-request watchdog and
+the X-Profile profiler are thread-based and only cover the Flask routes.
+
+Run:
+    pip install -r requirements.txt -r requirements-async.txt
+    uvicorn asgi:application --host 0.0.0.0 --port 8080
+"""
+import os
+import time
+from datetime import timedelta
+
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, g, jsonify, request
+from quart_rate_limiter import RateLimit, RateLimiter, rate_limit
+from werkzeug.exceptions import HTTPException
+
+# Importing the Flask app initializes Firebase and loads the environment
+from app import app as flask_app
+from middleware.async_auth import require_auth, require_role_level
+from middleware.compression import Compression, compress
+from observability.http import IN_FLIGHT, record_request, route_labels
+from observability.tracing import Tracing, tracing_enabled
+from routes.common import error_body, paginate, paginated_body, page_params, require_tenant_id, role_list_filters
+from services.async_auth_service import get_async_auth_service
+from services.async_role_service import get_async_role_service
+
+# Initialize Quart app (async routes only)
+async_app = Quart(__name__)
+async_app.config['SECRET_KEY'] = flask_app.config['SECRET_KEY']
+
+# Same default limits as extensions.limiter (per instance, in memory)
+RateLimiter(async_app, default_limits=[
+    RateLimit(200, timedelta(hours=1)),
+    RateLimit(50, timedelta(minutes=1)),
+])
+
+# Request metrics (same series as the Flask routes; registered first to run first)
+async def start_request_timer():
+    g.metrics_start = time.perf_counter()
+    IN_FLIGHT.inc((route_labels(request)[0],))
+
+
+async_app.before_request_funcs.setdefault(None, []).insert(0, start_request_timer)
+
+
+@async_app.after_request
+async def record_request_metrics(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        blueprint, route = route_labels(request)
+        IN_FLIGHT.dec((blueprint,))
+        record_request(blueprint, route, request.method, response.status_code, time.perf_counter() - start)
+    return response
+
+
+# Request spans (same server span as the Flask hooks; on when app.py set an exporter).
+# Inserted before the metrics timer, so spans cover the whole request
+tracing = Tracing()
+
+if tracing_enabled():
+    async def start_trace():
+        g._trace_span = tracing.start_server_span(request)
+
+    async_app.before_request_funcs.setdefault(None, []).insert(0, start_trace)
+
+    @async_app.after_request
+    async def add_traceresponse(response):
+        server_span = g.get('_trace_span')
+        if server_span is not None:
+            tracing.finish_response(server_span, response)
+        return response
+
+    @async_app.teardown_request
+    async def end_trace(exc):
+        server_span = g.pop('_trace_span', None)
+        if server_span is not None:
+            tracing.end_server_span(server_span, request, exc)
+
+
+# CORS: preflight requests go to Flask (flask-cors); add the response headers here
+cors_origins = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
+
+
+@async_app.after_request
+async def add_cors_headers(response):
+    origin = request.headers.get('Origin')
+    if origin and origin in cors_origins:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.vary.add('Origin')
+    return response
+
+
+# Same settings as the Flask app's compression; async responses are JSON (buffered)
+compression = Compression()
+
+
+@async_app.after_request
+async def compress_response(response):
+    if not compression.enabled:
+        return response
+
+    body = await response.get_data()
+    encoding = compression.choose_encoding(request.method, request.accept_encodings, response, len(body))
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding, compression.levels[encoding]))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+# Auth routes (async variants of routes/auth.py)
+@async_app.route('/api/auth/me', methods=['GET'])
+@rate_limit(200, timedelta(hours=1))
+@require_auth
+async def get_current_user():
+    """Get current authenticated user"""
+    try:
+        user = await get_async_auth_service().get_user(request.user_id)
+
+        if not user:
+            return jsonify(error_body('User not found')), 404
+
+        return jsonify({'success': True, 'data': {'user': user}})
+
+    except Exception as e:
+        print(f"Get user error: {e}")
+        return jsonify(error_body('Failed to get user')), 500
+
+
+# Role routes (async variants of routes/roles.py; parsing and responses in routes/common.py)
+@async_app.route('/api/roles', methods=['GET'])
+@rate_limit(30, timedelta(hours=1))
+@require_role_level(70)  # Admin level or higher
+async def list_roles():
+    """List all roles for tenant (system + custom)"""
+    try:
+        tenant_id, error = require_tenant_id(request.args)
+        if error:
+            return jsonify(error), 400
+
+        filters = role_list_filters(request.args)
+        roles = await get_async_role_service().list_roles(tenant_id, filters=filters)
+
+        paginated_roles, meta = paginate(roles, filters['page'], filters['limit'])
+        return jsonify(paginated_body(paginated_roles, meta)), 200
+
+    except Exception as e:
+        print(f"List roles error: {e}")
+        return jsonify(error_body(str(e))), 500
+
+
+@async_app.route('/api/roles/templates', methods=['GET'])
+@rate_limit(50, timedelta(hours=1))
+@require_auth
+async def get_role_templates():
+    """Get predefined role templates"""
+    try:
+        templates = get_async_role_service().sync.get_role_templates()
+        return jsonify({'success': True, 'data': templates}), 200
+
+    except Exception as e:
+        print(f"Get templates error: {e}")
+        return jsonify(error_body(str(e))), 500
+
+
+@async_app.route('/api/roles/<role_id>', methods=['GET'])
+@rate_limit(50, timedelta(hours=1))
+@require_auth
+async def get_role(role_id):
+    """Get role details"""
+    try:
+        tenant_id, error = require_tenant_id(request.args)
+        if error:
+            return jsonify(error), 400
+
+        role = await get_async_role_service().get_role(role_id, tenant_id)
+
+        if not role:
+            return jsonify(error_body('Role not found')), 404
+
+        return jsonify({'success': True, 'data': role}), 200
+
+    except PermissionError as e:
+        return jsonify(error_body(str(e))), 403
+    except Exception as e:
+        print(f"Get role error: {e}")
+        return jsonify(error_body(str(e))), 500
+
+
+@async_app.route('/api/roles/<role_id>/users', methods=['GET'])
+@rate_limit(30, timedelta(hours=1))
+@require_role_level(70)  # Admin level or higher
+async def get_users_with_role(role_id):
+    """Get list of users with specific role"""
+    try:
+        tenant_id, error = require_tenant_id(request.args)
+        if error:
+            return jsonify(error), 400
+
+        page, limit = page_params(request.args)
+
+        role_service = get_async_role_service()
+        members = await role_service.get_role_members(role_id, tenant_id)
+
+        # Apply pagination; profiles only for the requested page, in one batched read
+        page_members, meta = paginate(members, page, limit)
+        paginated_users = await role_service.enrich_members(page_members)
+
+        return jsonify(paginated_body(paginated_users, meta)), 200
+
+    except Exception as e:
+        print(f"Get users with role error: {e}")
+        return jsonify(error_body(str(e))), 500
+
+
+# Dispatch: async routes to Quart, everything else to Flask (in a thread pool)
+wsgi_app = WsgiToAsgi(flask_app)
+_async_routes = async_app.url_map.bind('localhost')
+ASYNC_METHODS = {'GET', 'HEAD'}
+
+
+def _is_async_route(path: str, method: str) -> bool:
+    if method not in ASYNC_METHODS:
+        return False
+    try:
+        _async_routes.match(path, method=method)
+        return True
+    except HTTPException:
+        return False
+
+
+async def application(scope, receive, send):
+    """ASGI application served by uvicorn"""
+    if scope['type'] == 'lifespan' or (
+        scope['type'] == 'http' and _is_async_route(scope['path'], scope['method'])
+    ):
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
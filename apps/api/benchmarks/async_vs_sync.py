@@ -0,0 +1,112 @@
+"""
+Benchmark: sync (thread pool) vs async (event loop) throughput per instance
+Runs the authenticated role-listing request path (email lookup, role level
+check, role listing) against the in-memory backend with a simulated Firestore
+round-trip latency. Every request uses a different user, so the membership and
+email reads are real (cold) reads while roles stay cached, like production.
+
+Usage (from apps/api):
+    python benchmarks/async_vs_sync.py --requests 2000 --latency-ms 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.role import DEFAULT_SYSTEM_ROLES
+from storage.async_memory import AsyncMemoryStorage
+from storage.memory import MemoryStorage
+from services.auth_service import AuthService
+from services.role_service import RoleService
+from services.async_auth_service import AsyncAuthService
+from services.async_role_service import AsyncRoleService
+
+
+TENANTS = 20
+
+
+def seed(db: MemoryStorage, users: int) -> None:
+    db.seed('system_roles', {role['id']: role for role in DEFAULT_SYSTEM_ROLES})
+    db.seed('users', {
+        f'user-{i}': {
+            'email': f'user-{i}@example.com',
+            'profile': {'displayName': f'User {i}'},
+            'membershipsMigrated': True,
+            'tenantMemberships': {
+                f'tenant-{i % TENANTS}': {'tenantId': f'tenant-{i % TENANTS}', 'roleId': 'owner'},
+            },
+        }
+        for i in range(users)
+    })
+
+
+def run_sync(requests: int, threads: int, latency: float) -> float:
+    """Requests per second with a gthread-style pool of worker threads"""
+    db = MemoryStorage(latency=latency)
+    seed(db, requests)
+    auth_service, role_service = AuthService(db), RoleService(db)
+
+    def handle(i: int) -> None:
+        user_id, tenant_id = f'user-{i}', f'tenant-{i % TENANTS}'
+        auth_service.get_user_email(user_id)
+        assert role_service.get_user_role_level(user_id, tenant_id) == 90
+        role_service.list_roles(tenant_id)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(handle, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def run_async(requests: int, concurrency: int, latency: float) -> float:
+    """Requests per second with one event loop serving `concurrency` requests at once"""
+    db = MemoryStorage()
+    seed(db, requests)
+    async_db = AsyncMemoryStorage(db, latency=latency)
+    auth_service = AsyncAuthService(AuthService(db), async_db)
+    role_service = AsyncRoleService(RoleService(db), async_db)
+
+    async def handle(i: int, slots: asyncio.Semaphore) -> None:
+        user_id, tenant_id = f'user-{i}', f'tenant-{i % TENANTS}'
+        async with slots:
+            # Independent reads issued concurrently (as in middleware/async_auth.py)
+            _, level = await asyncio.gather(
+                auth_service.get_user_email(user_id),
+                role_service.get_user_role_level(user_id, tenant_id),
+            )
+            assert level == 90
+            await role_service.list_roles(tenant_id)
+
+    async def main() -> float:
+        slots = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(handle(i, slots) for i in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare sync and async request throughput')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+    parser.add_argument('--latency-ms', type=float, default=8.0, help='Simulated round-trip latency')
+    parser.add_argument('--threads', type=int, nargs='+', default=[8, 80], help='Sync worker thread counts')
+    parser.add_argument('--concurrency', type=int, default=80, help='Async in-flight requests (App Hosting concurrency)')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+    latency = args.latency_ms / 1000
+
+    print(f"⏱️  {args.requests} requests, {args.latency_ms:g} ms per round trip\n")
+    for threads in args.threads:
+        rps = run_sync(args.requests, threads, latency)
+        print(f"  sync   {threads:>3} threads      {rps:8.0f} req/s")
+    rps = run_async(args.requests, args.concurrency, latency)
+    print(f"  async  {args.concurrency:>3} concurrent   {rps:8.0f} req/s")
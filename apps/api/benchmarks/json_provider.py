@@ -0,0 +1,135 @@
+"""
+Benchmark: Flask's default JSON provider vs OrjsonProvider
+Encodes representative API responses (role listing, user document with
+Firestore timestamps, freshly created role with SERVER_TIMESTAMP sentinels)
+through each provider's `response()` - the path taken by `jsonify` - and
+reports time per response and body size.
+
+Usage (from apps/api):
+    python benchmarks/json_provider.py --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.cloud.firestore_v1 import SERVER_TIMESTAMP
+
+from json_provider import OrjsonProvider
+from models.role import DEFAULT_SYSTEM_ROLES, UserPermissions, ROLE_TEMPLATES
+
+
+def timestamp(offset: int = 0) -> DatetimeWithNanoseconds:
+    return DatetimeWithNanoseconds(2025, 1, 1 + offset % 28, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def payloads() -> dict:
+    """Response bodies as the routes build them"""
+    permissions = UserPermissions().dict()
+    custom_roles = [
+        {
+            'id': f'role-{i}',
+            'tenantId': 'tenant-1',
+            'name': f'Custom role {i}',
+            'description': 'Benchmark role',
+            'level': 10 + i % 60,
+            'isCustom': True,
+            'isActive': True,
+            'inheritsFrom': None,
+            'permissions': permissions,
+            'permissionsMask': 5272,
+            'createdAt': timestamp(i),
+            'updatedAt': timestamp(i + 1),
+        }
+        for i in range(50)
+    ]
+    roles = [{**role, 'isSystemRole': True} for role in DEFAULT_SYSTEM_ROLES] + custom_roles
+
+    user = {
+        'id': 'user-1',
+        'email': 'user-1@example.com',
+        'emailVerified': True,
+        'status': 'active',
+        'profile': {'displayName': 'User 1', 'phone': '+62000000', 'avatarUrl': None},
+        'tenantMemberships': {
+            f'tenant-{i}': {
+                'tenantId': f'tenant-{i}',
+                'roleId': 'staff',
+                'status': 'active',
+                'assignedAt': timestamp(i),
+                'expiresAt': None,
+                'customPermissions': {},
+            }
+            for i in range(10)
+        },
+        'createdAt': timestamp(),
+        'updatedAt': timestamp(1),
+        'lastLoginAt': datetime.now(timezone.utc),
+    }
+
+    created_role = {
+        **custom_roles[0],
+        'createdAt': SERVER_TIMESTAMP,
+        'updatedAt': SERVER_TIMESTAMP,
+    }
+
+    return {
+        'list_roles': {'success': True, 'data': roles, 'meta': {'total': len(roles), 'page': 1, 'limit': 20, 'hasNext': True}},
+        'get_user': {'success': True, 'data': {'user': user}},
+        'create_role': {'success': True, 'data': created_role},
+        'templates': {'success': True, 'data': ROLE_TEMPLATES},
+    }
+
+
+def bench(provider, payload, iterations: int):
+    """Returns (microseconds per response, body bytes) or (None, error)"""
+    try:
+        size = len(provider.response(payload).get_data())
+    except TypeError as e:
+        return None, str(e)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        provider.response(payload)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON providers')
+    parser.add_argument('--iterations', type=int, default=2000, help='Responses encoded per payload')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+    app = Flask(__name__)
+    providers = {
+        'default': DefaultJSONProvider(app),
+        'orjson': OrjsonProvider(app),
+    }
+
+    print(f"📊 JSON provider benchmark ({args.iterations} responses per payload)\n")
+    print(f"   {'payload':<12} {'default µs':>11} {'orjson µs':>10} {'speedup':>8} {'default B':>10} {'orjson B':>9}")
+
+    with app.app_context():
+        for name, payload in payloads().items():
+            default_us, default_size = bench(providers['default'], payload, args.iterations)
+            orjson_us, orjson_size = bench(providers['orjson'], payload, args.iterations)
+            if default_us is None:
+                print(f"   {name:<12} {'error':>11} {orjson_us:>10.1f} {'-':>8} {'-':>10} {orjson_size:>9}"
+                      f"   (default: {default_size})")
+                continue
+            print(f"   {name:<12} {default_us:>11.1f} {orjson_us:>10.1f} {default_us / orjson_us:>7.1f}x "
+                  f"{default_size:>10} {orjson_size:>9}")
+
+
+if __name__ == '__main__':
+    main()
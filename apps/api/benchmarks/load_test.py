@@ -0,0 +1,413 @@
+"""
+Benchmark: end-to-end load test of the auth and roles APIs
+Seeds synthetic tenants, users and custom roles (scripts/generate_dataset.py:
+power-law tenant sizes, multi-tenant users), serves the real Flask app
+(every middleware included) from a separate process on a threaded WSGI server,
+then drives a weighted mix of requests at fixed concurrency levels over
+keep-alive HTTP connections.
+
+Per concurrency level and per operation it records p50/p95/p99 latency,
+throughput, errors and Firestore document reads per request (from the
+Server-Timing header, see observability/storage.py). Results are written as
+JSON and can be compared against a stored baseline: latency and throughput
+vary with the machine, reads per request do not, so they are compared tightly.
+
+Operations (--mix name=weight,...):
+    login       POST /api/auth/login (needs the Auth emulator, skipped otherwise)
+    me          GET /api/auth/me
+    roles       GET /api/roles?tenantId=...
+    role_users  GET /api/roles/<role_id>/users?tenantId=...
+
+Usage (from apps/api):
+    python benchmarks/load_test.py --concurrency 1,8,32 --duration 10 --output results.json
+    python benchmarks/load_test.py --compare baseline.json
+    python benchmarks/load_test.py --save-baseline baseline.json
+
+    # Firestore + Auth emulators (firebase emulators:start --only firestore,auth)
+    FIRESTORE_EMULATOR_HOST=localhost:8081 FIREBASE_AUTH_EMULATOR_HOST=localhost:9099 \\
+        python benchmarks/load_test.py --backend emulator
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.generate_dataset import email_for
+
+DEFAULT_MIX = 'login=5,me=40,roles=35,role_users=20'
+PASSWORD = 'BenchPass123!'
+TOKEN_USERS = 2000  # Users signing /api/auth/me requests
+READS_RE = re.compile(r'reads=(\d+)')
+EMULATOR_PROJECT = 'demo-bench'
+
+# Environment shared by the server and the driver (tokens are signed with the same secret)
+BENCH_ENV = {
+    'JWT_SECRET_KEY': 'load-test-secret',
+    'SERVER_TIMING': 'true',
+    'RATELIMIT_ENABLED': 'false',
+    'STARTUP_MODE': 'eager',
+    'PROFILING': 'false',
+    'TRACE_EXPORTER': 'none',
+    'SLOW_REQUEST_WATCHDOG': 'false',
+}
+
+
+# Dataset
+
+def seed_dataset(args, auth_users: bool) -> Dict[str, Any]:
+    """
+    Seed the process-wide storage with scripts/generate_dataset.py (power-law
+    tenant sizes, multi-tenant users, ROLE_TEMPLATES roles) and return its
+    manifest; owners also get Auth emulator accounts when auth_users is set
+    """
+    from scripts.generate_dataset import DatasetGenerator, generate
+    from services.role_service import get_role_service
+    from storage import get_storage
+
+    generator = DatasetGenerator(args.tenants, args.users, skew=args.skew, seed=args.seed)
+    manifest = generate(get_storage(), generator, verbose=False)
+
+    if auth_users:
+        from firebase_admin import auth
+        for user_id in manifest['owners'].values():
+            try:
+                auth.create_user(uid=user_id, email=email_for(user_id), password=PASSWORD)
+            except auth.UidAlreadyExistsError:
+                pass
+
+    # Start measuring from a cold cache, like a fresh instance
+    get_role_service().clear_cache()
+    manifest['login'] = auth_users
+    return manifest
+
+
+def serve(args) -> None:
+    """Server process: seed, then serve the app and announce readiness on stdout"""
+    import logging
+    from werkzeug.serving import make_server
+
+    import app as api
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # No access log line per request
+
+    from scripts.generate_dataset import describe
+
+    manifest = seed_dataset(args, bool(os.getenv('FIREBASE_AUTH_EMULATOR_HOST')))
+    print('\n'.join(describe(manifest)), file=sys.stderr)
+
+    server = make_server('127.0.0.1', args.port, api.app, threaded=True)
+    print('READY ' + json.dumps(manifest), flush=True)
+    server.serve_forever()
+
+
+def start_server(args) -> (subprocess.Popen, Dict[str, Any]):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    env = {**os.environ, **BENCH_ENV, 'STORAGE_BACKEND': 'memory' if args.backend == 'memory' else 'firestore'}
+    if args.backend == 'emulator':
+        if not env.get('FIRESTORE_EMULATOR_HOST'):
+            sys.exit('--backend emulator needs FIRESTORE_EMULATOR_HOST')
+        env.setdefault('GOOGLE_CLOUD_PROJECT', EMULATOR_PROJECT)
+    else:
+        # Firebase ID token checks (tried before the API's own JWTs) must fail fast
+        # instead of probing the GCE metadata server for credentials
+        env.setdefault('GOOGLE_CLOUD_PROJECT', EMULATOR_PROJECT)
+        env.setdefault('NO_GCE_CHECK', 'true')
+        env.pop('FIREBASE_AUTH_EMULATOR_HOST', None)
+
+    command = [
+        sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port),
+        '--tenants', str(args.tenants), '--users', str(args.users), '--skew', str(args.skew), '--seed', str(args.seed),
+    ]
+    server = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=None, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for line in server.stdout:
+        if line.startswith('READY '):
+            manifest = json.loads(line[len('READY '):])
+            manifest['port'] = port
+            # Keep draining the server's stdout so it never blocks on a full pipe
+            threading.Thread(target=lambda: [None for _ in server.stdout], daemon=True).start()
+            return server, manifest
+    sys.exit(f'Server exited before becoming ready (code {server.wait()})')
+
+
+# Load generation
+
+class Operations:
+    """Builds the requests of each operation from the seeded dataset"""
+
+    def __init__(self, manifest: Dict[str, Any]):
+        os.environ.update(BENCH_ENV)
+        from services.auth_service import AuthService
+        from storage.memory import MemoryStorage
+
+        self.manifest = manifest
+        self._auth = AuthService(MemoryStorage())  # Token signing only
+        self.refresh_tokens()
+
+    def refresh_tokens(self) -> None:
+        """Access tokens expire after 15 minutes: refreshed before every level"""
+        sample = random.Random(self.manifest['seed']).sample(
+            self.manifest['users'], min(len(self.manifest['users']), TOKEN_USERS)
+        )
+        signed = dict.fromkeys(sample + list(self.manifest['owners'].values()))
+        self.tokens = {user_id: self._auth.generate_tokens(user_id).accessToken for user_id in signed}
+        self.sample = sample
+        # Traffic per tenant follows its size
+        self.tenant_ids = list(self.manifest['tenantSizes'])
+        self.tenant_weights = list(itertools.accumulate(self.manifest['tenantSizes'].values()))
+
+    def request(self, name: str, rng: random.Random) -> tuple:
+        """(method, path, headers, body) of one operation"""
+        tenant_id = rng.choices(self.tenant_ids, cum_weights=self.tenant_weights)[0]
+        owner_id = self.manifest['owners'][tenant_id]
+
+        if name == 'login':
+            body = json.dumps({'email': email_for(owner_id), 'password': PASSWORD})
+            return 'POST', '/api/auth/login', {'Content-Type': 'application/json'}, body
+        if name == 'me':
+            return 'GET', '/api/auth/me', self._bearer(rng.choice(self.sample)), None
+        if name == 'roles':
+            return 'GET', f'/api/roles?tenantId={tenant_id}', self._bearer(owner_id), None
+        if name == 'role_users':
+            role_id = rng.choice(self.manifest['roles'][tenant_id])
+            return 'GET', f'/api/roles/{role_id}/users?tenantId={tenant_id}', self._bearer(owner_id), None
+        raise ValueError(f"Unknown operation: {name}")
+
+    def _bearer(self, user_id: str) -> Dict[str, str]:
+        return {'Authorization': f'Bearer {self.tokens[user_id]}'}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples: List[tuple], seconds: float) -> Dict[str, Any]:
+    """samples: (latency_s, status, reads)"""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    reads = [s[2] for s in samples if s[2] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if not 200 <= s[1] < 400),
+        'throughputRps': round(len(samples) / seconds, 1) if seconds else 0.0,
+        'p50Ms': round(percentile(latencies, 50), 2),
+        'p95Ms': round(percentile(latencies, 95), 2),
+        'p99Ms': round(percentile(latencies, 99), 2),
+        'meanMs': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        'readsPerRequest': round(sum(reads) / len(reads), 2) if reads else None,
+    }
+
+
+def run_level(port: int, operations: Operations, mix: Dict[str, int], concurrency: int,
+              duration: float, warmup: float, seed: int) -> Dict[str, Any]:
+    """Drive the mix with `concurrency` closed-loop clients; samples taken during warmup are dropped"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples: Dict[str, List[tuple]] = defaultdict(list)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def client(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local: Dict[str, List[tuple]] = defaultdict(list)
+        while True:
+            began = time.perf_counter()
+            if began >= stop_at:
+                break
+            name = rng.choices(names, weights)[0]
+            method, path, headers, body = operations.request(name, rng)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                match = READS_RE.search(response.getheader('Server-Timing') or '')
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                status, match = 599, None
+            if began >= measure_from:
+                local[name].append((time.perf_counter() - began, status, int(match.group(1)) if match else None))
+        connection.close()
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    everything = [s for values in samples.values() for s in values]
+    return {
+        'concurrency': concurrency,
+        'total': summarize(everything, duration),
+        'operations': {name: summarize(samples[name], duration) for name in names if samples[name]},
+    }
+
+
+# Results and baselines
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], latency_tolerance: float,
+            throughput_tolerance: float, reads_tolerance: float) -> List[str]:
+    """Regressions of results against baseline, as printable lines"""
+    regressions = []
+    baseline_levels = {level['concurrency']: level for level in baseline['levels']}
+    for level in results['levels']:
+        reference = baseline_levels.get(level['concurrency'])
+        if reference is None:
+            continue
+        current_ops = {'total': level['total'], **level['operations']}
+        reference_ops = {'total': reference['total'], **reference['operations']}
+        for name, current in current_ops.items():
+            before = reference_ops.get(name)
+            if before is None:
+                continue
+            where = f"c={level['concurrency']} {name}"
+            if current['errors'] > before['errors']:
+                regressions.append(f"{where}: errors {before['errors']} -> {current['errors']}")
+            for key in ('p50Ms', 'p95Ms', 'p99Ms'):
+                if before[key] and current[key] > before[key] * (1 + latency_tolerance):
+                    regressions.append(f"{where}: {key} {before[key]} -> {current[key]}")
+            # Per-operation throughput only follows the random mix: compared on the total
+            if name == 'total':
+                if before['throughputRps'] and current['throughputRps'] < before['throughputRps'] * (1 - throughput_tolerance):
+                    regressions.append(f"{where}: throughput {before['throughputRps']} -> {current['throughputRps']} rps")
+                continue
+            if before['readsPerRequest'] is not None and current['readsPerRequest'] is not None \
+                    and current['readsPerRequest'] > before['readsPerRequest'] * (1 + reads_tolerance):
+                regressions.append(f"{where}: reads/request {before['readsPerRequest']} -> {current['readsPerRequest']}")
+    return regressions
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    print(f"\n  concurrency {level['concurrency']}")
+    print(f"    {'operation':<12} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'reads':>7}")
+    for name, stats in {**level['operations'], 'total': level['total']}.items():
+        reads = '-' if stats['readsPerRequest'] is None else f"{stats['readsPerRequest']:.1f}"
+        print(f"    {name:<12} {stats['requests']:>7} {stats['errors']:>5} {stats['throughputRps']:>8.1f} "
+              f"{stats['p50Ms']:>8.1f} {stats['p95Ms']:>8.1f} {stats['p99Ms']:>8.1f} {reads:>7}")
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        name, weight = item.split('=')
+        if int(weight) > 0:
+            mix[name.strip()] = int(weight)
+    return mix
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='End-to-end load test of the auth and roles APIs')
+    parser.add_argument('--backend', choices=['memory', 'emulator'], default='memory')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated client counts (default: 1,8,32)')
+    parser.add_argument('--duration', type=float, default=10, help='Measured seconds per level (default: 10)')
+    parser.add_argument('--warmup', type=float, default=2, help='Unmeasured seconds before each level (default: 2)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Operation weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--tenants', type=int, default=50)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--skew', type=float, default=1.1, help='Power-law exponent of tenant sizes (default: 1.1)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a baseline JSON; exit 1 on regression')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write results as the new baseline')
+    parser.add_argument('--latency-tolerance', type=float, default=0.25, help='Allowed latency increase (default: 0.25)')
+    parser.add_argument('--throughput-tolerance', type=float, default=0.2, help='Allowed throughput drop (default: 0.2)')
+    parser.add_argument('--reads-tolerance', type=float, default=0.1,
+                        help='Allowed reads/request increase per operation (default: 0.1)')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        sys.exit(0)
+
+    mix = parse_mix(args.mix)
+    server, manifest = start_server(args)
+    try:
+        if not manifest['login'] and mix.pop('login', None):
+            print("ℹ️  login skipped: it needs the Firebase Auth emulator (FIREBASE_AUTH_EMULATOR_HOST)")
+        operations = Operations(manifest)
+
+        print(f"🚀 Load test ({args.backend}): mix {mix}, {args.duration:g}s per level")
+        levels = []
+        for concurrency in [int(c) for c in args.concurrency.split(',')]:
+            operations.refresh_tokens()
+            level = run_level(manifest['port'], operations, mix, concurrency, args.duration, args.warmup, args.seed)
+            print_level(level)
+            levels.append(level)
+    finally:
+        server.terminate()
+        server.wait()
+
+    results = {
+        'benchmark': 'load_test',
+        'backend': args.backend,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        'dataset': {'tenants': args.tenants, 'users': args.users, 'skew': args.skew, 'seed': args.seed},
+        'mix': mix,
+        'durationSeconds': args.duration,
+        'levels': levels,
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"\n💾 Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.latency_tolerance, args.throughput_tolerance, args.reads_tolerance)
+        print(f"\n📊 Compared with {args.compare} (commit {baseline.get('commit')}, {baseline.get('machine')})")
+        for key in ('backend', 'dataset', 'mix', 'machine'):
+            if baseline.get(key) != results[key]:
+                print(f"⚠️  {key} differs from the baseline: {baseline.get(key)} vs {results[key]}")
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("✅ No regressions")
@@ -0,0 +1,245 @@
+"""
+Micro-benchmarks: CPU-bound permission, token and validation paths
+Times single operations in a calibrated loop (best of --repeat runs) and
+measures their memory with tracemalloc in a separate pass, so tracing never
+slows the timed loop:
+
+    ns/op        best run time per operation
+    peak B/op    extra memory held at the high point of one operation
+                 (transient allocations: dicts, models, encoded strings)
+    kept B/op    memory still held after the operation (cache growth, leaks)
+
+Permission resolution runs on the in-memory backend with the role cache warm,
+so only flattening and merging are measured; the `cold` cases clear the
+flattened-permissions cache before every operation.
+
+Usage (from apps/api):
+    python benchmarks/micro.py
+    python benchmarks/micro.py --filter permissions --repeat 9
+    python benchmarks/micro.py --output micro.json
+    python benchmarks/micro.py --compare micro.json --tolerance 0.15   # exits 1 on regression
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('JWT_SECRET_KEY', 'micro-benchmark-secret')
+os.environ.setdefault('TRACE_EXPORTER', 'none')
+
+from models.role import DEFAULT_SYSTEM_ROLES, ROLE_TEMPLATES, CreateTenantRoleInput, UserPermissions
+from models.user import RegisterRequest
+from services.auth_service import AuthService
+from services.role_service import RoleService
+from storage.memory import MemoryStorage
+
+TENANT = 'tenant-1'
+DEPTHS = (0, 1, 3, 5)
+
+
+def build_role_service(max_depth: int) -> (RoleService, Dict[int, str]):
+    """RoleService over a chain of custom roles: depth d inherits from depth d-1"""
+    db = MemoryStorage()
+    db.seed('system_roles', {role['id']: role for role in DEFAULT_SYSTEM_ROLES})
+    service = RoleService(db)
+
+    templates = list(ROLE_TEMPLATES.values())
+    chain: Dict[int, str] = {}
+    for depth in range(max_depth + 1):
+        template = templates[depth % len(templates)]
+        data = {**template, 'tenantId': TENANT, 'name': f"{template['name']} {depth}"}
+        if depth:
+            data['inheritsFrom'] = chain[depth - 1]
+        chain[depth] = service.create_role(data, created_by='benchmark')['id']
+
+    db.seed('users', {
+        'member': {
+            'email': 'member@example.com',
+            'membershipsMigrated': True,
+            'tenantMemberships': {TENANT: {
+                'tenantId': TENANT, 'userId': 'member', 'roleId': chain[max_depth], 'status': 'active',
+                'customPermissions': {'canDeleteProducts': True, 'canViewReports': False},
+            }},
+        },
+    })
+    return service, chain
+
+
+def cases() -> Dict[str, Callable[[], Any]]:
+    """Benchmark name -> zero-argument operation"""
+    service, chain = build_role_service(max(DEPTHS))
+    auth = AuthService(MemoryStorage())
+    token = auth.generate_tokens('user-1').accessToken
+
+    def cold(role_id):
+        def run():
+            service.permissions_cache.clear()
+            return service.get_effective_permissions(role_id, TENANT)
+        return run
+
+    operations: Dict[str, Callable[[], Any]] = {}
+    for depth in DEPTHS:
+        role_id = chain[depth]
+        operations[f'permissions.effective.depth{depth}.cold'] = cold(role_id)
+        operations[f'permissions.effective.depth{depth}.warm'] = (
+            lambda role_id=role_id: service.get_effective_permissions(role_id, TENANT)
+        )
+
+    parent = UserPermissions(**ROLE_TEMPLATES['ADMIN']['permissions'])
+    child = UserPermissions(**ROLE_TEMPLATES['CASHIER']['permissions'])
+    operations['permissions.merge'] = lambda: service._merge_permissions(parent, child)
+    operations['permissions.user_custom_overlay'] = (
+        lambda: service.get_user_effective_permissions('member', TENANT)
+    )
+
+    operations['tokens.generate'] = lambda: auth.generate_tokens('user-1')
+    operations['tokens.verify'] = lambda: auth.verify_token(token)
+
+    register = {
+        'email': 'new.user@example.com', 'password': 'Sup3rSecret!',
+        'displayName': 'New User', 'phoneNumber': '+628123456789',
+    }
+    role_input = {**ROLE_TEMPLATES['MANAGER'], 'tenantId': TENANT, 'inheritsFrom': chain[0]}
+    operations['validation.register_request'] = lambda: RegisterRequest(**register)
+    operations['validation.create_tenant_role'] = lambda: CreateTenantRoleInput(**role_input)
+
+    # Warm every path once (role cache, imports, first-call setup)
+    for operation in operations.values():
+        operation()
+    return operations
+
+
+def calibrate(operation: Callable[[], Any], min_time: float) -> int:
+    """Loop count for one timed run of at least min_time seconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        if time.perf_counter() - start >= min_time:
+            return loops
+        loops *= 2
+
+
+def time_operation(operation: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    loops = calibrate(operation, min_time)
+    runs = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # Collections land in random runs; allocations are reported separately
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(loops):
+                operation()
+            runs.append((time.perf_counter_ns() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {'nsPerOp': round(min(runs), 1), 'medianNsPerOp': round(statistics.median(runs), 1), 'loops': loops}
+
+
+def measure_memory(operation: Callable[[], Any], samples: int) -> Dict[str, int]:
+    """Median peak and retained bytes per operation under tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # Retained memory first, with no bookkeeping allocations inside the loop
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(samples):
+            operation()
+        kept = (tracemalloc.get_traced_memory()[0] - before) / samples
+
+        peaks = []
+        for _ in range(samples):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            result = operation()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            del result
+    finally:
+        tracemalloc.stop()
+    return {'peakBytesPerOp': int(statistics.median(peaks)), 'keptBytesPerOp': max(int(kept), 0)}
+
+
+def run(selected: Dict[str, Callable[[], Any]], repeat: int, min_time: float, samples: int) -> Dict[str, Any]:
+    results = {}
+    print(f"   {'benchmark':<42} {'ns/op':>11} {'median':>11} {'peak B/op':>10} {'kept B/op':>10}")
+    for name, operation in selected.items():
+        stats = {**time_operation(operation, repeat, min_time), **measure_memory(operation, samples)}
+        results[name] = stats
+        print(f"   {name:<42} {stats['nsPerOp']:>11,.0f} {stats['medianNsPerOp']:>11,.0f} "
+              f"{stats['peakBytesPerOp']:>10,} {stats['keptBytesPerOp']:>10,}")
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Benchmarks slower than the baseline by more than tolerance, or holding more memory"""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if current['nsPerOp'] > before['nsPerOp'] * (1 + tolerance):
+            regressions.append(f"{name}: {before['nsPerOp']:,.0f} -> {current['nsPerOp']:,.0f} ns/op")
+        if current['peakBytesPerOp'] > before['peakBytesPerOp'] * (1 + tolerance) + 64:
+            regressions.append(f"{name}: peak {before['peakBytesPerOp']:,} -> {current['peakBytesPerOp']:,} B/op")
+        if current['keptBytesPerOp'] > before['keptBytesPerOp'] + 64:
+            regressions.append(f"{name}: kept {before['keptBytesPerOp']:,} -> {current['keptBytesPerOp']:,} B/op")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark permission, token and validation paths')
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark, best is reported (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.1, help='Minimum seconds per timed run (default: 0.1)')
+    parser.add_argument('--samples', type=int, default=200, help='Operations traced for memory (default: 200)')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a results JSON; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown (default: 0.2)')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+    operations = cases()
+    selected = {name: op for name, op in operations.items() if args.filter in name}
+
+    print(f"📊 Micro-benchmarks (best of {args.repeat}, >= {args.min_time:g}s per run)\n")
+    results = run(selected, args.repeat, args.min_time, args.samples)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'benchmark': 'micro',
+                'python': platform.python_version(),
+                'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'results': results,
+            }, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        print(f"\n📊 Compared with {args.compare} ({baseline.get('machine')}, Python {baseline.get('python')})")
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
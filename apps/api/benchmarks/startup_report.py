@@ -0,0 +1,135 @@
+"""
+Cold-start report: import time per module and initialization steps
+Boots the app in a fresh interpreter under `python -X importtime`, the way a
+gunicorn worker does (preload, then start_background_services), and prints the
+slowest modules and the timed initialization steps of startup.report. Run it
+before and after changes to the import path to catch cold-start regressions.
+
+Usage (from apps/api):
+    python benchmarks/startup_report.py                 # eager vs lazy
+    python benchmarks/startup_report.py --mode lazy --top 25
+    python benchmarks/startup_report.py --json > startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter: import phase, then per-worker background start
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import app
+import_ms = (time.perf_counter() - start) * 1000
+import startup
+app.start_background_services()
+if startup.is_lazy():
+    startup.report.warm.wait(60)
+print("@@REPORT@@" + json.dumps(dict(startup.report.as_dict(), importMs=round(import_ms, 2))))
+'''
+
+
+def parse_importtime(stderr: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split `-X importtime` output into the `import app` phase and later imports
+
+    Returns:
+        {'app': [...], 'after': [...]} with entries {module, depth, selfMs, cumulativeMs}
+    """
+    phases = {'app': [], 'after': []}
+    phase = 'app'
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        module = name.strip()
+        entry = {
+            'module': module,
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'selfMs': int(self_us) / 1000,
+            'cumulativeMs': int(cumulative_us) / 1000,
+        }
+        phases[phase].append(entry)
+        if module == 'app' and entry['depth'] == 0:
+            phase = 'after'
+    return phases
+
+
+def run(mode: str, backend: str) -> Dict[str, Any]:
+    env = dict(
+        os.environ,
+        STARTUP_MODE=mode,
+        STORAGE_BACKEND=backend,
+        GUNICORN_PRELOAD='true',  # Start background work after import, like a worker
+        PYTHONDONTWRITEBYTECODE='1',
+    )
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=API_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    report = None
+    for line in proc.stdout.splitlines():
+        if line.startswith('@@REPORT@@'):
+            report = json.loads(line[len('@@REPORT@@'):])
+    if report is None:
+        raise RuntimeError(f"App failed to start in {mode} mode:\n{proc.stderr[-2000:]}")
+
+    report['imports'] = parse_importtime(proc.stderr)
+    return report
+
+
+def print_report(report: Dict[str, Any], top: int) -> None:
+    imports = report['imports']
+    print(f"\n🚀 Startup mode: {report['mode']}")
+    print(f"   import app: {report['importMs']:.1f} ms, ready at {report['readyMs']} ms, "
+          f"warm at {report['warmMs'] if report['warmMs'] is not None else '-'} ms "
+          f"({len(imports['app'])} modules imported on the request path, "
+          f"{len(imports['after'])} deferred)")
+
+    print("\n   Slowest modules during `import app` (cumulative / self ms):")
+    for entry in sorted(imports['app'], key=lambda e: e['cumulativeMs'], reverse=True)[:top]:
+        print(f"   {entry['cumulativeMs']:>9.1f} {entry['selfMs']:>9.1f}  {entry['module']}")
+
+    deferred = [entry for entry in imports['after'] if entry['depth'] == 0]
+    if deferred:
+        print("\n   Deferred imports (background warmup / first use, cumulative ms):")
+        for entry in sorted(deferred, key=lambda e: e['cumulativeMs'], reverse=True)[:top]:
+            print(f"   {entry['cumulativeMs']:>9.1f}  {entry['module']}")
+
+    print("\n   Initialization steps:")
+    for step in report['steps']:
+        print(f"   {step['ms']:>9.1f} ms  {step['step']}  (at {step['atMs']} ms, {step['thread']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import time and initialization steps of the app')
+    parser.add_argument('--mode', choices=['eager', 'lazy', 'both'], default='both')
+    parser.add_argument('--backend', choices=['memory', 'firestore'], default='memory',
+                        help='Storage backend used during warmup (firestore needs credentials)')
+    parser.add_argument('--top', type=int, default=15, help='Number of modules listed')
+    parser.add_argument('--json', action='store_true', help='Print the raw reports as JSON')
+    args = parser.parse_args()
+
+    modes = ['eager', 'lazy'] if args.mode == 'both' else [args.mode]
+    reports = [run(mode, args.backend) for mode in modes]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    for report in reports:
+        print_report(report, args.top)
+
+    if len(reports) == 2:
+        eager, lazy = reports
+        print(f"\n📊 Time to ready: eager {eager['readyMs']} ms, lazy {lazy['readyMs']} ms "
+              f"({eager['readyMs'] - lazy['readyMs']:+.1f} ms saved on the request path)")
+
+
+if __name__ == '__main__':
+    main()
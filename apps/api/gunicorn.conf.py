@@ -0,0 +1,74 @@
+"""
+Gunicorn configuration - Production server for the Flask API
+Tuned for the App Hosting profile (1 CPU, 512 MiB, concurrency 80):
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is preloaded once in the master and shared copy-on-write with the
+workers; post_fork() re-creates the Firebase app, Firestore clients and
+service singletons in each worker, since gRPC channels and threads do not
+survive fork().
+
+Environment overrides:
+    GUNICORN_WORKER_CLASS  gthread (default) or gevent (pip install gevent)
+    WEB_CONCURRENCY        worker processes
+    GUNICORN_THREADS       threads per gthread worker
+    GUNICORN_CONCURRENCY   requests in flight per instance (App Hosting concurrency)
+"""
+
+import gc
+import os
+
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+concurrency = int(os.getenv('GUNICORN_CONCURRENCY', '80'))
+
+if worker_class == 'gevent':
+    # Patch before the app (and grpc) is imported by preload_app
+    from gevent import monkey
+    monkey.patch_all()
+    import grpc.experimental.gevent as grpc_gevent
+    grpc_gevent.init_gevent()
+
+    # One process: greenlets multiplex all requests on the single CPU
+    workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+    worker_connections = concurrency
+else:
+    # Two processes share the CPU (one can serve while the other holds the GIL)
+    # and fit in 512 MiB thanks to copy-on-write; threads cover the concurrency
+    workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+    threads = int(os.getenv('GUNICORN_THREADS', str(max(concurrency // workers, 1))))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+preload_app = True
+
+# Background services start per worker (app.start_background_services)
+os.environ['GUNICORN_PRELOAD'] = 'true'
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically (bounded memory growth), staggered
+max_requests = 2000
+max_requests_jitter = 200
+
+# Worker heartbeat files in memory, not on the container's overlay filesystem
+worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    # Move everything loaded by preload_app out of the collector's reach, so
+    # GC passes in the workers do not touch (and copy) the shared pages
+    gc.freeze()
+    server.log.info(f"Preloaded app, {gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(server, worker):
+    from app import reinitialize_after_fork
+
+    reinitialize_after_fork()
+    server.log.info(f"Worker {worker.pid} re-initialized Firebase and Firestore clients")
@@ -0,0 +1,113 @@
+"""
+JSON provider - orjson-based Flask JSON provider that understands Firestore types
+Responses are encoded straight to bytes (no intermediate str); datetimes are
+emitted as ISO 8601 (naive values are UTC), Firestore sentinels, GeoPoint and
+DocumentReference values and pydantic models are converted in `default`.
+"""
+
+import json
+import sys
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Union
+
+import orjson
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+DEBUG_OPTIONS = OPTIONS | orjson.OPT_INDENT_2
+
+# Converters resolved per type on first use (type -> callable)
+_converters: Dict[type, Callable[[Any], Any]] = {}
+
+
+def _datetime(value: datetime) -> str:
+    # Subclasses (DatetimeWithNanoseconds) are not native to orjson
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _sentinel(value: Any) -> Any:
+    from google.cloud.firestore_v1 import transforms
+
+    # Write not applied yet: report the time the server will assign (approximately)
+    if value is transforms.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc).isoformat()
+    return None
+
+
+def _firestore_converter(cls: type) -> Optional[Callable[[Any], Any]]:
+    """Converter for Firestore value types (only if the SDK has been imported)"""
+    if 'google.cloud.firestore_v1' not in sys.modules:
+        return None
+
+    from google.cloud.firestore_v1 import GeoPoint, transforms
+    from google.cloud.firestore_v1.base_document import BaseDocumentReference
+
+    if issubclass(cls, transforms.Sentinel):
+        return _sentinel
+    if issubclass(cls, (transforms._NumericValue, transforms._ValueList)):
+        # Increment/ArrayUnion/...: resulting value is only known to the server
+        return lambda value: None
+    if issubclass(cls, GeoPoint):
+        return lambda value: {'latitude': value.latitude, 'longitude': value.longitude}
+    if issubclass(cls, BaseDocumentReference):
+        return lambda value: value.path
+    return None
+
+
+def _resolve(cls: type) -> Optional[Callable[[Any], Any]]:
+    if issubclass(cls, BaseModel):
+        return lambda value: value.model_dump()
+    if issubclass(cls, datetime):
+        return _datetime
+    if issubclass(cls, date):
+        return date.isoformat
+    if issubclass(cls, Decimal):
+        return str
+    if issubclass(cls, (set, frozenset, tuple)):
+        return list
+    if hasattr(cls, '__html__'):
+        return lambda value: str(value.__html__())
+    return _firestore_converter(cls)
+
+
+def default(value: Any) -> Any:
+    """Convert a value orjson does not serialize natively"""
+    cls = type(value)
+    converter = _converters.get(cls)
+    if converter is None:
+        converter = _resolve(cls)
+        if converter is None:
+            raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+        _converters[cls] = converter
+    return converter(value)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (see module docstring)"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Stdlib options (indent, sort_keys, ...) requested explicitly
+            kwargs.setdefault('default', default)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=default, option=OPTIONS).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Serialize the data to bytes and wrap it in a response (jsonify)"""
+        obj = self._prepare_response_obj(args, kwargs)
+        option = DEBUG_OPTIONS if self._app.debug else OPTIONS
+        return self._app.response_class(
+            orjson.dumps(obj, default=default, option=option),
+            mimetype=self.mimetype,
+        )
@@ -0,0 +1,154 @@
+"""
+Async Authentication Middleware - Quart variants of require_auth and require_role_level
+Used by the async execution mode (asgi.py); same responses as middleware/auth.py.
+"""
+
+import asyncio
+from functools import wraps
+from typing import Optional, Tuple
+
+from quart import request, jsonify
+
+from middleware.auth import TOKEN_VERIFICATIONS
+from services.async_auth_service import get_async_auth_service
+from services.async_role_service import get_async_role_service
+
+
+async def _authenticate() -> Tuple[Optional[tuple], Optional[str], bool]:
+    """
+    Verify the bearer token of the current request
+
+    Returns:
+        (error_response, user_id, email_lookup_needed); error_response is a
+        (body, status) tuple when authentication failed
+    """
+    auth_header = request.headers.get('Authorization')
+
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return (jsonify({'success': False, 'error': 'Unauthorized - No token provided'}), 401), None, False
+
+    token = auth_header.split('Bearer ')[1]
+    auth_service = get_async_auth_service()
+
+    try:
+        # Try to verify as Firebase ID token first
+        decoded_token = await auth_service.verify_firebase_token(token)
+        request.user_id = decoded_token['uid']
+        request.user_email = decoded_token.get('email')
+        TOKEN_VERIFICATIONS.inc(('firebase', 'ok'))
+        return None, request.user_id, False
+    except Exception:
+        pass
+
+    # If Firebase verification fails, try JWT
+    try:
+        payload = auth_service.verify_token(token)
+    except Exception:
+        TOKEN_VERIFICATIONS.inc(('jwt', 'error'))
+        return (jsonify({'success': False, 'error': 'Invalid token - authentication failed'}), 401), None, False
+
+    if not payload:
+        TOKEN_VERIFICATIONS.inc(('jwt', 'invalid'))
+        return (jsonify({'success': False, 'error': 'Invalid or expired token'}), 401), None, False
+
+    if payload.get('type') != 'access':
+        TOKEN_VERIFICATIONS.inc(('jwt', 'wrong_type'))
+        return (jsonify({'success': False, 'error': 'Invalid token type'}), 401), None, False
+
+    request.user_id = payload.get('user_id')
+    TOKEN_VERIFICATIONS.inc(('jwt', 'ok'))
+    # JWTs carry no email: it has to be read from the user document
+    return None, request.user_id, True
+
+
+async def _lookup_email(user_id: str) -> None:
+    user = await get_async_auth_service().get_user_email(user_id)
+    if user:
+        request.user_email = user.get('email')
+
+
+def require_auth(f):
+    """
+    Decorator to require authentication (JWT or Firebase ID token)
+
+    Usage:
+        @app.route('/api/protected')
+        @require_auth
+        async def protected_route():
+            user_id = request.user_id  # Added by middleware
+            return {'message': 'Hello'}
+    """
+
+    @wraps(f)
+    async def decorated_function(*args, **kwargs):
+        error, user_id, email_lookup = await _authenticate()
+        if error:
+            return error
+
+        if email_lookup:
+            await _lookup_email(user_id)
+
+        return await f(*args, **kwargs)
+
+    return decorated_function
+
+
+def require_role_level(min_level: int, tenant_param: str = 'tenantId'):
+    """
+    Decorator to require authentication and a minimum role level in a tenant
+
+    Replaces the require_auth + require_role_level pair of the sync routes:
+    the user's email and role level are read concurrently.
+
+    Args:
+        min_level: Minimum required role level
+        tenant_param: Query parameter name containing tenant ID (default: 'tenantId')
+
+    Usage:
+        @app.route('/api/roles')
+        @require_role_level(70)  # Requires admin level (70) or higher
+        async def list_roles():
+            ...
+    """
+
+    def decorator(f):
+        @wraps(f)
+        async def decorated_function(*args, **kwargs):
+            error, user_id, email_lookup = await _authenticate()
+            if error:
+                return error
+
+            tenant_id = request.args.get(tenant_param)
+            if not tenant_id:
+                body = await request.get_json(silent=True) or {}
+                tenant_id = body.get(tenant_param)
+            if not tenant_id:
+                return jsonify({'success': False, 'error': f'Missing required parameter: {tenant_param}'}), 400
+
+            # Independent reads: user email and role level
+            role_lookup = get_async_role_service().get_user_role_level(user_id, tenant_id)
+            if email_lookup:
+                _, user_level = await asyncio.gather(_lookup_email(user_id), role_lookup)
+            else:
+                user_level = await role_lookup
+
+            if user_level is None:
+                return jsonify({'success': False, 'error': 'User not found in tenant'}), 403
+
+            if user_level < min_level:
+                return (
+                    jsonify({
+                        'success': False,
+                        'error': f'Insufficient permissions - Requires role level {min_level} or higher',
+                    }),
+                    403,
+                )
+
+            request.tenant_id = tenant_id
+            request.user_level = user_level
+
+            return await f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
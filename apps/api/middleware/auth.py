@@ -4,12 +4,83 @@ Authentication Middleware - JWT verification and Firebase Auth integration
 
 from functools import wraps
 from flask import request, jsonify
-from firebase_admin import auth as firebase_auth
 import jwt
 import os
 
+from observability import metrics
+from observability.profiler import profile_authenticated
+from observability.tracing import TracedCalls, span
+from startup import ensure_firebase, lazy_import
 from services.auth_service import get_auth_service
 from services.role_service import get_role_service
+from storage.instrumented import ReadBudgetExceeded
+
+firebase_auth = TracedCalls(lazy_import('firebase_admin.auth', before=ensure_firebase), 'firebase_auth')
+
+TOKEN_VERIFICATIONS = metrics.counter(
+    'auth_token_verifications_total', 'Bearer token verifications by method and result', ('method', 'result')
+)
+
+
+def _authenticate():
+    """
+    Verify the bearer token of the current request
+
+    Returns:
+        Error response (body, status) when authentication failed, otherwise None
+        with request.user_id (and request.user_email when known) set
+    """
+    auth_header = request.headers.get('Authorization')
+
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({'success': False, 'error': 'Unauthorized - No token provided'}), 401
+
+    token = auth_header.split('Bearer ')[1]
+
+    try:
+        # Try to verify as Firebase ID token first
+        decoded_token = firebase_auth.verify_id_token(token)
+        request.user_id = decoded_token['uid']
+        request.user_email = decoded_token.get('email')
+        TOKEN_VERIFICATIONS.inc(('firebase', 'ok'))
+        return None
+    except Exception as firebase_error:
+        # If Firebase verification fails, try JWT
+        try:
+            auth_service = get_auth_service()
+            payload = auth_service.verify_token(token)
+
+            if not payload:
+                TOKEN_VERIFICATIONS.inc(('jwt', 'invalid'))
+                return jsonify({'success': False, 'error': 'Invalid or expired token'}), 401
+
+            if payload.get('type') != 'access':
+                TOKEN_VERIFICATIONS.inc(('jwt', 'wrong_type'))
+                return jsonify({'success': False, 'error': 'Invalid token type'}), 401
+
+            request.user_id = payload.get('user_id')
+            TOKEN_VERIFICATIONS.inc(('jwt', 'ok'))
+
+            # Get user email from database (email field only)
+            user = auth_service.get_user_email(request.user_id)
+            if user:
+                request.user_email = user.get('email')
+
+            return None
+
+        except ReadBudgetExceeded:
+            raise
+        except Exception as jwt_error:
+            TOKEN_VERIFICATIONS.inc(('jwt', 'error'))
+            return (
+                jsonify(
+                    {
+                        'success': False,
+                        'error': 'Invalid token - authentication failed',
+                    }
+                ),
+                401,
+            )
 
 
 def require_auth(f):
@@ -26,52 +97,63 @@ def require_auth(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
-
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'success': False, 'error': 'Unauthorized - No token provided'}), 401
-
-        token = auth_header.split('Bearer ')[1]
-
-        try:
-            # Try to verify as Firebase ID token first
-            decoded_token = firebase_auth.verify_id_token(token)
-            request.user_id = decoded_token['uid']
-            request.user_email = decoded_token.get('email')
-            return f(*args, **kwargs)
-        except Exception as firebase_error:
-            # If Firebase verification fails, try JWT
-            try:
-                auth_service = get_auth_service()
-                payload = auth_service.verify_token(token)
-
-                if not payload:
-                    return jsonify({'success': False, 'error': 'Invalid or expired token'}), 401
-
-                if payload.get('type') != 'access':
-                    return jsonify({'success': False, 'error': 'Invalid token type'}), 401
-
-                request.user_id = payload.get('user_id')
-
-                # Get user email from database
-                user = auth_service.get_user(request.user_id)
-                if user:
-                    request.user_email = user.get('email')
+        with span('require_auth'):
+            error = _authenticate()
+        if error is not None:
+            return error
+        profile_authenticated()
+        return f(*args, **kwargs)
 
-                return f(*args, **kwargs)
+    return decorated_function
 
-            except Exception as jwt_error:
-                return (
-                    jsonify(
-                        {
-                            'success': False,
-                            'error': 'Invalid token - authentication failed',
-                        }
-                    ),
-                    401,
-                )
 
-    return decorated_function
+def _check_role_level(min_level: int, tenant_param: str):
+    """Error response (body, status) unless the user has min_level in the request's tenant"""
+    # Ensure user is authenticated
+    if not hasattr(request, 'user_id'):
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'Unauthorized - Authentication required',
+                }
+            ),
+            401,
+        )
+
+    # Get tenant ID from request
+    tenant_id = request.args.get(tenant_param) or request.json.get(tenant_param)
+    if not tenant_id:
+        return (
+            jsonify({'success': False, 'error': f'Missing required parameter: {tenant_param}'}),
+            400,
+        )
+
+    # Check user's role level in tenant
+    role_service = get_role_service()
+    user_level = role_service.get_user_role_level(request.user_id, tenant_id)
+
+    if user_level is None:
+        return (
+            jsonify({'success': False, 'error': 'User not found in tenant'}),
+            403,
+        )
+
+    if user_level < min_level:
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Insufficient permissions - Requires role level {min_level} or higher',
+                }
+            ),
+            403,
+        )
+
+    # Add tenant_id to request for convenience
+    request.tenant_id = tenant_id
+    request.user_level = user_level
+    return None
 
 
 def require_role_level(min_level: int, tenant_param: str = 'tenantId'):
@@ -93,51 +175,11 @@ def require_role_level(min_level: int, tenant_param: str = 'tenantId'):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Ensure user is authenticated
-            if not hasattr(request, 'user_id'):
-                return (
-                    jsonify(
-                        {
-                            'success': False,
-                            'error': 'Unauthorized - Authentication required',
-                        }
-                    ),
-                    401,
-                )
-
-            # Get tenant ID from request
-            tenant_id = request.args.get(tenant_param) or request.json.get(tenant_param)
-            if not tenant_id:
-                return (
-                    jsonify({'success': False, 'error': f'Missing required parameter: {tenant_param}'}),
-                    400,
-                )
-
-            # Check user's role level in tenant
-            role_service = get_role_service()
-            user_level = role_service.get_user_role_level(request.user_id, tenant_id)
-
-            if user_level is None:
-                return (
-                    jsonify({'success': False, 'error': 'User not found in tenant'}),
-                    403,
-                )
-
-            if user_level < min_level:
-                return (
-                    jsonify(
-                        {
-                            'success': False,
-                            'error': f'Insufficient permissions - Requires role level {min_level} or higher',
-                        }
-                    ),
-                    403,
-                )
-
-            # Add tenant_id to request for convenience
-            request.tenant_id = tenant_id
-            request.user_level = user_level
-
+            with span('require_role_level', min_level=min_level):
+                error = _check_role_level(min_level, tenant_param)
+            if error is not None:
+                return error
+            profile_authenticated()
             return f(*args, **kwargs)
 
         return decorated_function
@@ -145,6 +187,45 @@ def require_role_level(min_level: int, tenant_param: str = 'tenantId'):
     return decorator
 
 
+def _check_permission(permission_name: str, tenant_param: str):
+    """Error response (body, status) unless the user holds permission_name in the request's tenant"""
+    # Ensure user is authenticated
+    if not hasattr(request, 'user_id'):
+        return (
+            jsonify({'success': False, 'error': 'Unauthorized'}),
+            401,
+        )
+
+    # Get tenant ID
+    tenant_id = request.args.get(tenant_param) or request.json.get(tenant_param)
+    if not tenant_id:
+        return (
+            jsonify({'success': False, 'error': f'Missing parameter: {tenant_param}'}),
+            400,
+        )
+
+    # Check permission
+    role_service = get_role_service()
+    has_permission = role_service.can_user_perform(
+        request.user_id, tenant_id, permission_name
+    )
+
+    if not has_permission:
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Insufficient permissions - Requires {permission_name}',
+                }
+            ),
+            403,
+        )
+
+    # Add tenant_id to request
+    request.tenant_id = tenant_id
+    return None
+
+
 def require_permission(permission_name: str, tenant_param: str = 'tenantId'):
     """
     Decorator to require specific permission in a tenant
@@ -164,41 +245,11 @@ def require_permission(permission_name: str, tenant_param: str = 'tenantId'):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Ensure user is authenticated
-            if not hasattr(request, 'user_id'):
-                return (
-                    jsonify({'success': False, 'error': 'Unauthorized'}),
-                    401,
-                )
-
-            # Get tenant ID
-            tenant_id = request.args.get(tenant_param) or request.json.get(tenant_param)
-            if not tenant_id:
-                return (
-                    jsonify({'success': False, 'error': f'Missing parameter: {tenant_param}'}),
-                    400,
-                )
-
-            # Check permission
-            role_service = get_role_service()
-            has_permission = role_service.can_user_perform(
-                request.user_id, tenant_id, permission_name
-            )
-
-            if not has_permission:
-                return (
-                    jsonify(
-                        {
-                            'success': False,
-                            'error': f'Insufficient permissions - Requires {permission_name}',
-                        }
-                    ),
-                    403,
-                )
-
-            # Add tenant_id to request
-            request.tenant_id = tenant_id
-
+            with span('require_permission', permission=permission_name):
+                error = _check_permission(permission_name, tenant_param)
+            if error is not None:
+                return error
+            profile_authenticated()
             return f(*args, **kwargs)
 
         return decorated_function
@@ -0,0 +1,177 @@
+"""
+Compression Middleware - Negotiated gzip/brotli response compression
+Buffered bodies below COMPRESS_MIN_SIZE and non-text content types are sent as
+is; streamed responses (generators, send_file) are compressed chunk by chunk
+without being buffered, and flushed after every chunk so each one reaches the
+client as soon as it is produced. Brotli is used when the `brotli` package is installed
+and preferred by the client.
+
+Configuration (environment):
+    COMPRESS_ENABLED      true/false (default: true)
+    COMPRESS_MIN_SIZE     Minimum body size in bytes (default: 1024)
+    COMPRESS_GZIP_LEVEL   1-9 (default: 5)
+    COMPRESS_BR_LEVEL     0-11 (default: 4)
+"""
+
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, request
+
+try:
+    import brotli
+except ImportError:  # Optional dependency: gzip only
+    brotli = None
+
+# Types worth compressing (prefix match); images, archives, PDFs are already compressed
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/problem+json',
+    'image/svg+xml',
+)
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encodings) -> Optional[str]:
+    """
+    Pick the encoding for a request
+
+    Args:
+        accept_encodings: Parsed Accept-Encoding header (werkzeug Accept)
+
+    Returns:
+        'br', 'gzip' or None
+    """
+    return accept_encodings.best_match(ENCODINGS)
+
+
+class _Compressor:
+    """Incremental compressor with a common process/flush/finish interface"""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=level, mode=brotli.MODE_TEXT)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def process(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        """Output everything processed so far (the stream stays open)"""
+        if self._brotli is not None:
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """Compress a whole body"""
+    compressor = _Compressor(encoding, level)
+    return compressor.process(data) + compressor.finish()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int) -> Iterator[bytes]:
+    """Compress an iterable of chunks lazily, flushing per chunk (closes the source when done)"""
+    compressor = _Compressor(encoding, level)
+    try:
+        for chunk in chunks:
+            out = compressor.process(chunk if isinstance(chunk, bytes) else chunk.encode())
+            out += compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class Compression:
+    """
+    Flask extension compressing responses (see module docstring)
+
+    Usage:
+        compression = Compression()
+        compression.init_app(app)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+        self.min_size = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+        self.levels = {
+            'gzip': int(os.getenv('COMPRESS_GZIP_LEVEL', 5)),
+            'br': int(os.getenv('COMPRESS_BR_LEVEL', 4)),
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        if self.enabled:
+            app.after_request(self.after_request)
+
+    def choose_encoding(self, method: str, accept_encodings, response, size: Optional[int]) -> Optional[str]:
+        """
+        Encoding to apply to a response, or None to send it as is
+
+        Adds `Vary: Accept-Encoding` to every compressible response.
+
+        Args:
+            size: Body size in bytes, None for streamed bodies
+        """
+        if (
+            method == 'HEAD'
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)
+        ):
+            return None
+
+        response.vary.add('Accept-Encoding')
+
+        if size is not None and size < self.min_size:
+            return None
+
+        return negotiate(accept_encodings)
+
+    def after_request(self, response):
+        streamed = response.is_streamed or response.direct_passthrough
+        size = None if streamed else response.calculate_content_length()
+        encoding = self.choose_encoding(request.method, request.accept_encodings, response, size)
+        if encoding is None:
+            return response
+
+        level = self.levels[encoding]
+        if streamed:
+            response.direct_passthrough = False
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress(response.get_data(), encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # Strong validators must differ between representations
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
@@ -5,7 +5,7 @@ Uses dynamic roleId references instead of hardcoded role enums
 """
 
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, TypedDict
 from datetime import datetime
 from enum import Enum
 
@@ -58,9 +58,17 @@ class User(BaseModel):
     emailVerified: bool = Field(default=False, description="Email verification status")
     profile: UserProfile = Field(..., description="User profile data")
 
-    # Multi-tenant memberships with role references
+    # Multi-tenant memberships with role references, keyed by tenantId
+    tenantMemberships: Dict[str, TenantMember] = Field(
+        default={}, description="Tenant memberships keyed by tenantId"
+    )
+    membershipsMigrated: bool = Field(
+        default=False, description="True once tenantMemberships is authoritative"
+    )
+
+    # Legacy membership array (read only until migrated to tenantMemberships)
     tenants: List[TenantMember] = Field(
-        default=[], description="List of tenant memberships"
+        default=[], description="List of tenant memberships (deprecated)"
     )
 
     # Platform-level status
@@ -80,6 +88,33 @@ class User(BaseModel):
         use_enum_values = True
 
 
+# Partial user reads (field-masked projections for hot paths)
+class TenantMemberData(TypedDict, total=False):
+    tenantId: str
+    userId: str
+    roleId: str
+    customPermissions: Optional[dict]
+    joinedAt: datetime
+    assignedBy: Optional[str]
+    status: str
+    expiresAt: Optional[datetime]
+
+
+class UserEmailView(TypedDict, total=False):
+    id: str
+    email: str
+
+
+class UserMembershipsView(TypedDict, total=False):
+    id: str
+    tenantMemberships: Dict[str, TenantMemberData]
+    membershipsMigrated: bool
+    tenants: List[TenantMemberData]
+
+
+USER_EMAIL_FIELDS = ('email',)
+
+
 # Registration Request
 class RegisterRequest(BaseModel):
     email: EmailStr = Field(..., description="User email")
@@ -0,0 +1,4 @@
+"""
+Observability for TOKO ANAK BANGSA API
+Metrics (Prometheus text format) and request instrumentation
+"""
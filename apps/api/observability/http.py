@@ -0,0 +1,71 @@
+"""
+HTTP metrics - Per-blueprint/per-route request counts, latency and in-flight requests
+Routes are labelled by URL rule (e.g. /api/roles/<role_id>), never by raw path,
+so label cardinality stays bounded.
+"""
+
+import time
+
+from flask import Flask, g, request
+
+from observability import metrics
+
+REQUESTS = metrics.counter(
+    'http_requests_total', 'HTTP requests by route and status', ('blueprint', 'route', 'method', 'status')
+)
+LATENCY = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('blueprint', 'route', 'method')
+)
+IN_FLIGHT = metrics.gauge('http_requests_in_flight', 'HTTP requests being handled', ('blueprint',))
+RATE_LIMITED = metrics.counter(
+    'rate_limit_rejections_total', 'Requests rejected by the rate limiter (429)', ('blueprint', 'route')
+)
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def route_labels(request) -> tuple:
+    """(blueprint, route) labels of a Flask or Quart request"""
+    rule = request.url_rule
+    return (request.blueprint or 'app', rule.rule if rule is not None else UNMATCHED_ROUTE)
+
+
+def record_request(blueprint: str, route: str, method: str, status: int, elapsed: float) -> None:
+    """Record a finished request (latency in seconds)"""
+    LATENCY.observe(elapsed, (blueprint, route, method))
+    REQUESTS.inc((blueprint, route, method, str(status)))
+    if status == 429:
+        RATE_LIMITED.inc((blueprint, route))
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    IN_FLIGHT.inc((request.blueprint or 'app',))
+
+
+def _after_request(response):
+    g._metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+
+    blueprint, route = route_labels(request)
+    IN_FLIGHT.dec((blueprint,))
+    record_request(blueprint, route, request.method, g.pop('_metrics_status', 500), elapsed)
+
+
+def instrument_app(app: Flask) -> None:
+    """
+    Record request metrics for every route of the app
+
+    Register before other before_request hooks (e.g. the rate limiter) so
+    rejected requests are counted too.
+    """
+    app.before_request_funcs.setdefault(None, []).insert(0, _before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
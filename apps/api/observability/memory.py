@@ -0,0 +1,217 @@
+"""
+Memory profiling - tracemalloc snapshots, allocation diffs and structure sizes
+tracemalloc is off until the first snapshot is requested (tracing costs CPU and
+memory on every allocation), or from startup with PYTHONTRACEMALLOC=<frames>.
+Snapshots are kept per process (the last MEMORY_SNAPSHOTS, default 5), so each
+new one can be diffed against the previous to see which allocation sites grew.
+
+deep_size() gives approximate retained sizes of caches and other long-lived
+structures, so a regression can be tied to e.g. the role cache.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+MAX_WALK = 1_000_000  # Objects visited per deep_size() call
+
+# Allocation sites in these files are the profiler's own bookkeeping
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def deep_size(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Approximate bytes retained by obj and everything it references
+
+    Follows containers, mapping proxies, pydantic models and plain objects.
+    Pass the same `seen` set across calls to count shared objects once.
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack and len(seen) < MAX_WALK:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, type):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, (dict, MappingProxyType)):
+            for key, value in current.items():
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif isinstance(current, BaseModel):
+            stack.append(current.__dict__)
+        elif hasattr(current, '__dict__') and not callable(current):
+            stack.append(current.__dict__)
+    return size
+
+
+def process_memory() -> Dict[str, Any]:
+    """Resident set size and GC state of this process"""
+    info: Dict[str, Any] = {'pid': os.getpid()}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key, value = line.split(':', 1)
+                    info['rssBytes' if key == 'VmRSS' else 'peakRssBytes'] = int(value.split()[0]) * 1024
+    except OSError:
+        import resource
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        info['peakRssBytes'] = peak if sys.platform == 'darwin' else peak * 1024
+    info['gcObjects'] = len(gc.get_objects())
+    info['gcCounts'] = gc.get_count()
+    return info
+
+
+def structure_sizes() -> Dict[str, Dict[str, int]]:
+    """Approximate sizes of the service-level caches and replicas"""
+    sizes: Dict[str, Dict[str, int]] = {}
+
+    from services import role_service
+    # Only measure a service that exists; never create one for a report
+    if role_service._role_service_instance is not None:
+        sizes.update(role_service._role_service_instance.memory_usage())
+
+    from services.cache import registered_caches
+    for cache in registered_caches():
+        if cache.name not in sizes:
+            sizes[cache.name] = cache.memory_usage()
+    return sizes
+
+
+def _stat(stat) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    entry = {
+        'site': f"{frame.filename}:{frame.lineno}",
+        'sizeBytes': stat.size,
+        'count': stat.count,
+    }
+    if hasattr(stat, 'size_diff'):
+        entry['sizeDiffBytes'] = stat.size_diff
+        entry['countDiff'] = stat.count_diff
+    if len(stat.traceback) > 1:
+        entry['traceback'] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+    return entry
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots of this process"""
+
+    def __init__(self, keep: Optional[int] = None):
+        self.snapshots: deque = deque(maxlen=keep or int(os.getenv('MEMORY_SNAPSHOTS', 5)))
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            print(f"🧠 tracemalloc started ({frames} frame{'s' if frames > 1 else ''})")
+
+    def stop(self) -> None:
+        """Stop tracing and drop the snapshots (frees tracemalloc's own memory)"""
+        with self._lock:
+            self.snapshots.clear()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+                print("🧠 tracemalloc stopped")
+
+    def snapshot(self, limit: int = 20, group_by: str = 'lineno', frames: int = 1) -> Dict[str, Any]:
+        """
+        Take a snapshot and report the top allocation sites
+
+        Starts tracing on first use: that first snapshot only sees allocations
+        made after it, so diffs become meaningful from the second one on.
+
+        Args:
+            limit: Allocation sites reported
+            group_by: 'lineno', 'filename' or 'traceback'
+            frames: Frames stored per allocation if tracing is started now
+        """
+        with self._lock:
+            started = not tracemalloc.is_tracing()
+            self.start(frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            taken_at = time.time()
+
+            previous = self.snapshots[-1] if self.snapshots else None
+            self.snapshots.append((taken_at, snapshot))
+
+            traced, peak = tracemalloc.get_traced_memory()
+            result: Dict[str, Any] = {
+                'pid': os.getpid(),
+                'takenAt': taken_at,
+                'tracingStarted': started,
+                'tracedBytes': traced,
+                'tracedPeakBytes': peak,
+                'tracemallocOverheadBytes': tracemalloc.get_tracemalloc_memory(),
+                'top': [_stat(stat) for stat in snapshot.statistics(group_by)[:limit]],
+            }
+            if previous is not None:
+                result['diff'] = {
+                    'sinceSeconds': round(taken_at - previous[0], 1),
+                    'top': [_stat(stat) for stat in snapshot.compare_to(previous[1], group_by)[:limit]],
+                }
+            return result
+
+    def report(self, limit: int = 20, group_by: str = 'lineno') -> Dict[str, Any]:
+        """Process memory and structure sizes, plus a snapshot when tracing"""
+        result: Dict[str, Any] = {
+            'process': process_memory(),
+            'structures': structure_sizes(),
+            'tracing': tracemalloc.is_tracing(),
+            'snapshots': len(self.snapshots),
+        }
+        if tracemalloc.is_tracing():
+            result['snapshot'] = self.snapshot(limit, group_by)
+        return result
+
+
+profiler = MemoryProfiler()
+
+
+def format_report(report: Dict[str, Any], limit: int = 20) -> List[str]:
+    """Human-readable lines of a report()/snapshot() result (used by the CLI)"""
+    lines = []
+    process = report.get('process')
+    if process:
+        rss = process.get('rssBytes', process.get('peakRssBytes', 0))
+        lines.append(f"🧠 pid {process['pid']}: RSS {rss / 2**20:.1f} MiB, {process['gcObjects']} GC objects")
+
+    for name, size in (report.get('structures') or {}).items():
+        lines.append(f"  📦 {name:<16} {size['entries']:>8} entries  {size['bytes'] / 2**10:>10.1f} KiB")
+
+    snapshot = report.get('snapshot', report if 'top' in report else None)
+    if snapshot:
+        lines.append(f"  traced {snapshot['tracedBytes'] / 2**20:.1f} MiB (peak {snapshot['tracedPeakBytes'] / 2**20:.1f} MiB)")
+        lines.append("  Top allocation sites:")
+        for stat in snapshot['top'][:limit]:
+            lines.append(f"    {stat['sizeBytes'] / 2**10:>10.1f} KiB {stat['count']:>8}  {stat['site']}")
+        diff = snapshot.get('diff')
+        if diff:
+            lines.append(f"  Growth over the last {diff['sinceSeconds']}s:")
+            for stat in diff['top'][:limit]:
+                lines.append(
+                    f"    {stat['sizeDiffBytes'] / 2**10:>+10.1f} KiB {stat['countDiff']:>+8}  {stat['site']}"
+                )
+    return lines
@@ -0,0 +1,255 @@
+"""
+Metrics - Counters, gauges and histograms rendered in Prometheus text format
+Hot-path updates never take a lock: every thread writes to its own shard (a
+plain dict owned by that thread), and shards are summed when /internal/metrics
+is scraped. Only a thread's first update of a metric registers its shard; when
+the thread (or greenlet) exits, its shard is folded into the metric's base
+totals, so short-lived threads do not pile up shards.
+"""
+
+import bisect
+import threading
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+# Latency buckets in seconds (Prometheus client defaults, plus 1 ms and 2.5 ms)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        """(suffix, label values, extra label, value) tuples"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for suffix, labels, extra, value in self.samples():
+            lines.append(
+                f'{self.name}{suffix}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}'
+            )
+        return lines
+
+
+class _ShardOwner:
+    """Lives in a thread's local storage; collected when the thread exits"""
+
+    __slots__ = ('__weakref__',)
+
+
+class _Sharded(_Metric):
+    """Metric whose values live in per-thread dicts"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._local = threading.local()
+        self._shards: Dict[int, dict] = {}  # id(shard) -> shard of a live thread
+        self._base: dict = {}  # Totals of exited threads (entries replaced, never mutated)
+        self._lock = threading.Lock()  # Shard registration, retirement and snapshots
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            owner = self._local.owner = _ShardOwner()
+            with self._lock:
+                self._shards[id(values)] = values
+            weakref.finalize(owner, self._retire, values)
+            return values
+
+    def _retire(self, values: dict) -> None:
+        """Fold the shard of an exited thread into the base totals"""
+        with self._lock:
+            self._shards.pop(id(values), None)
+            for labels, value in values.items():
+                previous = self._base.get(labels)
+                self._base[labels] = value if previous is None else self._merge(previous, value)
+
+    def _merge(self, a, b):
+        """New value combining two shard entries"""
+        raise NotImplementedError
+
+    def _snapshots(self) -> List[dict]:
+        with self._lock:
+            shards = [dict(self._base), *(dict(shard) for shard in self._shards.values())]
+        return shards
+
+
+class Counter(_Sharded):
+    """Monotonic counter"""
+
+    type = 'counter'
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, a: float, b: float) -> float:
+        return a + b
+
+    def values(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self):
+        for labels, value in sorted(self.values().items()):
+            yield '', labels, '', value
+
+
+class Gauge(Counter):
+    """Up/down gauge (e.g. requests in flight); per-thread deltas are summed"""
+
+    type = 'gauge'
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Sharded):
+    """Bucketed distribution (cumulative buckets, _sum and _count)"""
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # [count per bucket (+Inf last), sum]
+            entry = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def _merge(self, a: list, b: list) -> list:
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1]]
+
+    def samples(self):
+        merged: Dict[Labels, list] = {}
+        for shard in self._snapshots():
+            for labels, (counts, total) in shard.items():
+                target = merged.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0])
+                target[0] = [a + b for a, b in zip(target[0], counts)]
+                target[1] += total
+
+        for labels, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield '_bucket', labels, f'le="{_format_value(bound)}"', cumulative
+            yield '_sum', labels, '', total
+            yield '_count', labels, '', cumulative
+
+
+class Callback(_Metric):
+    """Metric whose values are read from a function at scrape time"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        type: str = 'gauge',
+    ):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self.type = type
+
+    def samples(self):
+        for labels, value in sorted(self.fn().items()):
+            yield '', labels, '', value
+
+
+class Registry:
+    """Named metrics, rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; returns the already registered one of the same name"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"⚠️  Metric {metric.name} failed to render: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return registry.register(Gauge(name, help, labelnames))
+
+
+def histogram(
+    name: str, help: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None
+) -> Histogram:
+    return registry.register(Histogram(name, help, labelnames, buckets or DEFAULT_BUCKETS))
+
+
+def callback(
+    name: str,
+    help: str,
+    fn: Callable[[], Dict[Labels, float]],
+    labelnames: Sequence[str] = (),
+    type: str = 'gauge',
+) -> Callback:
+    return registry.register(Callback(name, help, fn, labelnames, type))
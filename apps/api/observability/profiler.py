@@ -0,0 +1,275 @@
+"""
+Request profiler - Sampling profiler for single, explicitly flagged requests
+A request carrying `X-Profile` is run with a sampler thread that records the
+handling thread's stack (sys._current_frames) every PROFILE_INTERVAL_MS. The
+profile is kept only if the request was authorized to be profiled:
+
+- `X-Profile: <expires>:<signature>`, signed with PROFILE_SECRET
+  (see scripts/sign_profile_request.py), or
+- `X-Profile: 1` from a user whose role level in the request's tenant is
+  super_admin. Nothing is sampled before authentication: the auth middleware
+  calls profile_authenticated() once it has resolved the user (and tenant),
+  and sampling starts there, so the profile covers the rest of the request.
+
+Any other header value is ignored without taking the profiler lock.
+
+Profiles are written to PROFILE_DIR when set (path returned in X-Profile-File),
+otherwise returned in place of the response body. `X-Profile-Format` selects
+`collapsed` (flamegraph.pl / speedscope import, default) or `speedscope`.
+Requests without the header only pay a header lookup.
+"""
+
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from flask import Flask, Response, g, request
+
+from models.role import RoleLevel
+from observability import metrics
+
+PROFILE_HEADER = 'X-Profile'
+FORMATS = ('collapsed', 'speedscope')
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+PROFILES = metrics.counter('request_profiles_total', 'Profiled requests by outcome', ('outcome',))
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+# Only one request per process is profiled at a time
+_active = threading.Lock()
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return (getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _short_path(path: str) -> str:
+    for marker in ('site-packages' + os.sep, 'lib' + os.sep + 'python'):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return os.path.relpath(path) if os.path.isabs(path) else path
+
+
+class Sampler:
+    """Samples one thread's stack from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()  # stack (root first) -> seconds
+        self.count = 0
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._switch_interval = 0.0
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self) -> None:
+        # The sampler only runs when the GIL is handed over, which happens every
+        # switch interval (5ms by default): shorten it while profiling
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            # Weight by the real time since the previous sample (GIL switches stretch it)
+            self.samples[tuple(reversed(stack))] += now - last
+            self.count += 1
+            last = now
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format, weights in microseconds"""
+        lines = []
+        for stack, seconds in self.samples.most_common():
+            names = ';'.join(f"{name} ({_short_path(path)}:{line})" for name, path, line in stack)
+            lines.append(f"{names} {max(int(seconds * 1e6), 1)}")
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self, name: str) -> dict:
+        """speedscope.app file format (sampled profile, milliseconds)"""
+        frames: List[dict] = []
+        index: Dict[Frame, int] = {}
+        samples = []
+        weights = []
+        for stack, seconds in self.samples.items():
+            sample = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    frames.append({'name': key[0], 'file': _short_path(key[1]), 'line': key[2]})
+                sample.append(index[key])
+            samples.append(sample)
+            weights.append(round(seconds * 1000, 3))
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': name,
+            'exporter': 'toko-api',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(sum(weights), 3),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+def sign(path: str, expires: int, secret: str) -> str:
+    """X-Profile value authorizing profiling of `path` until `expires` (unix time)"""
+    signature = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}:{signature}"
+
+
+def verify_signature(value: str, path: str, secret: Optional[str]) -> bool:
+    if not secret or ':' not in value:
+        return False
+    expires, _ = value.split(':', 1)
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(value, sign(path, int(expires), secret))
+
+
+def is_super_admin() -> bool:
+    """Whether the authenticated user of the current request is super_admin in its tenant"""
+    user_id = getattr(request, 'user_id', None)
+    tenant_id = getattr(request, 'tenant_id', None) or request.args.get('tenantId')
+    if not user_id or not tenant_id:
+        return False
+
+    from services.role_service import get_role_service
+    level = get_role_service().get_user_role_level(user_id, tenant_id)
+    return level is not None and level >= RoleLevel.SUPER_ADMIN
+
+
+def profile_authenticated() -> None:
+    """
+    Start a pending `X-Profile: 1` profile if the now authenticated user is super_admin
+
+    Called by the auth decorators (middleware/auth.py) after they set
+    request.user_id / request.tenant_id; a no-op for every other request.
+    """
+    profiler = g.get('_profile_pending')
+    if profiler is None or not is_super_admin():
+        return
+    g.pop('_profile_pending', None)
+    profiler._start()
+
+
+class RequestProfiler:
+    """Flask extension profiling requests flagged with X-Profile"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.secret = os.getenv('PROFILE_SECRET')
+        self.directory = os.getenv('PROFILE_DIR')
+        self.interval = float(os.getenv('PROFILE_INTERVAL_MS', 2)) / 1000
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        if os.getenv('PROFILING', 'true').lower() == 'false':
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        flag = request.headers.get(PROFILE_HEADER)
+        if not flag:
+            return
+
+        # Only a valid signature starts sampling before authentication; `1`
+        # waits for the auth middleware (profile_authenticated)
+        if verify_signature(flag, request.path, self.secret):
+            self._start()
+        elif flag == '1':
+            g._profile_pending = self
+        else:
+            PROFILES.inc(('denied',))
+
+    def _start(self) -> None:
+        if not _active.acquire(blocking=False):
+            PROFILES.inc(('busy',))
+            return
+
+        sampler = Sampler(threading.get_ident(), self.interval)
+        g._profile = sampler
+        sampler.start()
+
+    def _after_request(self, response):
+        sampler = g.pop('_profile', None)
+        if sampler is None:
+            if g.pop('_profile_pending', None) is not None:
+                PROFILES.inc(('denied',))  # `1` from a user that is not super_admin
+            return response
+        sampler.stop()
+        _active.release()
+
+        fmt = request.headers.get('X-Profile-Format', 'collapsed')
+        if fmt not in FORMATS:
+            fmt = 'collapsed'
+        name = f"{request.method} {request.path}"
+        if fmt == 'speedscope':
+            body = orjson.dumps(sampler.speedscope(name))
+            mimetype = 'application/json'
+        else:
+            body = sampler.collapsed().encode()
+            mimetype = 'text/plain'
+
+        print(
+            f"🔬 Profiled {name}: {sampler.count} samples over {sampler.elapsed * 1000:.1f}ms "
+            f"(user {getattr(request, 'user_id', None) or 'signed'})"
+        )
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            extension = 'speedscope.json' if fmt == 'speedscope' else 'collapsed.txt'
+            endpoint = (request.endpoint or 'unmatched').replace('.', '-')
+            path = os.path.join(self.directory, f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{os.getpid()}.{extension}")
+            with open(path, 'wb') as f:
+                f.write(body)
+            response.headers['X-Profile-File'] = path
+            PROFILES.inc(('file',))
+            return response
+
+        PROFILES.inc(('inline',))
+        profiled = Response(body, mimetype=mimetype)
+        profiled.headers['X-Profile-Status'] = str(response.status_code)
+        profiled.headers['X-Profile-Samples'] = str(sampler.count)
+        response.close()
+        return profiled
+
+    def _teardown_request(self, exc):
+        # Request failed before after_request ran
+        g.pop('_profile_pending', None)
+        sampler = g.pop('_profile', None)
+        if sampler is not None:
+            sampler.stop()
+            _active.release()
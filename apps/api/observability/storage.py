@@ -0,0 +1,144 @@
+"""
+Storage accounting - Per-request Firestore reads/writes, N+1 detection and read budgets
+Every request runs with an Accounting (storage/instrumented.py) made current.
+When the response is ready, the totals are exported as metrics and, with
+SERVER_TIMING=true, as a Server-Timing header. Repeated single-document gets
+and unbounded queries are logged, and reads are checked against the route's
+read budget.
+
+Configuration (environment):
+    SERVER_TIMING         true/false: add `Server-Timing: storage;dur=..;desc=".."`
+    READ_BUDGETS          Per-endpoint document read budgets, e.g.
+                          "roles.list_roles=5,roles.get_users_with_role=500,default=100"
+    READ_BUDGET_MODE      log (default) or reject (the read that would exceed the
+                          budget raises ReadBudgetExceeded and the request gets 503)
+    N_PLUS_ONE_THRESHOLD  Single gets on one collection flagged as N+1 (default: 5)
+"""
+
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, g, jsonify, request
+
+from observability import metrics
+from observability.http import route_labels
+from storage.instrumented import Accounting, ReadBudgetExceeded, start_accounting, stop_accounting
+
+READS = metrics.counter('storage_reads_total', 'Billed document reads by route', ('blueprint', 'route'))
+WRITES = metrics.counter('storage_writes_total', 'Document writes by route', ('blueprint', 'route'))
+READS_PER_REQUEST = metrics.histogram(
+    'storage_reads_per_request', 'Billed document reads per request', ('blueprint', 'route'),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+FINDINGS = metrics.counter(
+    'storage_findings_total', 'Read patterns flagged (n_plus_one, repeated_get, unbounded_query)',
+    ('blueprint', 'route', 'kind'),
+)
+BUDGET_VIOLATIONS = metrics.counter(
+    'storage_read_budget_violations_total', 'Requests that exceeded their read budget', ('blueprint', 'route')
+)
+
+
+def parse_budgets(value: str) -> Dict[str, int]:
+    """'endpoint=reads,...' -> {endpoint: reads}"""
+    budgets = {}
+    for item in value.split(','):
+        if '=' in item:
+            endpoint, reads = item.split('=', 1)
+            budgets[endpoint.strip()] = int(reads)
+    return budgets
+
+
+def findings(accounting: Accounting, n_plus_one_threshold: int) -> List[Tuple[str, str]]:
+    """(kind, message) for every suspicious read pattern of a request"""
+    found = []
+
+    per_collection: Counter = Counter()
+    for (collection, doc_id), count in accounting.single_gets.items():
+        per_collection[collection] += count
+        if count > 1:
+            found.append(('repeated_get', f"{collection}/{doc_id} read {count} times"))
+
+    for collection, count in per_collection.items():
+        if count >= n_plus_one_threshold:
+            found.append(('n_plus_one', f"{count} single-document gets on {collection} (batch them with get_all)"))
+
+    for query in accounting.unbounded_queries:
+        scope = 'filtered query' if query['filtered'] else 'full collection scan'
+        found.append((
+            'unbounded_query',
+            f"{scope} on {query['collection']} without limit returned {query['documents']} documents",
+        ))
+
+    return found
+
+
+class StorageAccounting:
+    """Flask extension making an Accounting current for every request"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.server_timing = os.getenv('SERVER_TIMING', 'false').lower() == 'true'
+        self.budgets = parse_budgets(os.getenv('READ_BUDGETS', ''))
+        self.enforce = os.getenv('READ_BUDGET_MODE', 'log').lower() == 'reject'
+        self.n_plus_one_threshold = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.register_error_handler(ReadBudgetExceeded, self._budget_exceeded_response)
+
+    @staticmethod
+    def _budget_exceeded_response(error=None):
+        response = jsonify({'success': False, 'error': 'Read budget exceeded'})
+        response.status_code = 503
+        return response
+
+    def _before_request(self):
+        budget = self.budgets.get(request.endpoint, self.budgets.get('default'))
+        accounting = Accounting(read_budget=budget, enforce=self.enforce)
+        g._storage_accounting = (start_accounting(accounting), accounting)
+
+    def _after_request(self, response):
+        state = g.get('_storage_accounting')
+        if state is None:
+            return response
+        accounting = state[1]
+
+        labels = route_labels(request)
+        READS.inc(labels, accounting.reads)
+        WRITES.inc(labels, accounting.writes)
+        READS_PER_REQUEST.observe(accounting.reads, labels)
+
+        for kind, message in findings(accounting, self.n_plus_one_threshold):
+            FINDINGS.inc(labels + (kind,))
+            print(f"⚠️  Storage [{request.endpoint}] {kind}: {message}")
+
+        if accounting.budget_exceeded:
+            BUDGET_VIOLATIONS.inc(labels)
+            print(
+                f"⚠️  Storage [{request.endpoint}] read budget exceeded: "
+                f"{accounting.reads} reads (budget {accounting.read_budget})"
+            )
+            # The refused read raised before reaching storage; a handler that
+            # caught it answered with an error, which becomes the 503. Responses
+            # of handlers that completed are never replaced.
+            if accounting.rejected and response.status_code >= 500:
+                response = self._budget_exceeded_response()
+
+        if self.server_timing:
+            response.headers.add(
+                'Server-Timing',
+                f'storage;dur={accounting.seconds * 1000:.1f};desc="calls={accounting.calls} '
+                f'reads={accounting.reads} docs={accounting.documents} writes={accounting.writes}"',
+            )
+
+        return response
+
+    def _teardown_request(self, exc):
+        state = g.pop('_storage_accounting', None)
+        if state is not None:
+            stop_accounting(state[0])
@@ -0,0 +1,491 @@
+"""
+Tracing - Request spans with W3C traceparent propagation and pluggable exporters
+Every request gets a server span, continued from an incoming `traceparent`
+header when there is one, and the trace is returned in `traceresponse`.
+Auth decorator stages, RoleService/AuthService methods (trace_methods) and
+storage / Firebase Auth calls open child spans, and Firestore RPCs carry the
+current span as `traceparent` metadata (with_trace_context). Child spans are only recorded
+under a sampled request span, so background threads and unsampled requests
+only pay a context variable lookup.
+
+Configuration (environment):
+    TRACE_EXPORTER        none (default, tracing off), file, otlp or console
+    TRACE_SAMPLE_RATE     Fraction of new traces sampled (default: 0.1); a sampled
+                          flag in an incoming traceparent is always honoured
+    TRACE_FILE            JSON-lines file of the file exporter (default: traces.jsonl)
+    OTLP_ENDPOINT         OTLP/HTTP JSON endpoint (default: http://localhost:4318/v1/traces)
+    TRACE_SERVICE_NAME    service.name resource attribute (default: toko-api)
+
+Other exporters can be plugged in with set_exporter().
+"""
+
+import functools
+import inspect
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from flask import Flask, g, request
+
+from observability import metrics
+from observability.http import route_labels
+
+TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+INVALID_TRACE_ID = '0' * 32
+INVALID_SPAN_ID = '0' * 16
+
+SPANS_DROPPED = metrics.counter('trace_spans_dropped_total', 'Spans dropped by the export queue', ())
+SPANS_EXPORTED = metrics.counter('trace_spans_exported_total', 'Spans handed to the exporter by result', ('result',))
+
+
+def _new_id(bits: int) -> str:
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent_span_id, sampled) of a W3C traceparent header, None if invalid"""
+    if not value:
+        return None
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == INVALID_TRACE_ID or span_id == INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+class Span:
+    """A timed operation of a trace"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'sampled',
+                 'start_ns', 'end_ns', 'attributes', 'error', '_token')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, kind: str = 'internal'):
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            _processor.submit(self)
+
+    def __enter__(self) -> 'Span':
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        _current.reset(self._token)
+        self.end()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'durationMs': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned when nothing is recorded"""
+
+    __slots__ = ()
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar('trace_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def with_trace_context(metadata: Sequence[Tuple[str, str]]) -> Sequence[Tuple[str, str]]:
+    """
+    Outgoing request metadata/headers plus the current span's traceparent
+
+    Returns metadata itself outside a request span; never mutates it.
+    """
+    current = _current.get()
+    if current is None:
+        return metadata
+    return [*metadata, ('traceparent', current.traceparent)]
+
+
+def span(name: str, kind: str = 'internal', **attributes):
+    """
+    Child span of the current span (a no-op outside a sampled trace)
+
+    Usage:
+        with span('firestore.get', collection='users') as s:
+            ...
+    """
+    parent = _current.get()
+    if parent is None or not parent.sampled:
+        return NOOP_SPAN
+    child = Span(name, parent.trace_id, parent.span_id, True, kind)
+    if attributes:
+        child.attributes.update(attributes)
+    return child
+
+
+def traced(name: str, kind: str = 'internal') -> Callable:
+    """Decorator running a function in a child span"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is None or not parent.sampled:
+                return fn(*args, **kwargs)
+            with Span(name, parent.trace_id, parent.span_id, True, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedCalls:
+    """
+    Proxy of a module whose functions run in client spans (`<prefix>.<function>`)
+
+    Usage:
+        auth = TracedCalls(lazy_import('firebase_admin.auth'), 'firebase_auth')
+        auth.verify_id_token(token)  # span 'firebase_auth.verify_id_token'
+    """
+
+    def __init__(self, target: Any, prefix: str):
+        self._target = target
+        self._prefix = prefix
+        self._wrapped: Dict[str, Callable] = {}
+
+    def __getattr__(self, attr: str) -> Any:
+        wrapped = self._wrapped.get(attr)
+        if wrapped is not None:
+            return wrapped
+        value = getattr(self._target, attr)
+        # Functions only: exception classes etc. are returned as they are
+        if inspect.isfunction(value) or inspect.isbuiltin(value):
+            wrapped = self._wrapped[attr] = traced(f"{self._prefix}.{attr}", 'client')(value)
+            return wrapped
+        return value
+
+
+def untraced(fn: Callable) -> Callable:
+    """Keep a public method out of trace_methods (hot helpers that would flood traces)"""
+    fn.__untraced__ = True
+    return fn
+
+
+def trace_methods(cls: type) -> type:
+    """Class decorator tracing every public method as `<Class>.<method>`"""
+    for attr, value in list(vars(cls).items()):
+        # Plain functions only: static/class methods and properties are left alone
+        if not attr.startswith('_') and inspect.isfunction(value) and not getattr(value, '__untraced__', False):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+# Exporters
+
+class SpanExporter:
+    """Receives batches of finished, sampled spans (from the export thread)"""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ConsoleExporter(SpanExporter):
+    """One line per span on stdout"""
+
+    def export(self, spans: List[Span]) -> None:
+        for s in spans:
+            indent = '  ' if s.parent_id else ''
+            print(f"🧵 {indent}{s.name} {(s.end_ns - s.start_ns) / 1e6:.2f}ms trace={s.trace_id[:8]}"
+                  f"{' error=' + s.error if s.error else ''}")
+
+
+class FileExporter(SpanExporter):
+    """JSON lines, one span per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = b''.join(orjson.dumps(s.as_dict(), default=str) + b'\n' for s in spans)
+        with self._lock, open(self.path, 'ab') as f:
+            f.write(lines)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class OtlpHttpExporter(SpanExporter):
+    """OTLP/HTTP with JSON encoding (an OpenTelemetry Collector or Jaeger on localhost)"""
+
+    KINDS = {'internal': 1, 'server': 2, 'client': 3}
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def _span(self, s: Span) -> Dict[str, Any]:
+        encoded = {
+            'traceId': s.trace_id,
+            'spanId': s.span_id,
+            'name': s.name,
+            'kind': self.KINDS.get(s.kind, 1),
+            'startTimeUnixNano': str(s.start_ns),
+            'endTimeUnixNano': str(s.end_ns),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+            'status': {'code': 2, 'message': s.error} if s.error else {'code': 0},
+        }
+        if s.parent_id:
+            encoded['parentSpanId'] = s.parent_id
+        return encoded
+
+    def export(self, spans: List[Span]) -> None:
+        body = orjson.dumps({'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': self.service_name}},
+                {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}},
+            ]},
+            'scopeSpans': [{'scope': {'name': 'toko-api'}, 'spans': [self._span(s) for s in spans]}],
+        }]})
+        req = urllib.request.Request(
+            self.endpoint, data=body, method='POST', headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchProcessor:
+    """Queues finished spans and exports them in batches from a daemon thread"""
+
+    def __init__(self, max_queue: int = 2048, max_batch: int = 512, interval: float = 1.0):
+        self.exporter: Optional[SpanExporter] = None
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = 0
+        self._lock = threading.Lock()
+
+    def submit(self, finished: Span) -> None:
+        if self.exporter is None:
+            return
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            SPANS_DROPPED.inc()
+
+    def _start(self) -> None:
+        # Per process: threads do not survive gunicorn's fork
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self._queue.maxsize)
+            self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            self._export(batch)
+
+    def _export(self, batch: List[Span]) -> None:
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(batch)
+            SPANS_EXPORTED.inc(('ok',), len(batch))
+        except Exception as e:
+            SPANS_EXPORTED.inc(('error',), len(batch))
+            print(f"⚠️  Trace export failed ({type(exporter).__name__}): {e}")
+
+    def flush(self) -> None:
+        """Export queued spans now (in the calling thread)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._export(batch)
+
+
+_processor = BatchProcessor()
+
+
+def create_exporter(kind: Optional[str] = None) -> Optional[SpanExporter]:
+    """Exporter named by TRACE_EXPORTER (None when tracing is off)"""
+    kind = (kind or os.getenv('TRACE_EXPORTER', 'none')).lower()
+    if kind == 'file':
+        return FileExporter(os.getenv('TRACE_FILE', 'traces.jsonl'))
+    if kind == 'otlp':
+        return OtlpHttpExporter(
+            os.getenv('OTLP_ENDPOINT', 'http://localhost:4318/v1/traces'),
+            os.getenv('TRACE_SERVICE_NAME', 'toko-api'),
+        )
+    if kind == 'console':
+        return ConsoleExporter()
+    if kind == 'none':
+        return None
+    raise ValueError(f"Unknown trace exporter: {kind}")
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Plug in an exporter (None turns recording off)"""
+    previous = _processor.exporter
+    _processor.exporter = exporter
+    if previous is not None and previous is not exporter:
+        previous.shutdown()
+
+
+def flush() -> None:
+    _processor.flush()
+
+
+def tracing_enabled() -> bool:
+    """Whether an exporter is plugged in (TRACE_EXPORTER is not none)"""
+    return _processor.exporter is not None
+
+
+# Flask integration
+
+class Tracing:
+    """Flask extension opening a server span per request"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.sample_rate = float(os.getenv('TRACE_SAMPLE_RATE', 0.1))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        exporter = create_exporter()
+        if exporter is None:
+            return
+        set_exporter(exporter)
+        # First hook, so spans cover the rate limiter and the other before_request hooks
+        app.before_request_funcs.setdefault(None, []).insert(0, self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        g._trace_span = self.start_server_span(request)
+
+    def _after_request(self, response):
+        server_span = g.get('_trace_span')
+        if server_span is not None:
+            self.finish_response(server_span, response)
+        return response
+
+    def _teardown_request(self, exc):
+        server_span = g.pop('_trace_span', None)
+        if server_span is not None:
+            self.end_server_span(server_span, request, exc)
+
+    # Framework-neutral steps, shared with the async routes (asgi.py)
+
+    def start_server_span(self, req) -> Span:
+        """Open the server span of a request (Flask or Quart) and make it current"""
+        parent = parse_traceparent(req.headers.get('traceparent'))
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = _new_id(128), None, random.random() < self.sample_rate
+
+        server_span = Span(f"{req.method} {route_labels(req)[1]}", trace_id, parent_id, sampled, 'server')
+        server_span.attributes.update({'http.method': req.method, 'url.path': req.path})
+        server_span._token = _current.set(server_span)
+        return server_span
+
+    @staticmethod
+    def finish_response(server_span: Span, response) -> None:
+        server_span.set_attribute('http.status_code', response.status_code)
+        # W3C Trace Context Level 2: lets clients find the trace of their request
+        response.headers['traceresponse'] = server_span.traceparent
+
+    @staticmethod
+    def end_server_span(server_span: Span, req, exc: Optional[BaseException] = None) -> None:
+        if exc is not None:
+            server_span.record_exception(exc)
+        server_span.set_attribute('http.route', route_labels(req)[1])
+        server_span.set_attribute('tenant.id', getattr(req, 'tenant_id', None) or req.args.get('tenantId'))
+        server_span.set_attribute('user.id', getattr(req, 'user_id', None))
+        _current.reset(server_span._token)
+        server_span.end()
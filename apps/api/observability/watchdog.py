@@ -0,0 +1,166 @@
+"""
+Slow-request watchdog - Live stack capture of requests running past a threshold
+A daemon thread checks the in-flight requests every threshold / 4. A request
+running longer than SLOW_REQUEST_THRESHOLD_MS gets its handling thread's stack
+captured with sys._current_frames() and logged as one structured (JSON) record
+with route, tenant and user, again each time its running time doubles. This
+shows where a stuck request is blocked (a Firestore stream, a Python loop).
+
+Configuration (environment):
+    SLOW_REQUEST_WATCHDOG      true (default) / false
+    SLOW_REQUEST_THRESHOLD_MS  Running time before a request is reported (default: 5000)
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+import orjson
+from flask import Flask, request
+
+from observability import metrics
+from observability.http import route_labels
+
+MAX_STACK_DEPTH = 64
+
+SLOW_REQUESTS = metrics.counter(
+    'slow_requests_total', 'Requests that ran past the slow-request threshold', ('blueprint', 'route')
+)
+
+
+class _InFlight:
+    """A request being handled"""
+
+    __slots__ = ('thread_id', 'greenlet', 'request', 'started', 'method', 'path', 'labels', 'tenant_id', 'next_report')
+
+    def __init__(self, threshold: float):
+        self.thread_id = threading.get_ident()
+        # Under gevent the request runs in a greenlet, not in its own OS thread
+        self.greenlet = sys.modules['greenlet'].getcurrent() if 'gevent' in sys.modules else None
+        self.request = request._get_current_object()
+        self.started = time.monotonic()
+        self.method = request.method
+        self.path = request.path
+        self.labels = route_labels(request)
+        self.tenant_id = request.args.get('tenantId')
+        self.next_report = threshold
+
+    def frame(self, frames: Dict[int, Any]):
+        frame = frames.get(self.thread_id)
+        if frame is None and self.greenlet is not None:
+            frame = getattr(self.greenlet, 'gr_frame', None)
+        return frame
+
+    def context(self) -> Dict[str, Any]:
+        # Set by the auth decorators once the route has authenticated
+        return {
+            'tenantId': getattr(self.request, 'tenant_id', None) or self.tenant_id,
+            'userId': getattr(self.request, 'user_id', None),
+        }
+
+
+def log_record(severity: str, message: str, **fields) -> None:
+    """One JSON line on stdout (parsed as a structured log entry by Cloud Logging)"""
+    print(orjson.dumps({'severity': severity, 'message': message, **fields}, default=str).decode(), flush=True)
+
+
+def capture_stack(frame) -> List[Dict[str, Any]]:
+    """Frames of a stack, outermost first"""
+    return [
+        {'function': entry.name, 'file': entry.filename, 'line': entry.lineno, 'code': entry.line}
+        for entry in traceback.extract_stack(frame)[-MAX_STACK_DEPTH:]
+    ]
+
+
+class SlowRequestWatchdog:
+    """Tracks in-flight requests and logs the stacks of slow ones"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = os.getenv('SLOW_REQUEST_WATCHDOG', 'true').lower() != 'false'
+        self.threshold = float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', 5000)) / 1000
+        self._in_flight: Dict[int, _InFlight] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def start(self) -> None:
+        """Start the watchdog daemon thread (per process, after fork)"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='slow-request-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _before_request(self):
+        entry = _InFlight(self.threshold)
+        self._in_flight[id(entry.request)] = entry
+
+    def _teardown_request(self, exc):
+        entry = self._in_flight.pop(id(request._get_current_object()), None)
+        if entry is None or entry.next_report == self.threshold:
+            return
+
+        elapsed = time.monotonic() - entry.started
+        blueprint, route = entry.labels
+        log_record(
+            'WARNING',
+            f"🐢 Slow request {entry.method} {entry.path} finished after {elapsed:.1f}s",
+            event='slow_request_finished',
+            method=entry.method, path=entry.path, blueprint=blueprint, route=route,
+            elapsedMs=round(elapsed * 1000), error=repr(exc) if exc else None,
+            **entry.context(),
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.threshold / 4):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Slow-request watchdog error: {e}")
+
+    def check(self) -> int:
+        """Report requests past their next report time; returns how many were reported"""
+        now = time.monotonic()
+        # dict.copy() is atomic, request threads add and remove entries concurrently
+        slow = [entry for entry in self._in_flight.copy().values() if now - entry.started >= entry.next_report]
+        if not slow:
+            return 0
+
+        frames = sys._current_frames()
+        for entry in slow:
+            elapsed = now - entry.started
+            if entry.next_report == self.threshold:
+                SLOW_REQUESTS.inc(entry.labels)
+            # Report again each time the running time doubles
+            while entry.next_report <= elapsed:
+                entry.next_report *= 2
+
+            frame = entry.frame(frames)
+            blueprint, route = entry.labels
+            log_record(
+                'WARNING',
+                f"🐢 Slow request {entry.method} {entry.path} running for {elapsed:.1f}s",
+                event='slow_request',
+                method=entry.method, path=entry.path, blueprint=blueprint, route=route,
+                elapsedMs=round(elapsed * 1000), thresholdMs=round(self.threshold * 1000),
+                thread=entry.thread_id,
+                stack=capture_stack(frame) if frame is not None else None,
+                **entry.context(),
+            )
+        return len(slow)
+
+
+watchdog = SlowRequestWatchdog()
@@ -18,6 +18,7 @@ from models.user import (
     DeleteAccountRequest,
 )
 from services.auth_service import get_auth_service
+from routes.common import error_body
 from middleware.auth import require_auth
 from extensions import limiter
 
@@ -294,13 +295,13 @@ def get_current_user():
         user = auth_service.get_user(request.user_id)
 
         if not user:
-            return jsonify({'success': False, 'error': 'User not found'}), 404
+            return jsonify(error_body('User not found')), 404
 
         return jsonify({'success': True, 'data': {'user': user}})
 
     except Exception as e:
         print(f"Get user error: {e}")
-        return jsonify({'success': False, 'error': 'Failed to get user'}), 500
+        return jsonify(error_body('Failed to get user')), 500
 
 
 @auth_bp.route('/profile', methods=['PATCH'])
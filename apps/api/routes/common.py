@@ -0,0 +1,72 @@
+"""
+Shared request parsing and response building
+Used by both the Flask routes and their async variants (asgi.py), so the two
+execution modes validate queries and shape responses the same way. Helpers
+take werkzeug request args and return plain dicts, ready for either jsonify.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def error_body(message: str) -> Dict[str, Any]:
+    """Error response body"""
+    return {'success': False, 'error': message}
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() == 'true'
+
+
+def require_tenant_id(args) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Read the required tenantId query parameter
+
+    Returns:
+        (tenant_id, None), or (None, error body) if it is missing
+    """
+    tenant_id = args.get('tenantId')
+    if not tenant_id:
+        return None, error_body('tenantId is required')
+    return tenant_id, None
+
+
+def page_params(args) -> Tuple[int, int]:
+    """page (default 1) and limit (default 20) query parameters"""
+    return args.get('page', default=1, type=int), args.get('limit', default=20, type=int)
+
+
+def role_list_filters(args) -> Dict[str, Any]:
+    """Filters and pagination of GET /api/roles"""
+    page, limit = page_params(args)
+    return {
+        'isCustom': args.get('isCustom', type=_parse_bool) if args.get('isCustom') else None,
+        'isActive': args.get('isActive', type=_parse_bool) if args.get('isActive') else None,
+        'minLevel': args.get('minLevel', type=int),
+        'maxLevel': args.get('maxLevel', type=int),
+        'search': args.get('search'),
+        'page': page,
+        'limit': limit,
+    }
+
+
+def paginate(items: List[Any], page: int, limit: int) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Slice one page of items
+
+    Returns:
+        (items of the page, pagination meta)
+    """
+    start = (page - 1) * limit
+    end = start + limit
+    total = len(items)
+    return items[start:end], {
+        'total': total,
+        'page': page,
+        'limit': limit,
+        'hasNext': end < total
+    }
+
+
+def paginated_body(data: List[Any], meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Success response body of a paginated listing"""
+    return {'success': True, 'data': data, 'meta': meta}
@@ -0,0 +1,123 @@
+"""
+Operations Routes
+Instance lifecycle (warmup), internal metrics and memory profiling endpoints
+"""
+
+import hmac
+import os
+
+from flask import Blueprint, Response, jsonify, request
+
+from observability import metrics
+from observability.memory import profiler as memory_profiler
+from services.warmup import run_warmup
+from extensions import limiter
+
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+# Create Blueprint
+ops_bp = Blueprint('ops', __name__)
+
+
+def _is_internal_request() -> bool:
+    """Loopback clients (sidecar scrapers) or Bearer METRICS_TOKEN"""
+    if request.remote_addr in LOOPBACK_ADDRESSES and 'X-Forwarded-For' not in request.headers:
+        return True
+
+    token = os.getenv('METRICS_TOKEN')
+    auth_header = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(auth_header, f'Bearer {token}')
+
+
+@ops_bp.route('/_ah/warmup', methods=['GET'])
+@limiter.limit("10 per minute")
+def warmup():
+    """
+    Prime Firestore channel, Firebase signing keys and role caches
+
+    Safe to call repeatedly (e.g. as a startup probe): every step is idempotent.
+    Tenants preloaded are taken from WARMUP_TENANTS. Served to internal callers
+    only (as /internal/metrics); failure details are logged, not returned.
+
+    Returns:
+        200 with per-step timings, 503 if a step failed, 404 for other callers
+    """
+    if not _is_internal_request():
+        return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+
+    result = run_warmup()
+    if not result['ok']:
+        steps = [{'step': step['step'], 'ok': step['ok'], 'ms': step['ms']} for step in result['steps']]
+        return jsonify({'success': False, 'error': 'Warmup failed', 'data': {'steps': steps}}), 503
+    return jsonify({'success': True, 'data': result}), 200
+
+
+@ops_bp.route('/internal/metrics', methods=['GET'])
+@limiter.exempt
+def metrics_endpoint():
+    """
+    Metrics in Prometheus text format
+
+    Served to loopback clients, or with `Authorization: Bearer <METRICS_TOKEN>`;
+    404 otherwise so the endpoint is not discoverable.
+    """
+    if not _is_internal_request():
+        return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+
+    return Response(metrics.registry.render(), mimetype=metrics.CONTENT_TYPE)
+
+
+def _report_args():
+    limit = request.args.get('top', 20, type=int)
+    group_by = request.args.get('groupBy', 'lineno')
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        group_by = 'lineno'
+    return limit, group_by
+
+
+@ops_bp.route('/internal/memory', methods=['GET'])
+@limiter.exempt
+def memory_report():
+    """
+    Process RSS, approximate cache sizes and, while tracing, a tracemalloc snapshot
+
+    Query Parameters:
+    - top (optional): Allocation sites reported (default: 20)
+    - groupBy (optional): lineno (default), filename or traceback
+
+    Memory is per worker process: the response carries the pid it describes.
+    """
+    if not _is_internal_request():
+        return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+
+    limit, group_by = _report_args()
+    return jsonify({'success': True, 'data': memory_profiler.report(limit, group_by)})
+
+
+@ops_bp.route('/internal/memory/snapshots', methods=['POST'])
+@limiter.exempt
+def take_memory_snapshot():
+    """
+    Take a tracemalloc snapshot (starting tracing if needed) diffed against the previous one
+
+    Query Parameters:
+    - top, groupBy: as for GET /internal/memory
+    - frames (optional): Frames stored per allocation when tracing starts (default: 1)
+    """
+    if not _is_internal_request():
+        return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+
+    limit, group_by = _report_args()
+    frames = min(max(request.args.get('frames', 1, type=int), 1), 25)
+    return jsonify({'success': True, 'data': memory_profiler.snapshot(limit, group_by, frames)})
+
+
+@ops_bp.route('/internal/memory/snapshots', methods=['DELETE'])
+@limiter.exempt
+def stop_memory_tracing():
+    """Stop tracemalloc and drop the stored snapshots"""
+    if not _is_internal_request():
+        return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+
+    memory_profiler.stop()
+    return jsonify({'success': True})
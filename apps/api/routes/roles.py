@@ -13,6 +13,7 @@ from models.role import (
     CloneRoleInput,
 )
 from services.role_service import get_role_service
+from routes.common import error_body, paginate, paginated_body, page_params, require_tenant_id, role_list_filters
 from middleware.auth import require_auth, require_role_level
 from extensions import limiter
 
@@ -46,46 +47,23 @@ def list_roles():
     """
     try:
         # Parse query parameters
-        tenant_id = request.args.get('tenantId')
-        if not tenant_id:
-            return jsonify({'success': False, 'error': 'tenantId is required'}), 400
+        tenant_id, error = require_tenant_id(request.args)
+        if error:
+            return jsonify(error), 400
 
         # Build filters
-        filters = {
-            'isCustom': request.args.get('isCustom', type=lambda v: v.lower() == 'true') if request.args.get('isCustom') else None,
-            'isActive': request.args.get('isActive', type=lambda v: v.lower() == 'true') if request.args.get('isActive') else None,
-            'minLevel': request.args.get('minLevel', type=int),
-            'maxLevel': request.args.get('maxLevel', type=int),
-            'search': request.args.get('search'),
-            'page': request.args.get('page', default=1, type=int),
-            'limit': request.args.get('limit', default=20, type=int),
-        }
+        filters = role_list_filters(request.args)
 
         # Get role service
         role_service = get_role_service()
 
         # List roles
-        roles = role_service.list_roles(tenant_id, filters)
+        roles = role_service.list_roles(tenant_id, filters=filters)
 
         # Apply pagination
-        page = filters['page']
-        limit = filters['limit']
-        start = (page - 1) * limit
-        end = start + limit
-
-        paginated_roles = roles[start:end]
-        total = len(roles)
-
-        return jsonify({
-            'success': True,
-            'data': paginated_roles,
-            'meta': {
-                'total': total,
-                'page': page,
-                'limit': limit,
-                'hasNext': end < total
-            }
-        }), 200
+        paginated_roles, meta = paginate(roles, filters['page'], filters['limit'])
+
+        return jsonify(paginated_body(paginated_roles, meta)), 200
 
     except Exception as e:
         print(f"List roles error: {e}")
@@ -110,15 +88,15 @@ def get_role(role_id):
     - 404: Role not found
     """
     try:
-        tenant_id = request.args.get('tenantId')
-        if not tenant_id:
-            return jsonify({'success': False, 'error': 'tenantId is required'}), 400
+        tenant_id, error = require_tenant_id(request.args)
+        if error:
+            return jsonify(error), 400
 
         role_service = get_role_service()
         role = role_service.get_role(role_id, tenant_id)
 
         if not role:
-            return jsonify({'success': False, 'error': 'Role not found'}), 404
+            return jsonify(error_body('Role not found')), 404
 
         return jsonify({'success': True, 'data': role}), 200
 
@@ -369,34 +347,21 @@ def get_users_with_role(role_id):
     - 403: Insufficient permissions
     """
     try:
-        tenant_id = request.args.get('tenantId')
-        if not tenant_id:
-            return jsonify({'success': False, 'error': 'tenantId is required'}), 400
+        tenant_id, error = require_tenant_id(request.args)
+        if error:
+            return jsonify(error), 400
 
-        page = request.args.get('page', default=1, type=int)
-        limit = request.args.get('limit', default=20, type=int)
+        page, limit = page_params(request.args)
 
-        # Get users with role
+        # Get role assignments (no profiles yet)
         role_service = get_role_service()
-        users = role_service.get_users_with_role(role_id, tenant_id)
+        members = role_service.get_role_members(role_id, tenant_id)
 
-        # Apply pagination
-        start = (page - 1) * limit
-        end = start + limit
-
-        paginated_users = users[start:end]
-        total = len(users)
-
-        return jsonify({
-            'success': True,
-            'data': paginated_users,
-            'meta': {
-                'total': total,
-                'page': page,
-                'limit': limit,
-                'hasNext': end < total
-            }
-        }), 200
+        # Apply pagination; profiles only for the requested page, in one batched read
+        page_members, meta = paginate(members, page, limit)
+        paginated_users = role_service.enrich_members(page_members)
+
+        return jsonify(paginated_body(paginated_users, meta)), 200
 
     except Exception as e:
         print(f"Get users with role error: {e}")
@@ -0,0 +1,312 @@
+"""
+Generate a large synthetic dataset: tenants, custom roles, users and memberships
+Seeds the system roles (see init_firestore.py), then for every tenant the
+ROLE_TEMPLATES custom roles with their catalog, and users whose memberships
+follow a realistic skew:
+
+- tenant sizes follow a power law (Zipf exponent --skew): a few large tenants,
+  a long tail of small ones
+- --multi-tenant of the users also belong to 1-4 more tenants (picked with the
+  same skew, so large tenants share the most users)
+- each tenant has an owner; other members get lower-level roles more often
+
+Everything but timestamps is derived from --seed, so the same arguments give
+the same IDs and memberships. Writes go out as 500-write batches committed by --workers
+threads in parallel.
+
+Only the Firestore emulator (FIRESTORE_EMULATOR_HOST) or the in-memory backend
+are accepted, never a real project.
+
+Usage (from apps/api):
+    FIRESTORE_EMULATOR_HOST=localhost:8081 python scripts/generate_dataset.py --tenants 2000 --users 100000
+    python scripts/generate_dataset.py --backend memory --users 100000   # generation speed, nothing kept
+    python scripts/generate_dataset.py --users 5000 --manifest dataset.json
+"""
+
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.role import ROLE_TEMPLATES, UserPermissions
+from scripts.init_firestore import seed_system_roles
+from services.role_catalog import CATALOG_COLLECTION, CATALOG_VERSION, permissions_to_mask, role_summary
+from storage import Storage, create_storage
+
+BATCH_LIMIT = 500  # Firestore writes per batch
+EMAIL_DOMAIN = 'synthetic.example'
+
+# Templates by descending level: members get the later (lower-level) roles more often
+TEMPLATES = sorted(ROLE_TEMPLATES.values(), key=lambda template: -template['level'])
+
+
+def email_for(user_id: str) -> str:
+    return f"{user_id}@{EMAIL_DOMAIN}"
+
+
+class PowerLaw:
+    """Weighted picks of ranks 0..n-1 with weight 1 / (rank + 1) ** exponent"""
+
+    def __init__(self, n: int, exponent: float):
+        self.cumulative = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+    def pick(self, rng: random.Random) -> int:
+        return bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1])
+
+
+def tenant_roles(tenant_id: str, roles_per_tenant: int, owner_id: str, now: datetime) -> Dict[str, Dict[str, Any]]:
+    """Custom role documents of a tenant (templates cycled, numbered past the first round)"""
+    roles = {}
+    for index in range(roles_per_tenant):
+        template = TEMPLATES[index % len(TEMPLATES)]
+        round_number = index // len(TEMPLATES)
+        name = template['name'] if not round_number else f"{template['name']} {round_number + 1}"
+        roles[f"{tenant_id}-role-{index}"] = {
+            **template,
+            'name': name,
+            'tenantId': tenant_id,
+            'isCustom': True,
+            'isActive': True,
+            'createdBy': owner_id,
+            'createdAt': now,
+            'updatedAt': now,
+        }
+    return roles
+
+
+class DatasetGenerator:
+    """Deterministic documents of a synthetic dataset"""
+
+    def __init__(
+        self,
+        tenants: int,
+        users: int,
+        roles_per_tenant: int = len(TEMPLATES),
+        skew: float = 1.1,
+        multi_tenant: float = 0.1,
+        seed: int = 42,
+        prefix: str = 'syn',
+    ):
+        if users < tenants:
+            raise ValueError('Need at least one user (the owner) per tenant')
+        self.tenant_ids = [f"{prefix}-tenant-{t:05d}" for t in range(tenants)]
+        self.user_ids = [f"{prefix}-user-{u:07d}" for u in range(users)]
+        self.roles_per_tenant = roles_per_tenant
+        self.multi_tenant = multi_tenant
+        self.seed = seed
+        self.sizes = PowerLaw(tenants, skew)
+        self.now = datetime.now(timezone.utc)
+
+        # Tenant t is owned by user t
+        self.owners = {tenant_id: self.user_ids[t] for t, tenant_id in enumerate(self.tenant_ids)}
+        self.role_ids = {
+            tenant_id: [f"{tenant_id}-role-{index}" for index in range(roles_per_tenant)]
+            for tenant_id in self.tenant_ids
+        }
+        self.role_weights = [2 ** (index % len(TEMPLATES)) for index in range(roles_per_tenant)]
+        self.members = [0] * tenants
+
+    def roles(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(collection, doc_id, data) of every custom role and role catalog"""
+        for tenant_id in self.tenant_ids:
+            roles = tenant_roles(tenant_id, self.roles_per_tenant, self.owners[tenant_id], self.now)
+            catalog = {}
+            for role_id, role in roles.items():
+                yield 'tenant_roles', role_id, role
+                mask = permissions_to_mask(UserPermissions(**role['permissions']))
+                catalog[role_id] = role_summary(role_id, role, mask)
+            yield CATALOG_COLLECTION, tenant_id, {
+                'tenantId': tenant_id, 'version': CATALOG_VERSION, 'roles': catalog, 'updatedAt': self.now,
+            }
+
+    def users(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(collection, doc_id, data) of every user, memberships included"""
+        rng = random.Random(self.seed)
+        for index, user_id in enumerate(self.user_ids):
+            memberships = {}
+            if index < len(self.tenant_ids):
+                tenant_id = self.tenant_ids[index]
+                memberships[tenant_id] = self._membership(tenant_id, user_id, 'owner', None, rng)
+                self.members[index] += 1
+
+            # Every non-owner has a home tenant; some users belong to more tenants
+            wanted = max(len(memberships), 1)
+            if rng.random() < self.multi_tenant:
+                wanted += 1 + min(int(rng.expovariate(1.0)), 3)
+            for _ in range(wanted * 4):  # Retries when a pick is already a membership
+                if len(memberships) >= wanted:
+                    break
+                t = self.sizes.pick(rng)
+                tenant_id = self.tenant_ids[t]
+                if tenant_id in memberships:
+                    continue
+                role_id = rng.choices(self.role_ids[tenant_id], self.role_weights)[0]
+                memberships[tenant_id] = self._membership(tenant_id, user_id, role_id, self.owners[tenant_id], rng)
+                self.members[t] += 1
+
+            yield 'users', user_id, {
+                'email': email_for(user_id),
+                'emailVerified': True,
+                'status': 'active',
+                'profile': {
+                    'displayName': f"Synthetic User {index}",
+                    'phoneNumber': None,
+                    'photoURL': None,
+                    'bio': None,
+                },
+                'tenantMemberships': memberships,
+                'membershipsMigrated': True,
+                'failedLoginAttempts': 0,
+                'createdAt': self.now,
+                'updatedAt': self.now,
+            }
+
+    def _membership(self, tenant_id: str, user_id: str, role_id: str, assigned_by: Optional[str],
+                    rng: random.Random) -> Dict[str, Any]:
+        return {
+            'tenantId': tenant_id,
+            'userId': user_id,
+            'roleId': role_id,
+            'joinedAt': self.now - timedelta(days=rng.randrange(730)),
+            'assignedBy': assigned_by,
+            'status': 'active',
+        }
+
+    def manifest(self) -> Dict[str, Any]:
+        """IDs and tenant sizes (member counts are known once users() has been consumed)"""
+        return {
+            'seed': self.seed,
+            'tenants': self.tenant_ids,
+            'tenantSizes': dict(zip(self.tenant_ids, self.members)),
+            'owners': self.owners,
+            'roles': self.role_ids,
+            'users': self.user_ids,
+        }
+
+
+def write_all(db: Storage, documents: Iterator[Tuple[str, str, Dict[str, Any]]], workers: int,
+              batch_size: int = BATCH_LIMIT, on_commit=None) -> int:
+    """
+    Write documents in batches committed by `workers` threads
+
+    At most 2 * workers batches are pending at a time, so memory stays bounded
+    however many documents are generated.
+    """
+    slots = threading.BoundedSemaphore(workers * 2)
+    written = 0
+    lock = threading.Lock()
+
+    def commit(batch, count):
+        nonlocal written
+        try:
+            batch.commit()
+            with lock:
+                written += count
+                if on_commit:
+                    on_commit(written)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        batch, pending = db.batch(), 0
+        for collection, doc_id, data in documents:
+            batch.set(collection, doc_id, data)
+            pending += 1
+            if pending == batch_size:
+                slots.acquire()
+                futures.append(pool.submit(commit, batch, pending))
+                batch, pending = db.batch(), 0
+        if pending:
+            slots.acquire()
+            futures.append(pool.submit(commit, batch, pending))
+        for future in futures:
+            future.result()  # Re-raise the first failed commit
+    return written
+
+
+def generate(db: Storage, generator: DatasetGenerator, workers: int = 8, verbose: bool = True) -> Dict[str, Any]:
+    """Seed system roles, then write the generator's roles, catalogs and users"""
+    started = time.perf_counter()
+    seed_system_roles(db, verbose=False)
+
+    def progress(written):
+        if verbose and written % 10_000 < BATCH_LIMIT:
+            rate = written / (time.perf_counter() - started)
+            print(f"  📝 {written:,} documents ({rate:,.0f}/s)", flush=True)
+
+    documents = itertools.chain(generator.roles(), generator.users())
+    written = write_all(db, documents, workers, on_commit=progress)
+
+    manifest = generator.manifest()
+    manifest['documents'] = written
+    manifest['seconds'] = round(time.perf_counter() - started, 2)
+    return manifest
+
+
+def describe(manifest: Dict[str, Any]) -> List[str]:
+    sizes = sorted(manifest['tenantSizes'].values(), reverse=True)
+    memberships = sum(sizes)
+    lines = [
+        f"✅ {manifest['documents']:,} documents in {manifest['seconds']}s "
+        f"({manifest['documents'] / max(manifest['seconds'], 1e-9):,.0f}/s)",
+        f"  🏢 {len(sizes):,} tenants, {len(manifest['users']):,} users, {memberships:,} memberships "
+        f"({memberships / len(manifest['users']):.2f} per user)",
+        f"  📈 tenant members: largest {sizes[0]:,}, top 1% "
+        f"{sum(sizes[:max(len(sizes) // 100, 1)]) / memberships:.0%} of memberships, "
+        f"median {sizes[len(sizes) // 2]:,}, smallest {sizes[-1]:,}",
+    ]
+    return lines
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic multi-tenant dataset')
+    parser.add_argument('--backend', choices=['firestore', 'memory'], default='firestore',
+                        help='firestore requires FIRESTORE_EMULATOR_HOST (default: firestore)')
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--roles-per-tenant', type=int, default=len(TEMPLATES),
+                        help=f'Custom roles per tenant, cycling ROLE_TEMPLATES (default: {len(TEMPLATES)})')
+    parser.add_argument('--skew', type=float, default=1.1, help='Power-law exponent of tenant sizes (default: 1.1)')
+    parser.add_argument('--multi-tenant', type=float, default=0.1,
+                        help='Fraction of users in more than one tenant (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='syn', help='ID prefix of generated documents (default: syn)')
+    parser.add_argument('--workers', type=int, default=8, help='Batches committed in parallel (default: 8)')
+    parser.add_argument('--manifest', help='Write generated IDs and tenant sizes as JSON here')
+    args = parser.parse_args()
+
+    if args.backend == 'firestore':
+        if not os.getenv('FIRESTORE_EMULATOR_HOST'):
+            sys.exit('Refusing to write synthetic data without FIRESTORE_EMULATOR_HOST (use --backend memory)')
+        os.environ.setdefault('GOOGLE_CLOUD_PROJECT', 'demo-synthetic')
+        from firebase_admin import initialize_app
+        try:
+            initialize_app()
+        except ValueError:
+            pass  # Already initialized
+
+    generator = DatasetGenerator(
+        args.tenants, args.users, args.roles_per_tenant, args.skew, args.multi_tenant, args.seed, args.prefix,
+    )
+    print(f"🌱 Generating {args.tenants:,} tenants and {args.users:,} users into {args.backend} "
+          f"({args.workers} workers)...")
+    manifest = generate(create_storage(args.backend), generator, args.workers)
+    print('\n'.join(describe(manifest)))
+
+    if args.manifest:
+        with open(args.manifest, 'w') as f:
+            json.dump(manifest, f)
+        print(f"💾 Manifest written to {args.manifest}")
@@ -5,13 +5,57 @@ Run this script once to set up the database structure
 
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Add parent directory to path to import models
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from firebase_admin import credentials, firestore, initialize_app
 from models.role import DEFAULT_SYSTEM_ROLES
+from storage import Storage, create_storage
+
+
+def seed_system_roles(db: Storage, verbose: bool = True) -> tuple:
+    """
+    Create or update the default system roles (one read, one batch write)
+
+    Args:
+        db: Storage backend
+        verbose: Print one line per role
+
+    Returns:
+        (roles_created, roles_updated)
+    """
+    existing = {
+        snapshot.id: snapshot.to_dict()
+        for snapshot in db.get_all([('system_roles', role['id']) for role in DEFAULT_SYSTEM_ROLES])
+        if snapshot.exists
+    }
+
+    now = datetime.now(timezone.utc)
+    batch = db.batch()
+    roles_created = 0
+    roles_updated = 0
+
+    for role_data in DEFAULT_SYSTEM_ROLES:
+        role_id = role_data['id']
+
+        if role_id not in existing:
+            # Create new role
+            batch.set('system_roles', role_id, {**role_data, 'createdAt': now, 'updatedAt': now})
+            if verbose:
+                print(f"  ✅ Created system role: {role_data['name']} (ID: {role_id})")
+            roles_created += 1
+        else:
+            # Update existing role (preserve createdAt, update the rest)
+            created_at = existing[role_id].get('createdAt', now)
+            batch.set('system_roles', role_id, {**role_data, 'createdAt': created_at, 'updatedAt': now})
+            if verbose:
+                print(f"  🔄 Updated system role: {role_data['name']} (ID: {role_id})")
+            roles_updated += 1
+
+    batch.commit()
+    return roles_created, roles_updated
 
 
 def init_firestore():
@@ -33,41 +77,7 @@ def init_firestore():
 
     # Create system_roles collection and seed with default roles
     print("\n📦 Seeding system_roles collection...")
-    system_roles_ref = db.collection('system_roles')
-
-    roles_created = 0
-    roles_updated = 0
-
-    for role_data in DEFAULT_SYSTEM_ROLES:
-        role_id = role_data['id']
-
-        # Check if role already exists
-        role_doc = system_roles_ref.document(role_id).get()
-
-        # Add timestamps
-        now = datetime.utcnow()
-
-        if not role_doc.exists:
-            # Create new role
-            role_data_with_timestamps = {
-                **role_data,
-                'createdAt': now,
-                'updatedAt': now
-            }
-            system_roles_ref.document(role_id).set(role_data_with_timestamps)
-            print(f"  ✅ Created system role: {role_data['name']} (ID: {role_id})")
-            roles_created += 1
-        else:
-            # Update existing role (preserve createdAt, update the rest)
-            existing_data = role_doc.to_dict()
-            role_data_with_timestamps = {
-                **role_data,
-                'createdAt': existing_data.get('createdAt', now),
-                'updatedAt': now
-            }
-            system_roles_ref.document(role_id).set(role_data_with_timestamps)
-            print(f"  🔄 Updated system role: {role_data['name']} (ID: {role_id})")
-            roles_updated += 1
+    roles_created, roles_updated = seed_system_roles(create_storage('firestore'))
 
     print(f"\n✅ System roles seeded: {roles_created} created, {roles_updated} updated")
 
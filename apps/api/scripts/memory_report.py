@@ -0,0 +1,70 @@
+"""
+Report a running API worker's memory: RSS, cache sizes and tracemalloc diffs
+
+Takes --count snapshots --interval seconds apart through the internal memory
+endpoints and prints the top allocation sites and their growth between
+snapshots. Tracing is started by the first snapshot and, unless --keep-tracing
+is given, stopped at the end.
+
+Usage:
+    python scripts/memory_report.py                           # Sizes only
+    python scripts/memory_report.py --count 3 --interval 60   # Growth over 2 minutes
+    METRICS_TOKEN=... python scripts/memory_report.py --url https://api.example.com --count 2
+
+With several gunicorn workers, successive requests may reach different
+processes; compare the printed pids (or run with WEB_CONCURRENCY=1).
+"""
+
+import json
+import os
+import sys
+import time
+import urllib.request
+
+# Add parent directory to path to import observability
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from observability.memory import format_report
+
+
+def call(url: str, method: str = 'GET', token: str = None) -> dict:
+    req = urllib.request.Request(url, method=method)
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return json.loads(response.read()).get('data') or {}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Report memory of a running API worker')
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help='API base URL (default: local worker)')
+    parser.add_argument('--token', default=os.getenv('METRICS_TOKEN'), help='METRICS_TOKEN for non-loopback URLs')
+    parser.add_argument('--count', type=int, default=0, help='tracemalloc snapshots to take (default: 0, sizes only)')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between snapshots (default: 30)')
+    parser.add_argument('--top', type=int, default=15, help='Allocation sites shown (default: 15)')
+    parser.add_argument('--group-by', default='lineno', choices=['lineno', 'filename', 'traceback'])
+    parser.add_argument('--frames', type=int, default=1, help='Frames per allocation when tracing starts')
+    parser.add_argument('--keep-tracing', action='store_true', help='Leave tracemalloc running afterwards')
+    args = parser.parse_args()
+
+    base = args.url.rstrip('/')
+    query = f"top={args.top}&groupBy={args.group_by}"
+
+    print('\n'.join(format_report(call(f"{base}/internal/memory?{query}", token=args.token), args.top)))
+
+    try:
+        for i in range(args.count):
+            if i:
+                time.sleep(args.interval)
+            snapshot = call(
+                f"{base}/internal/memory/snapshots?{query}&frames={args.frames}", method='POST', token=args.token
+            )
+            print(f"\n📸 Snapshot {i + 1}/{args.count} (pid {snapshot.get('pid')})")
+            if snapshot.get('tracingStarted'):
+                print("  tracemalloc was just started: allocations before this point are not traced")
+            print('\n'.join(format_report(snapshot, args.top)))
+    finally:
+        if args.count and not args.keep_tracing:
+            call(f"{base}/internal/memory/snapshots", method='DELETE', token=args.token)
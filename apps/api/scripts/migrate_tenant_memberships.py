@@ -0,0 +1,134 @@
+"""
+Migrate user memberships from the legacy `tenants` array to the
+map-keyed `tenantMemberships` field (users/{uid}.tenantMemberships.{tenantId})
+
+Safe to run repeatedly: already migrated users are skipped. Users not yet
+migrated are also migrated lazily on their first authorization check, but
+role member listings only see migrated users, so run this once after deploy.
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_admin import initialize_app
+from storage import ASCENDING, create_storage
+from google.api_core import exceptions
+from google.cloud.firestore_v1 import transforms
+from services.memberships import (
+    LEGACY_TENANTS_FIELD, MIGRATED_FIELD, migrate_user_memberships, migration_update,
+)
+from services.membership_sweeper import schedule_membership_expiry
+
+
+PAGE_SIZE = 200  # Users read per query page
+BATCH_LIMIT = 500  # Firestore writes per batch
+
+
+def commit_migrations(db, batch, user_ids) -> None:
+    """
+    Commit a batch of migrations; if a user changed since it was read (e.g.
+    migrated by a request meanwhile), redo the batch's users one transaction each
+    """
+    try:
+        batch.commit()
+    except exceptions.FailedPrecondition:
+        for user_id in user_ids:
+            db.run_transaction(lambda transaction: migrate_user_memberships(transaction, user_id))
+
+
+def migrate_memberships(dry_run: bool = False):
+    """Migrate all users page by page, in batches of at most BATCH_LIMIT writes"""
+
+    print("🔥 Migrating tenant memberships...")
+
+    try:
+        initialize_app()
+        print("✅ Firebase Admin SDK initialized")
+    except ValueError:
+        print("ℹ️  Firebase Admin SDK already initialized")
+
+    db = create_storage('firestore')
+
+    scanned = 0
+    migrated = 0
+    last_doc = None
+    batch, pending, writes = db.batch(), [], 0  # pending: user IDs in the batch; writes: index writes
+
+    while True:
+        # Only read the fields needed to migrate, not whole profiles
+        docs = list(db.query(
+            'users',
+            order_by=[('__name__', ASCENDING)],
+            limit=PAGE_SIZE,
+            start_after=last_doc,
+            field_paths=[LEGACY_TENANTS_FIELD, MIGRATED_FIELD],
+        ))
+        if not docs:
+            break
+
+        for doc in docs:
+            scanned += 1
+            data = doc.to_dict() or {}
+            if data.get(MIGRATED_FIELD):
+                # Migrated before the array was dropped on migration: drop it now
+                if LEGACY_TENANTS_FIELD in data:
+                    if pending and len(pending) + writes + 1 > BATCH_LIMIT:
+                        if not dry_run:
+                            commit_migrations(db, batch, pending)
+                        batch, pending, writes = db.batch(), [], 0
+                    batch.update('users', doc.id, {LEGACY_TENANTS_FIELD: transforms.DELETE_FIELD})
+                    writes += 1
+                continue
+
+            tenants = data.get(LEGACY_TENANTS_FIELD, [])
+            expiring = [
+                tenant_member for tenant_member in tenants
+                if tenant_member.get('expiresAt') and tenant_member.get('tenantId')
+            ]
+
+            # Flush by write count: each user costs one update plus one index write per expiring membership
+            if pending and len(pending) + writes + 1 + len(expiring) > BATCH_LIMIT:
+                if not dry_run:
+                    commit_migrations(db, batch, pending)
+                batch, pending, writes = db.batch(), [], 0
+
+            batch.update('users', doc.id, migration_update(tenants), last_update_time=doc.update_time)
+            pending.append(doc.id)
+            migrated += 1
+
+            # Index expiring memberships for the sweeper
+            for tenant_member in expiring:
+                schedule_membership_expiry(
+                    batch, doc.id, tenant_member['tenantId'], tenant_member['expiresAt']
+                )
+            writes += len(expiring)
+
+        print(f"  🔄 Scanned {scanned} users, {'would migrate' if dry_run else 'migrated'} {migrated}")
+
+        last_doc = docs[-1]
+
+    if pending and not dry_run:
+        commit_migrations(db, batch, pending)
+
+    print(f"\n✅ Membership migration complete: {migrated} of {scanned} users migrated")
+
+    return {
+        'users_scanned': scanned,
+        'users_migrated': migrated,
+        'dry_run': dry_run,
+        'status': 'success'
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Migrate tenants array to tenantMemberships map')
+    parser.add_argument('--dry-run', action='store_true', help='Count users to migrate without writing')
+    args = parser.parse_args()
+
+    result = migrate_memberships(dry_run=args.dry_run)
+    print(f"\n📊 Result: {result}")
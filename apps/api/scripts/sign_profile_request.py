@@ -0,0 +1,34 @@
+"""
+Print an X-Profile header value that authorizes profiling one request path
+
+The signature is an HMAC of the expiry time and the request path, keyed with
+PROFILE_SECRET (the same secret the API is deployed with).
+
+Usage:
+    PROFILE_SECRET=... python scripts/sign_profile_request.py /api/roles --ttl 300
+    curl -H "X-Profile: <value>" -H "Authorization: Bearer ..." "$API/api/roles?tenantId=..."
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path to import observability
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from observability.profiler import sign
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sign an X-Profile header for a request path')
+    parser.add_argument('path', help='Request path without query string, e.g. /api/roles')
+    parser.add_argument('--ttl', type=int, default=300, help='Seconds the signature stays valid (default: 300)')
+    args = parser.parse_args()
+
+    secret = os.getenv('PROFILE_SECRET')
+    if not secret:
+        sys.exit('PROFILE_SECRET is not set')
+
+    print(sign(args.path, int(time.time()) + args.ttl, secret))
@@ -2,3 +2,27 @@
 Service layer for TOKO ANAK BANGSA API
 Business logic and data access
 """
+
+import sys
+
+
+# Module -> singleton variable of each get_*_service() accessor
+_SINGLETONS = {
+    'services.auth_service': '_auth_service_instance',
+    'services.role_service': '_role_service_instance',
+    'services.async_auth_service': '_async_auth_service_instance',
+    'services.async_role_service': '_async_role_service_instance',
+}
+
+
+def reset_services() -> None:
+    """
+    Drop the service singletons so the next get_*_service() call re-creates them
+
+    Used after fork(): clients, watch streams and threads created by the
+    parent process are not usable in the child.
+    """
+    for module_name, variable in _SINGLETONS.items():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            setattr(module, variable, None)
@@ -0,0 +1,100 @@
+"""
+Async Authentication Service - Coroutine variant of AuthService's read paths
+Used by the async execution mode (asgi.py). Token verification reuses the
+synchronous AuthService; user documents are read through an AsyncStorage.
+"""
+
+import asyncio
+import copy
+from typing import Any, Dict, Optional, Tuple
+
+from startup import ensure_firebase, lazy_import
+from storage import get_async_storage
+from storage.async_base import AsyncStorage
+from services.auth_service import AuthService, get_auth_service
+from services.memberships import MEMBERSHIP_FIELDS
+from services.single_flight import AsyncSingleFlight
+from models.user import UserEmailView, UserMembershipsView, USER_EMAIL_FIELDS
+
+auth = lazy_import('firebase_admin.auth', before=ensure_firebase)
+
+
+class AsyncAuthService:
+    """Async user lookups and token verification"""
+
+    def __init__(
+        self,
+        auth_service: Optional[AuthService] = None,
+        storage: Optional[AsyncStorage] = None,
+    ):
+        self.sync = auth_service or get_auth_service()
+        self.db = storage or get_async_storage()
+        self._flights = AsyncSingleFlight()
+
+    async def verify_firebase_token(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a Firebase ID token without blocking the event loop
+
+        Raises:
+            firebase_admin.auth errors if the token is invalid
+        """
+        # Signature check may refresh Google's public keys over HTTP
+        return await asyncio.to_thread(auth.verify_id_token, token)
+
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify JWT token and return payload (CPU only)"""
+        return self.sync.verify_token(token)
+
+    async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user by ID
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            User data dict or None
+        """
+        user_data = await self._flights.do(('user', user_id), self._fetch_user, user_id)
+        return copy.deepcopy(user_data)
+
+    async def _fetch_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user_doc = await self.db.get('users', user_id)
+        if not user_doc.exists:
+            return None
+
+        user_data = user_doc.to_dict()
+        user_data['id'] = user_doc.id
+        return user_data
+
+    async def get_user_fields(self, user_id: str, field_paths: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Get only the given fields of a user (Firestore field mask)
+
+        Returns:
+            Dict of the requested fields present plus 'id', or None if user not found
+        """
+        user_data = await self._flights.do(
+            ('user', user_id, field_paths), self.db.get_fields, 'users', user_id, field_paths
+        )
+        return copy.deepcopy(user_data)
+
+    async def get_user_email(self, user_id: str) -> Optional[UserEmailView]:
+        """Get user's email only (used by require_auth)"""
+        return await self.get_user_fields(user_id, USER_EMAIL_FIELDS)
+
+    async def get_user_memberships(self, user_id: str) -> Optional[UserMembershipsView]:
+        """Get user's membership fields only"""
+        return await self.get_user_fields(user_id, MEMBERSHIP_FIELDS)
+
+
+# Singleton instance
+_async_auth_service_instance = None
+
+
+def get_async_auth_service() -> AsyncAuthService:
+    """Get or create AsyncAuthService singleton"""
+    global _async_auth_service_instance
+    if _async_auth_service_instance is None:
+        _async_auth_service_instance = AsyncAuthService()
+    return _async_auth_service_instance
@@ -0,0 +1,324 @@
+"""
+Async Role Service - Coroutine variant of RoleService's read paths
+Used by the async execution mode (asgi.py). Shares the caches, system role
+replica and authz epochs of the synchronous RoleService, so both modes see the
+same invalidations; only cache misses are read through an AsyncStorage, and
+independent reads are issued concurrently with asyncio.gather. Role mutations
+stay on the synchronous service (Flask routes).
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from models.role import UserPermissions
+from storage import get_async_storage
+from storage.async_base import AsyncStorage
+from services.memberships import MEMBERSHIPS_FIELD, membership_field_path, read_membership_async
+from services.role_catalog import CATALOG_COLLECTION, catalog_roles
+from services.role_service import RoleService, get_role_service
+from services.single_flight import AsyncSingleFlight
+
+
+class AsyncRoleService:
+    """Async role lookup and permission resolution"""
+
+    def __init__(
+        self,
+        role_service: Optional[RoleService] = None,
+        storage: Optional[AsyncStorage] = None,
+    ):
+        self.sync = role_service or get_role_service()
+        self.db = storage or get_async_storage()
+        self._flights = AsyncSingleFlight()
+
+    async def _ensure_fresh(self, tenant_id: Optional[str]) -> None:
+        await self.sync.ensure_fresh_async(tenant_id, self.db)
+
+    async def get_role(self, role_id: str, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get role by ID (checks both system and tenant roles)
+
+        Raises:
+            PermissionError: If the role belongs to another tenant
+        """
+        system_role = self.sync.get_system_role(role_id)
+        if system_role:
+            return system_role
+
+        await self._ensure_fresh(tenant_id)
+        cached = self.sync.role_cache.get((role_id, tenant_id))
+        if cached is not None:
+            return cached
+
+        if tenant_id:
+            return await self._flights.do(
+                ('role', role_id, tenant_id), self._load_tenant_role, role_id, tenant_id
+            )
+
+        return None
+
+    async def _load_tenant_role(self, role_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+        generation = self.sync.role_cache.generation(tenant_id)
+        doc = await self.db.get('tenant_roles', role_id)
+        if not doc.exists:
+            return None
+
+        role_data = doc.to_dict()
+        if role_data.get('tenantId') != tenant_id:
+            raise PermissionError(f"Role {role_id} does not belong to tenant {tenant_id}")
+
+        role_data['id'] = doc.id
+        self.sync.role_cache.set(
+            (role_id, tenant_id), role_data, tenant_id, role_id, generation=generation
+        )
+        return role_data
+
+    async def get_roles(self, role_ids: List[str], tenant_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get several roles at once (system, cached, then one batched read)"""
+        await self._ensure_fresh(tenant_id)
+        roles = {}
+        missing = []
+
+        for role_id in dict.fromkeys(role_ids):
+            role = self.sync.get_system_role(role_id) or self.sync.role_cache.get((role_id, tenant_id))
+            if role is not None:
+                roles[role_id] = role
+            elif tenant_id:
+                missing.append(role_id)
+
+        if not missing:
+            return roles
+
+        generation = self.sync.role_cache.generation(tenant_id)
+        snapshots = await self.db.get_all([('tenant_roles', role_id) for role_id in missing])
+        for doc in snapshots:
+            role_data = doc.to_dict() if doc.exists else None
+            if not role_data or role_data.get('tenantId') != tenant_id:
+                continue
+            role_data['id'] = doc.id
+            self.sync.role_cache.set(
+                (doc.id, tenant_id), role_data, tenant_id, doc.id, generation=generation
+            )
+            roles[doc.id] = role_data
+
+        return roles
+
+    async def get_effective_permissions(self, role_id: str, tenant_id: Optional[str] = None) -> UserPermissions:
+        """Get effective permissions for a role (includes inherited permissions)"""
+        return (await self.get_effective_permissions_many([role_id], tenant_id))[role_id]
+
+    async def get_effective_permissions_many(
+        self, role_ids: List[str], tenant_id: Optional[str] = None
+    ) -> Dict[str, UserPermissions]:
+        """Effective permissions of several roles; one batched read per inheritance depth"""
+        await self._ensure_fresh(tenant_id)
+        permissions_cache = self.sync.permissions_cache
+        generation = permissions_cache.generation(tenant_id)
+        results: Dict[str, UserPermissions] = {}
+        roles: Dict[str, Dict[str, Any]] = {}
+        resolved: Dict[str, UserPermissions] = {}
+
+        frontier = []
+        for role_id in dict.fromkeys(role_ids):
+            cached = permissions_cache.get((role_id, tenant_id))
+            if cached is not None:
+                results[role_id] = cached
+            else:
+                frontier.append(role_id)
+
+        requested = set(frontier)
+        while frontier:
+            loaded = await self.get_roles(frontier, tenant_id)
+            roles.update(loaded)
+            frontier = []
+            for role in loaded.values():
+                parent_id = role.get('inheritsFrom')
+                if not parent_id or parent_id in requested:
+                    continue
+                requested.add(parent_id)
+                cached = permissions_cache.get((parent_id, tenant_id))
+                if cached is not None:
+                    resolved[parent_id] = cached
+                else:
+                    frontier.append(parent_id)
+
+        for role_id in role_ids:
+            if role_id not in results:
+                results[role_id] = self.sync.flatten_permissions(
+                    role_id, tenant_id, roles, resolved, generation=generation
+                )
+
+        return results
+
+    async def get_user_role_in_tenant(self, user_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user's role assignment in a specific tenant
+
+        Returns:
+            Membership data, or None if not a member or the membership is
+            suspended/inactive/expired
+        """
+        await self._ensure_fresh(tenant_id)
+        tenant_member = self.sync.membership_cache.get((user_id, tenant_id))
+
+        if tenant_member is None:
+            try:
+                tenant_member = await self._flights.do(
+                    ('membership', user_id, tenant_id), self._load_membership, user_id, tenant_id
+                )
+            except Exception as e:
+                print(f"Error getting user role in tenant: {e}")
+                return None
+
+        if tenant_member is None or not self.sync.is_membership_active(tenant_member):
+            return None
+
+        return tenant_member
+
+    async def _load_membership(self, user_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+        generation = self.sync.membership_cache.generation(tenant_id)
+        tenant_member = await read_membership_async(self.db, self.sync.db, user_id, tenant_id)
+        if tenant_member:
+            self.sync.membership_cache.set(
+                (user_id, tenant_id), tenant_member, tenant_id,
+                tenant_member.get('roleId'), generation=generation,
+            )
+        return tenant_member
+
+    async def get_user_effective_permissions(
+        self, user_id: str, tenant_id: str
+    ) -> Optional[UserPermissions]:
+        """Role permissions + user-specific custom permissions, or None if not a member"""
+        tenant_member = await self.get_user_role_in_tenant(user_id, tenant_id)
+        if not tenant_member or not tenant_member.get('roleId'):
+            return None
+
+        role_permissions = await self.get_effective_permissions(tenant_member['roleId'], tenant_id)
+
+        custom_permissions = tenant_member.get('customPermissions', {})
+        if custom_permissions:
+            return UserPermissions(**{**role_permissions.dict(), **custom_permissions})
+
+        return role_permissions
+
+    async def can_user_perform(self, user_id: str, tenant_id: str, permission_name: str) -> bool:
+        """Check if user can perform a specific action in a tenant"""
+        permissions = await self.get_user_effective_permissions(user_id, tenant_id)
+        if not permissions:
+            return False
+
+        return getattr(permissions, permission_name, False)
+
+    async def get_user_role_level(self, user_id: str, tenant_id: str) -> Optional[int]:
+        """Get user's role level in a tenant"""
+        tenant_member = await self.get_user_role_in_tenant(user_id, tenant_id)
+        if not tenant_member or not tenant_member.get('roleId'):
+            return None
+
+        role = await self.get_role(tenant_member['roleId'], tenant_id)
+        if not role:
+            return None
+
+        return role.get('level')
+
+    async def get_user_access(self, user_id: str, tenant_id: str) -> Dict[str, Any]:
+        """
+        Role level and effective permissions of a user, resolved concurrently
+
+        Both lookups share the membership read (single-flight), and the role
+        document and its inheritance chain are fetched in parallel.
+        """
+        level, permissions = await asyncio.gather(
+            self.get_user_role_level(user_id, tenant_id),
+            self.get_user_effective_permissions(user_id, tenant_id),
+        )
+        return {'level': level, 'permissions': permissions}
+
+    async def get_role_catalog(self, tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get the tenant's role catalog (role_id -> summary); treat as read-only"""
+        await self._ensure_fresh(tenant_id)
+        cached = self.sync.catalog_cache.get(tenant_id)
+        if cached is not None:
+            return cached
+
+        return await self._flights.do(('catalog', tenant_id), self._load_role_catalog, tenant_id)
+
+    async def _load_role_catalog(self, tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        generation = self.sync.catalog_cache.generation(tenant_id)
+        doc = await self.db.get(CATALOG_COLLECTION, tenant_id)
+        roles = catalog_roles(doc.to_dict() or {}) if doc.exists else None
+        if roles is None:
+            # Missing or outdated catalog: the sync path builds it transactionally
+            return await asyncio.to_thread(self.sync.load_role_catalog, tenant_id)
+
+        roles = self.sync.with_current_masks(roles)
+        self.sync.catalog_cache.set(tenant_id, roles, tenant_id, generation=generation)
+        return roles
+
+    async def list_roles(
+        self,
+        tenant_id: Optional[str] = None,
+        include_system: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """List system + tenant custom roles (at most one document read)"""
+        catalog = {}
+        if tenant_id:
+            try:
+                catalog = await self.get_role_catalog(tenant_id)
+            except Exception as e:
+                print(f"Error listing tenant roles: {e}")
+
+        return self.sync.build_role_list(catalog, include_system, filters)
+
+    async def get_role_members(self, role_id: str, tenant_id: str) -> List[dict]:
+        """Get role assignments of users with specific role (without profiles)"""
+        query = await self.db.query(
+            'users',
+            filters=[(membership_field_path(tenant_id, 'roleId'), '==', role_id)],
+            field_paths=[membership_field_path(tenant_id)],
+        )
+
+        members = [
+            {
+                'userId': user.id,
+                'roleAssignment': ((user.to_dict() or {}).get(MEMBERSHIPS_FIELD) or {}).get(tenant_id, {}),
+            }
+            for user in query
+        ]
+
+        # Unmigrated users (legacy `tenants` array) are matched by the sync service
+        found = {member['userId'] for member in members}
+        legacy = await asyncio.to_thread(self.sync.legacy_role_members, role_id, tenant_id)
+        return members + [member for member in legacy if member['userId'] not in found]
+
+    async def enrich_members(self, members: List[dict]) -> List[dict]:
+        """Add email and profile to role members with one batched read"""
+        snapshots = await self.db.get_all(
+            [('users', member['userId']) for member in members],
+            field_paths=['email', 'profile'],
+        )
+
+        users = []
+        for member, snapshot in zip(members, snapshots):
+            user_data = snapshot.to_dict() or {}
+            users.append({
+                'userId': member['userId'],
+                'email': user_data.get('email'),
+                'profile': user_data.get('profile', {}),
+                'roleAssignment': member['roleAssignment']
+            })
+
+        return users
+
+
+# Singleton instance
+_async_role_service_instance = None
+
+
+def get_async_role_service() -> AsyncRoleService:
+    """Get or create AsyncRoleService singleton"""
+    global _async_role_service_instance
+    if _async_role_service_instance is None:
+        _async_role_service_instance = AsyncRoleService()
+    return _async_role_service_instance
@@ -6,13 +6,19 @@ NOTE: Password hashing is handled by Firebase Auth, not bcrypt.
 Firebase uses industry-standard scrypt algorithm for password hashing.
 """
 
+import copy
 import os
 import secrets
+import threading
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
-from firebase_admin import auth, firestore
 import jwt
 
+from startup import ensure_firebase, lazy_import
+from observability.tracing import TracedCalls, trace_methods
+from storage import Storage, get_storage
+from services.single_flight import SingleFlight
+from services.memberships import MEMBERSHIP_FIELDS, empty_memberships, get_memberships
 from models.user import (
     User,
     RegisterRequest,
@@ -21,20 +27,28 @@ from models.user import (
     TenantMember,
     TokenResponse,
     UserStatus,
+    UserEmailView,
+    UserMembershipsView,
+    USER_EMAIL_FIELDS,
 )
+from models.role import SystemRoleID, RoleLevel
 
+auth = TracedCalls(lazy_import('firebase_admin.auth', before=ensure_firebase), 'firebase_auth')
 
+
+@trace_methods
 class AuthService:
     """Service for authentication and user management"""
 
-    def __init__(self):
-        self.db = firestore.client()
+    def __init__(self, storage: Optional[Storage] = None):
+        self.db = storage or get_storage()
         self.jwt_secret = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-this')
         self.jwt_algorithm = 'HS256'
         self.access_token_expiry = 900  # 15 minutes
         self.refresh_token_expiry = 604800  # 7 days
         self.max_failed_attempts = 5
         self.lockout_duration = 900  # 15 minutes
+        self._flights = SingleFlight()  # Coalesces concurrent get_user reads
 
     def register_user(
         self, email: str, password: str, display_name: str, phone_number: Optional[str] = None
@@ -84,14 +98,14 @@ class AuthService:
                 'photoURL': None,
                 'bio': None,
             },
-            'tenants': [],
+            **empty_memberships(),
             'status': UserStatus.ACTIVE.value,
             'createdAt': now,
             'updatedAt': now,
             'failedLoginAttempts': 0,
         }
 
-        self.db.collection('users').document(user_record.uid).set(user_data)
+        self.db.set('users', user_record.uid, user_data)
 
         # Send verification email
         # TODO: Implement email verification
@@ -124,7 +138,7 @@ class AuthService:
             raise ValueError('Invalid email or password')
 
         # Get user from Firestore
-        user_doc = self.db.collection('users').document(user_record.uid).get()
+        user_doc = self.db.get('users', user_record.uid)
         if not user_doc.exists:
             raise ValueError('User profile not found')
 
@@ -141,7 +155,7 @@ class AuthService:
                 )
             else:
                 # Lock expired, reset counter
-                self.db.collection('users').document(user_record.uid).update({
+                self.db.update('users', user_record.uid, {
                     'lockedUntil': None,
                     'failedLoginAttempts': 0,
                 })
@@ -161,7 +175,7 @@ class AuthService:
         # MUST increment failedLoginAttempts on wrong password and implement lockout!
 
         # Reset failed attempts on successful login
-        self.db.collection('users').document(user_record.uid).update({
+        self.db.update('users', user_record.uid, {
             'failedLoginAttempts': 0,
             'lastLoginAt': datetime.utcnow(),
             'updatedAt': datetime.utcnow(),
@@ -193,7 +207,7 @@ class AuthService:
         picture = decoded_token.get('picture')
 
         # Check if user exists
-        user_doc = self.db.collection('users').document(uid).get()
+        user_doc = self.db.get('users', uid)
 
         if not user_doc.exists:
             # Create new user
@@ -208,18 +222,18 @@ class AuthService:
                     'phoneNumber': None,
                     'bio': None,
                 },
-                'tenants': [],
+                **empty_memberships(),
                 'status': UserStatus.ACTIVE.value,
                 'createdAt': now,
                 'updatedAt': now,
                 'lastLoginAt': now,
                 'failedLoginAttempts': 0,
             }
-            self.db.collection('users').document(uid).set(user_data)
+            self.db.set('users', uid, user_data)
         else:
             # Update existing user
             user_data = user_doc.to_dict()
-            self.db.collection('users').document(uid).update({
+            self.db.update('users', uid, {
                 'lastLoginAt': datetime.utcnow(),
                 'updatedAt': datetime.utcnow(),
             })
@@ -318,7 +332,13 @@ class AuthService:
         Returns:
             User data dict or None
         """
-        user_doc = self.db.collection('users').document(user_id).get()
+        user_data = self._flights.do(('user', user_id), self._fetch_user, user_id)
+        # Concurrent callers share one result; give each its own (nested maps included)
+        return copy.deepcopy(user_data)
+
+    def _fetch_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Read user document from Firestore"""
+        user_doc = self.db.get('users', user_id)
         if not user_doc.exists:
             return None
 
@@ -326,6 +346,30 @@ class AuthService:
         user_data['id'] = user_doc.id
         return user_data
 
+    def get_user_fields(self, user_id: str, field_paths: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Get only the given fields of a user (Firestore field mask)
+
+        Args:
+            user_id: User ID
+            field_paths: Field paths to read
+
+        Returns:
+            Dict of the requested fields present plus 'id', or None if user not found
+        """
+        user_data = self._flights.do(
+            ('user', user_id, field_paths), self.db.get_fields, 'users', user_id, field_paths
+        )
+        return copy.deepcopy(user_data)
+
+    def get_user_email(self, user_id: str) -> Optional[UserEmailView]:
+        """Get user's email only (used by require_auth)"""
+        return self.get_user_fields(user_id, USER_EMAIL_FIELDS)
+
+    def get_user_memberships(self, user_id: str) -> Optional[UserMembershipsView]:
+        """Get user's membership fields only"""
+        return self.get_user_fields(user_id, MEMBERSHIP_FIELDS)
+
     def update_profile(
         self, user_id: str, updates: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -340,7 +384,7 @@ class AuthService:
             Updated user data
         """
         # Get current profile
-        user_doc = self.db.collection('users').document(user_id).get()
+        user_doc = self.db.get('users', user_id)
         if not user_doc.exists:
             raise ValueError('User not found')
 
@@ -350,7 +394,7 @@ class AuthService:
         updated_profile = {**current_profile, **updates}
 
         # Update in Firestore
-        self.db.collection('users').document(user_id).update({
+        self.db.update('users', user_id, {
             'profile': updated_profile,
             'updatedAt': datetime.utcnow(),
         })
@@ -375,7 +419,7 @@ class AuthService:
         expiry = datetime.utcnow() + timedelta(hours=24)
 
         # Store token in Firestore
-        self.db.collection('users').document(user_id).update({
+        self.db.update('users', user_id, {
             'emailVerificationToken': verification_token,
             'emailVerificationExpires': expiry,
         })
@@ -401,7 +445,7 @@ class AuthService:
         Raises:
             ValueError: If rate limit exceeded
         """
-        user = self.get_user(user_id)
+        user = self.get_user_email(user_id)
         if not user:
             raise ValueError('User not found')
 
@@ -423,9 +467,9 @@ class AuthService:
             ValueError: If token invalid or expired
         """
         # Find user by token
-        users_ref = self.db.collection('users')
-        query = users_ref.where('emailVerificationToken', '==', token).limit(1)
-        users = list(query.stream())
+        users = list(self.db.query(
+            'users', filters=[('emailVerificationToken', '==', token)], limit=1
+        ))
 
         if not users:
             raise ValueError('Invalid verification token')
@@ -439,7 +483,7 @@ class AuthService:
             raise ValueError('Verification token expired')
 
         # Update user
-        self.db.collection('users').document(user_doc.id).update({
+        self.db.update('users', user_doc.id, {
             'emailVerified': True,
             'emailVerificationToken': None,
             'emailVerificationExpires': None,
@@ -472,7 +516,7 @@ class AuthService:
         expiry = datetime.utcnow() + timedelta(hours=1)
 
         # Store token
-        self.db.collection('users').document(user_record.uid).update({
+        self.db.update('users', user_record.uid, {
             'passwordResetToken': reset_token,
             'passwordResetExpires': expiry,
         })
@@ -500,9 +544,9 @@ class AuthService:
             ValueError: If token invalid or expired
         """
         # Find user by token
-        users_ref = self.db.collection('users')
-        query = users_ref.where('passwordResetToken', '==', token).limit(1)
-        users = list(query.stream())
+        users = list(self.db.query(
+            'users', filters=[('passwordResetToken', '==', token)], limit=1
+        ))
 
         if not users:
             raise ValueError('Invalid reset token')
@@ -519,7 +563,7 @@ class AuthService:
         auth.update_user(user_doc.id, password=new_password)
 
         # Clear reset token and invalidate sessions
-        self.db.collection('users').document(user_doc.id).update({
+        self.db.update('users', user_doc.id, {
             'passwordResetToken': None,
             'passwordResetExpires': None,
             'updatedAt': datetime.utcnow(),
@@ -544,17 +588,17 @@ class AuthService:
         Raises:
             ValueError: If cannot delete (ownership transfer required)
         """
-        # Get user
-        user = self.get_user(user_id)
+        # Get user (membership fields only)
+        user = self.get_user_memberships(user_id)
         if not user:
             raise ValueError('User not found')
 
-        # Check if user owns any tenants
-        tenants = user.get('tenants', [])
-        for tenant_member in tenants:
-            # TODO: Get role details to check if owner
-            role_id = tenant_member.get('roleId')
-            if role_id == 'owner':  # System role ID
+        # Check if user owns any tenants (all roles resolved with one batched read)
+        from services.role_service import get_role_service
+
+        roles = get_role_service().get_membership_roles(get_memberships(user))
+        for role in roles.values():
+            if role.get('id') == SystemRoleID.OWNER or role.get('level', 0) == RoleLevel.OWNER:
                 raise ValueError(
                     'Cannot delete account. Please transfer store ownership first.'
                 )
@@ -565,7 +609,7 @@ class AuthService:
         # See login() method TODO for implementation details
 
         # Soft delete in Firestore
-        self.db.collection('users').document(user_id).update({
+        self.db.update('users', user_id, {
             'status': UserStatus.INACTIVE.value,
             'deletedAt': datetime.utcnow(),
             'updatedAt': datetime.utcnow(),
@@ -598,11 +642,14 @@ class AuthService:
 
 # Singleton instance
 _auth_service_instance = None
+_auth_service_lock = threading.Lock()
 
 
 def get_auth_service() -> AuthService:
     """Get or create AuthService singleton"""
     global _auth_service_instance
     if _auth_service_instance is None:
-        _auth_service_instance = AuthService()
+        with _auth_service_lock:
+            if _auth_service_instance is None:
+                _auth_service_instance = AuthService()
     return _auth_service_instance
@@ -0,0 +1,184 @@
+"""
+Authorization epoch - Per-tenant authzVersion counter for cross-instance cache coherence
+Every role or membership mutation bumps tenant_authz/{tenantId}.authzVersion in the
+same batch as the write; instances poll the counters (batched, rate-limited) and
+drop a tenant's cached authorization data when its version changes.
+"""
+
+import heapq
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from startup import lazy_import
+from storage.instrumented import ReadBudgetExceeded
+
+firestore = lazy_import('firebase_admin.firestore')
+
+
+AUTHZ_COLLECTION = 'tenant_authz'
+AUTHZ_VERSION_FIELD = 'authzVersion'
+
+
+def bump_authz_version(batch, tenant_id: str) -> None:
+    """
+    Add an authzVersion increment for a tenant to a write batch/transaction
+
+    Args:
+        batch: WriteBatch or Transaction the mutation is written in
+        tenant_id: Tenant whose authorization data changed
+    """
+    batch.set(
+        AUTHZ_COLLECTION,
+        tenant_id,
+        {
+            AUTHZ_VERSION_FIELD: firestore.Increment(1),
+            'updatedAt': firestore.SERVER_TIMESTAMP,
+        },
+        merge=True,
+    )
+
+
+class AuthzEpochTracker:
+    """
+    Tracks the last seen authzVersion of each tenant served by this instance
+
+    A tenant's counter is read at most once per check interval. When a check
+    is due, every other tenant whose check is also due is read in the same
+    get_all() round trip (up to max_batch), so the steady-state cost is one
+    small read per interval per instance, not one per request.
+    """
+
+    def __init__(
+        self,
+        db,
+        on_change: Callable[[str], None],
+        check_interval: Optional[float] = None,
+        max_batch: int = 100,
+    ):
+        """
+        Args:
+            db: Storage backend
+            on_change: Called with tenant_id when its version changed
+            check_interval: Seconds between checks per tenant
+                (default: AUTHZ_EPOCH_CHECK_INTERVAL env or 10)
+            max_batch: Maximum tenants read per round trip
+        """
+        self.db = db
+        self.on_change = on_change
+        if check_interval is None:
+            check_interval = float(os.getenv('AUTHZ_EPOCH_CHECK_INTERVAL', '10'))
+        self.check_interval = check_interval
+        self.max_batch = max_batch
+
+        self._versions: Dict[str, int] = {}
+        self._next_check: Dict[str, float] = {}
+        self._due_heap: List[tuple] = []  # (next_check, tenant_id), lazily pruned
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self, tenant_id: Optional[str]) -> None:
+        """
+        Make sure cached data for tenant is at most check_interval seconds stale
+
+        Args:
+            tenant_id: Tenant about to be served from cache
+        """
+        if not tenant_id:
+            return
+
+        now = time.monotonic()
+        if self._next_check.get(tenant_id, 0.0) > now:
+            return  # Fast path: checked recently
+
+        due = self._claim_due(tenant_id, now)
+        if due:
+            self._check(due)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Tenants tracked and approximate bytes of the version and schedule indexes"""
+        from observability.memory import deep_size
+        with self._lock:
+            structures = (dict(self._versions), dict(self._next_check), list(self._due_heap))
+        seen: set = set()
+        size = sum(deep_size(structure, seen) for structure in structures)
+        return {'entries': len(structures[0]), 'bytes': size}
+
+    def _claim_due(self, tenant_id: str, now: float) -> List[str]:
+        """Collect tenants due for a check and push their next check forward"""
+        with self._lock:
+            if self._next_check.get(tenant_id, 0.0) > now:
+                return []  # Another thread just claimed it
+
+            due = [tenant_id]
+            while self._due_heap and len(due) < self.max_batch:
+                next_check, other = self._due_heap[0]
+                if next_check > now:
+                    break
+                heapq.heappop(self._due_heap)
+                # Skip stale heap entries and duplicates
+                if other != tenant_id and self._next_check.get(other) == next_check:
+                    due.append(other)
+
+            # Only the requested tenant is re-armed in the heap; piggybacked
+            # tenants are re-armed by their own next request, so idle tenants
+            # stop being polled after one extra check.
+            next_check = now + self.check_interval
+            for tenant in due:
+                self._next_check[tenant] = next_check
+            heapq.heappush(self._due_heap, (next_check, tenant_id))
+            return due
+
+    async def ensure_fresh_async(self, tenant_id: Optional[str], db) -> None:
+        """
+        ensure_fresh for the async mode (reads through an AsyncStorage)
+
+        Args:
+            tenant_id: Tenant about to be served from cache
+            db: AsyncStorage to read the counters with
+        """
+        if not tenant_id:
+            return
+
+        now = time.monotonic()
+        if self._next_check.get(tenant_id, 0.0) > now:
+            return  # Fast path: checked recently
+
+        due = self._claim_due(tenant_id, now)
+        if not due:
+            return
+
+        keys = [(AUTHZ_COLLECTION, tenant) for tenant in due]
+        try:
+            snapshots = await db.get_all(keys, field_paths=[AUTHZ_VERSION_FIELD])
+        except Exception as e:
+            print(f"Error checking authz versions: {e}")
+            return
+        self._apply(snapshots)
+
+    def _check(self, tenant_ids: List[str]) -> None:
+        """Read authzVersion for tenants in one round trip and apply changes"""
+        keys = [(AUTHZ_COLLECTION, tenant_id) for tenant_id in tenant_ids]
+        try:
+            snapshots = self.db.get_all(keys, field_paths=[AUTHZ_VERSION_FIELD])
+        except ReadBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error checking authz versions: {e}")
+            return
+        self._apply(snapshots)
+
+    def _apply(self, snapshots) -> None:
+        """Record read versions and notify tenants whose version changed"""
+        changed = []
+        with self._lock:
+            for snapshot in snapshots:
+                data = snapshot.to_dict() if snapshot.exists else None
+                version = (data or {}).get(AUTHZ_VERSION_FIELD, 0)
+                previous = self._versions.get(snapshot.id)
+                self._versions[snapshot.id] = version
+                if previous is not None and previous != version:
+                    changed.append(snapshot.id)
+
+        for tenant_id in changed:
+            self.on_change(tenant_id)
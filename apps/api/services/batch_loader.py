@@ -0,0 +1,134 @@
+"""
+Batch Loader - Collect the documents a step needs and read them with one get_all()
+Keys are deduplicated, and documents already loaded during the current request
+are served from the loader's memo instead of being read again. Every caller gets
+its own copy of the document data, so changing a result never affects another.
+"""
+
+import copy
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Sequence
+
+from observability import metrics
+from storage import Snapshot, Storage
+from storage.base import DocKey
+
+
+# Process-wide totals (requested keys, documents fetched, round trips, round trips saved)
+batch_stats: Counter = Counter()
+_stats_lock = threading.Lock()
+
+metrics.callback(
+    'batch_loader_events_total',
+    'Batch loader totals (requested, fetched, round_trips, round_trips_saved)',
+    lambda: {(stat,): value for stat, value in batch_stats.items()},
+    ('stat',),
+    type='counter',
+)
+
+
+class BatchLoader:
+    """
+    Batched, memoized document loader
+
+    Usage:
+        loader = BatchLoader(db)
+        docs = loader.load([('tenant_roles', 'r1'), ('tenant_roles', 'r2')])
+        docs[('tenant_roles', 'r1')].to_dict()
+    """
+
+    def __init__(self, db: Storage):
+        self.db = db
+        self._memo: Dict[DocKey, Snapshot] = {}
+        self.requested = 0  # Keys asked for, including duplicates and memo hits
+        self.fetched = 0  # Documents actually read
+        self.round_trips = 0  # get_all() calls made
+        self.round_trips_saved = 0  # get() calls replaced by coalescing into get_all()
+
+    def load(
+        self, keys: Iterable[DocKey], field_paths: Optional[Sequence[str]] = None
+    ) -> Dict[DocKey, Snapshot]:
+        """
+        Load documents in one round trip
+
+        Args:
+            keys: (collection, doc_id) pairs; duplicates are fetched once
+            field_paths: Optional field mask (masked reads are not memoized)
+
+        Returns:
+            Dict of key -> Snapshot (missing documents have exists == False);
+            each snapshot's data is a copy owned by the caller
+        """
+        keys = list(keys)
+        unique = list(dict.fromkeys(keys))
+        memoize = field_paths is None
+
+        results = {key: _copy(self._memo[key]) for key in unique if memoize and key in self._memo}
+        missing = [key for key in unique if key not in results]
+
+        if missing:
+            for snapshot in self.db.get_all(missing, field_paths=field_paths):
+                if memoize:
+                    self._memo[snapshot.key] = snapshot
+                    snapshot = _copy(snapshot)
+                results[snapshot.key] = snapshot
+
+        round_trips = 1 if missing else 0
+        # Only keys actually read together count: memo hits and duplicates
+        # would not have been read again by a careful caller either
+        saved = max(len(missing) - 1, 0)
+        self.requested += len(keys)
+        self.fetched += len(missing)
+        self.round_trips += round_trips
+        self.round_trips_saved += saved
+
+        with _stats_lock:
+            batch_stats['requested'] += len(keys)
+            batch_stats['fetched'] += len(missing)
+            batch_stats['round_trips'] += round_trips
+            batch_stats['round_trips_saved'] += saved
+
+        return results
+
+    def forget(self, key: DocKey) -> None:
+        """Drop a memoized document (after writing it)"""
+        self._memo.pop(key, None)
+
+    def report(self) -> Dict[str, int]:
+        """Round trips used and saved by this loader"""
+        return {
+            'requested': self.requested,
+            'fetched': self.fetched,
+            'round_trips': self.round_trips,
+            'round_trips_saved': self.round_trips_saved,
+        }
+
+
+def _copy(snapshot: Snapshot) -> Snapshot:
+    """Snapshot with its own copy of the document data"""
+    return Snapshot(
+        snapshot.collection, snapshot.id, copy.deepcopy(snapshot.to_dict()), snapshot.update_time, snapshot.raw
+    )
+
+
+def request_batch_loader(db: Storage) -> BatchLoader:
+    """
+    Get the BatchLoader for the current Flask request (a fresh one outside requests)
+
+    Sharing one loader per request deduplicates reads across service calls
+    made while handling the same request.
+    """
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return BatchLoader(db)
+
+    if not has_request_context():
+        return BatchLoader(db)
+
+    loaders = g.setdefault('batch_loaders', {})
+    loader = loaders.get(id(db))
+    if loader is None:
+        loader = loaders[id(db)] = BatchLoader(db)
+    return loader
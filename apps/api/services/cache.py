@@ -0,0 +1,190 @@
+"""
+Tenant-scoped cache - In-memory cache indexed by tenant and by role
+Lets invalidation touch only the affected entries instead of clearing everything
+"""
+
+import threading
+import weakref
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+from observability import metrics
+
+_MISSING = object()
+_caches: 'weakref.WeakSet[TenantScopedCache]' = weakref.WeakSet()
+
+
+def _cache_sizes() -> Dict[tuple, int]:
+    sizes: Dict[tuple, int] = {}
+    for cache in list(_caches):
+        sizes[(cache.name,)] = sizes.get((cache.name,), 0) + len(cache)
+    return sizes
+
+
+def registered_caches() -> List['TenantScopedCache']:
+    """Every live TenantScopedCache of this process"""
+    return list(_caches)
+
+
+CACHE_LOOKUPS = metrics.counter('cache_lookups_total', 'Cache lookups by result (hit/miss)', ('cache', 'result'))
+metrics.callback('cache_entries', 'Entries held per cache', _cache_sizes, ('cache',))
+
+
+class TenantScopedCache:
+    """
+    Dict-backed cache whose entries are tagged with a tenant ID and a role ID
+
+    Every entry is registered in two secondary indexes (tenant -> keys,
+    role -> keys), so invalidating a tenant or a role costs O(affected keys)
+    and leaves every other tenant's entries warm.
+    """
+
+    SYSTEM_TENANT = 'system'
+
+    def __init__(self, name: str = 'default'):
+        """
+        Args:
+            name: Label used in the cache metrics
+        """
+        self.name = name
+        self._entries: Dict[Hashable, Any] = {}
+        self._tags: Dict[Hashable, tuple] = {}  # key -> (tenant_id, role_id)
+        self._by_tenant: Dict[str, Set[Hashable]] = {}
+        self._by_role: Dict[str, Set[Hashable]] = {}
+        self._generations: Dict[str, int] = {}  # Bumped on every tenant invalidation
+        self._clears = 0  # Bumped on every clear()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get cached value (lock-free read)"""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            CACHE_LOOKUPS.inc((self.name, 'miss'))
+            return default
+        CACHE_LOOKUPS.inc((self.name, 'hit'))
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Entries and approximate bytes retained, including the tenant/role indexes"""
+        from observability.memory import deep_size
+
+        # Walk consistent copies: writers resize the dicts and index sets under the lock
+        with self._lock:
+            structures = (
+                dict(self._entries),
+                dict(self._tags),
+                {tenant_id: set(keys) for tenant_id, keys in self._by_tenant.items()},
+                {role_id: set(keys) for role_id, keys in self._by_role.items()},
+                dict(self._generations),
+            )
+
+        seen: set = set()
+        size = sum(deep_size(structure, seen) for structure in structures)
+        return {'entries': len(structures[0]), 'bytes': size}
+
+    def generation(self, tenant_id: Optional[str]) -> tuple:
+        """
+        Current invalidation generation of a tenant
+
+        Read it before fetching and pass it to set(), so a fetch that raced
+        with an invalidation does not write stale data back into the cache.
+        """
+        return (self._clears, self._generations.get(tenant_id or self.SYSTEM_TENANT, 0))
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tenant_id: Optional[str] = None,
+        role_id: Optional[str] = None,
+        generation: Optional[tuple] = None,
+    ) -> None:
+        """
+        Store value and index it by tenant and role
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            tenant_id: Owning tenant (None for system-scoped entries)
+            role_id: Role the entry depends on (optional)
+            generation: Tenant generation read before fetching (optional);
+                the value is dropped if the tenant was invalidated since
+        """
+        tenant_tag = tenant_id or self.SYSTEM_TENANT
+        with self._lock:
+            if generation is not None and generation != (
+                self._clears, self._generations.get(tenant_tag, 0)
+            ):
+                return
+            if key in self._tags:
+                self._remove(key)
+            self._entries[key] = value
+            self._tags[key] = (tenant_tag, role_id)
+            self._by_tenant.setdefault(tenant_tag, set()).add(key)
+            if role_id:
+                self._by_role.setdefault(role_id, set()).add(key)
+
+    def invalidate_tenant(self, tenant_id: Optional[str]) -> int:
+        """
+        Drop all entries belonging to a tenant
+
+        Returns:
+            Number of entries removed
+        """
+        tenant_tag = tenant_id or self.SYSTEM_TENANT
+        with self._lock:
+            self._generations[tenant_tag] = self._generations.get(tenant_tag, 0) + 1
+            keys = self._by_tenant.pop(tenant_tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate_role(self, role_id: str) -> int:
+        """
+        Drop all entries that depend on a role (across tenants)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = self._by_role.pop(role_id, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            if key in self._tags:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._clears += 1
+            self._entries = {}
+            self._tags = {}
+            self._by_tenant = {}
+            self._by_role = {}
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove entry and its remaining index references (caller holds lock)"""
+        tenant_tag, role_id = self._tags.pop(key, (None, None))
+        self._entries.pop(key, None)
+        tenant_keys = self._by_tenant.get(tenant_tag)
+        if tenant_keys is not None:
+            tenant_keys.discard(key)
+            if not tenant_keys:
+                del self._by_tenant[tenant_tag]
+        if role_id:
+            role_keys = self._by_role.get(role_id)
+            if role_keys is not None:
+                role_keys.discard(key)
+                if not role_keys:
+                    del self._by_role[role_id]
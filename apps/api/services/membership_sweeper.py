@@ -0,0 +1,222 @@
+"""
+Membership Sweeper - Background revocation of expired tenant memberships
+Expiring memberships are indexed in membership_expirations/{userId}__{tenantId}
+(ordered by expiresAt), so the sweeper reads only what is about to expire
+instead of scanning users. Upcoming entries are held in a min-heap and revoked
+in batches as they come due.
+"""
+
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Set
+
+from models.user import UserStatus
+from storage import ASCENDING
+from services.authz_epoch import bump_authz_version
+from services.memberships import MEMBERSHIPS_FIELD, membership_field_path
+
+
+EXPIRATIONS_COLLECTION = 'membership_expirations'
+
+
+def _expiration_id(user_id: str, tenant_id: str) -> str:
+    return f"{user_id}__{tenant_id}"
+
+
+def schedule_membership_expiry(
+    batch, user_id: str, tenant_id: str, expires_at: Optional[datetime]
+) -> None:
+    """
+    Index (or un-index) a membership expiry in the same write as the membership
+
+    Args:
+        batch: WriteBatch or Transaction writing the membership
+        user_id: User ID
+        tenant_id: Tenant ID
+        expires_at: Expiration time, or None to remove the expiry
+    """
+    doc_id = _expiration_id(user_id, tenant_id)
+    if expires_at is None:
+        batch.delete(EXPIRATIONS_COLLECTION, doc_id)
+    else:
+        batch.set(
+            EXPIRATIONS_COLLECTION, doc_id,
+            {'userId': user_id, 'tenantId': tenant_id, 'expiresAt': expires_at},
+        )
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (written with utcnow()) as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class MembershipSweeper:
+    """
+    Revokes memberships whose expiresAt has passed
+
+    Every poll loads expirations due within the lookahead window into a
+    min-heap, then sleeps until the earliest one. Due entries are revoked in
+    one transaction per batch_size entries, together with deleting their
+    index documents and bumping each affected tenant's authzVersion. The
+    transaction re-reads each membership first: removed ones (or deleted
+    users) only lose their index entry, and renewed ones are re-indexed
+    instead of revoked. Index writes carry a last-update precondition, so
+    several instances can sweep at once without double-processing an entry.
+    """
+
+    def __init__(
+        self,
+        db,
+        on_revoked: Optional[Callable[[str], None]] = None,
+        batch_size: int = 200,
+        lookahead: float = 300,
+    ):
+        """
+        Args:
+            db: Storage backend
+            on_revoked: Called with tenant_id after memberships were revoked
+            batch_size: Maximum memberships revoked per batch write
+            lookahead: Seconds ahead to prefetch expirations into the heap
+        """
+        self.db = db
+        self.on_revoked = on_revoked
+        self.batch_size = batch_size
+        self.lookahead = lookahead
+
+        self._heap: List[tuple] = []  # (expiresAt, doc_id, snapshot)
+        self._queued: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the sweeper daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='membership-sweeper', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sweeper thread"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep_once()
+            except Exception as e:
+                print(f"Membership sweeper error: {e}")
+
+            wait = self.lookahead
+            if self._heap:
+                until_next = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+                wait = min(wait, max(until_next, 0.5))
+            self._stop.wait(wait)
+
+    def sweep_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Refill the heap and revoke every due membership
+
+        Returns:
+            Number of memberships revoked
+        """
+        now = now or datetime.now(timezone.utc)
+        self._load_upcoming(now + timedelta(seconds=self.lookahead))
+
+        revoked = 0
+        while self._heap and self._heap[0][0] <= now:
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                _, doc_id, snapshot = heapq.heappop(self._heap)
+                self._queued.discard(doc_id)
+                due.append(snapshot)
+            revoked += self._revoke(due)
+        return revoked
+
+    def _load_upcoming(self, horizon: datetime) -> None:
+        """Push expirations due before horizon into the heap (index range read)"""
+        query = self.db.query(
+            EXPIRATIONS_COLLECTION,
+            filters=[('expiresAt', '<=', horizon)],
+            order_by=[('expiresAt', ASCENDING)],
+            limit=self.batch_size,
+        )
+
+        for snapshot in query:
+            if snapshot.id in self._queued:
+                continue
+            expires_at = as_utc(snapshot.to_dict()['expiresAt'])
+            heapq.heappush(self._heap, (expires_at, snapshot.id, snapshot))
+            self._queued.add(snapshot.id)
+
+    def _revoke(self, snapshots: list) -> int:
+        """Revoke memberships in one batch; retry individually on conflict"""
+        if not snapshots:
+            return 0
+        try:
+            return self._commit(snapshots)
+        except Exception as e:
+            if len(snapshots) == 1:
+                # Renewed or already swept by another instance
+                print(f"Skipping membership expiry {snapshots[0].id}: {e}")
+                return 0
+
+        return sum(self._revoke([snapshot]) for snapshot in snapshots)
+
+    def _commit(self, snapshots: list) -> int:
+        """Revoke the due memberships that still exist and are still expired"""
+        now = datetime.now(timezone.utc)
+
+        def revoke(transaction) -> List[str]:
+            entries = [snapshot.to_dict() for snapshot in snapshots]
+            user_ids = list(dict.fromkeys(entry['userId'] for entry in entries))
+            users = transaction.get_all(
+                [('users', user_id) for user_id in user_ids], field_paths=[MEMBERSHIPS_FIELD]
+            )
+            memberships = {
+                user.id: (user.to_dict() or {}).get(MEMBERSHIPS_FIELD) or {}
+                for user in users if user.exists
+            }
+
+            revoked: List[str] = []  # Tenant of every revoked membership
+            for snapshot, entry in zip(snapshots, entries):
+                user_id, tenant_id = entry['userId'], entry['tenantId']
+                member = memberships.get(user_id, {}).get(tenant_id)
+                expires_at = member.get('expiresAt') if member else None
+
+                if expires_at is not None and as_utc(expires_at) > now:
+                    # Renewed since it was indexed: move the index entry
+                    transaction.update(
+                        EXPIRATIONS_COLLECTION, snapshot.id, {'expiresAt': expires_at},
+                        last_update_time=snapshot.update_time,
+                    )
+                    continue
+
+                transaction.delete(
+                    EXPIRATIONS_COLLECTION, snapshot.id, last_update_time=snapshot.update_time
+                )
+                if expires_at is None:
+                    # Membership (or user) removed, or no longer expiring
+                    continue
+
+                transaction.update('users', user_id, {
+                    membership_field_path(tenant_id, 'status'): UserStatus.INACTIVE.value,
+                    membership_field_path(tenant_id, 'revokedAt'): now,
+                })
+                revoked.append(tenant_id)
+
+            for tenant_id in dict.fromkeys(revoked):
+                bump_authz_version(transaction, tenant_id)
+            return revoked
+
+        revoked = self.db.run_transaction(revoke)
+
+        if self.on_revoked:
+            for tenant_id in dict.fromkeys(revoked):
+                self.on_revoked(tenant_id)
+        return len(revoked)
@@ -0,0 +1,202 @@
+"""
+Tenant memberships - Map-keyed membership storage on user documents
+users/{uid}.tenantMemberships is a map of tenantId -> TenantMember data, replacing
+the legacy `tenants` array so a single membership can be read with a field mask.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+from startup import lazy_import
+
+from models.user import TenantMemberData
+from storage.instrumented import ReadBudgetExceeded
+
+field_path = lazy_import('google.cloud.firestore_v1.field_path')
+transforms = lazy_import('google.cloud.firestore_v1.transforms')
+
+
+MEMBERSHIPS_FIELD = 'tenantMemberships'
+MIGRATED_FIELD = 'membershipsMigrated'  # True once tenantMemberships is authoritative
+LEGACY_TENANTS_FIELD = 'tenants'
+
+# Field mask covering every membership representation (for get_memberships)
+MEMBERSHIP_FIELDS = (MEMBERSHIPS_FIELD, MIGRATED_FIELD, LEGACY_TENANTS_FIELD)
+
+
+def membership_field_path(tenant_id: str, *subfields: str) -> str:
+    """
+    Field path of a tenant's membership entry (quoted for use in masks/queries)
+
+    Example:
+        membership_field_path('t-1', 'roleId') -> 'tenantMemberships.`t-1`.roleId'
+    """
+    return field_path.FieldPath(MEMBERSHIPS_FIELD, tenant_id, *subfields).to_api_repr()
+
+
+def memberships_from_array(tenants: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Convert legacy `tenants` array to a tenantId-keyed map"""
+    memberships = {}
+    for tenant_member in tenants or []:
+        tenant_id = tenant_member.get('tenantId')
+        if tenant_id:
+            memberships[tenant_id] = tenant_member
+    return memberships
+
+
+def get_memberships(user_data: Dict[str, Any]) -> Dict[str, TenantMemberData]:
+    """
+    Get tenantId-keyed memberships from a user document (full or MEMBERSHIP_FIELDS)
+
+    Falls back to the legacy `tenants` array for documents not yet migrated.
+    """
+    if user_data.get(MIGRATED_FIELD):
+        return user_data.get(MEMBERSHIPS_FIELD) or {}
+    return memberships_from_array(user_data.get(LEGACY_TENANTS_FIELD, []))
+
+
+def migration_update(tenants: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the update that migrates a legacy `tenants` array to the map
+
+    The array is removed in the same write: nothing maintains it once the map
+    is authoritative, so keeping it would only let the two drift apart.
+    """
+    return {
+        MEMBERSHIPS_FIELD: memberships_from_array(tenants),
+        MIGRATED_FIELD: True,
+        LEGACY_TENANTS_FIELD: transforms.DELETE_FIELD,
+    }
+
+
+def empty_memberships() -> Dict[str, Any]:
+    """Membership fields for a newly created user document"""
+    return {
+        MEMBERSHIPS_FIELD: {},
+        MIGRATED_FIELD: True,
+    }
+
+
+def write_membership(
+    batch, user_id: str, tenant_id: str, fields: Dict[str, Any], last_update_time=None
+) -> None:
+    """
+    Create or edit a user's membership in a tenant
+
+    Every membership write goes through here: when the fields include
+    expiresAt, the membership_expirations index entry is written (or removed,
+    for None) in the same commit, so the sweeper sees every expiry.
+
+    Args:
+        batch: WriteBatch or Transaction
+        user_id: User ID (the user document must exist)
+        tenant_id: Tenant ID
+        fields: Membership fields to set
+        last_update_time: Optional precondition on the user document
+    """
+    from services.membership_sweeper import schedule_membership_expiry
+
+    batch.update(
+        'users', user_id,
+        {membership_field_path(tenant_id, name): value for name, value in fields.items()},
+        last_update_time=last_update_time,
+    )
+    if 'expiresAt' in fields:
+        schedule_membership_expiry(batch, user_id, tenant_id, fields['expiresAt'])
+
+
+def read_membership(db, user_id: str, tenant_id: str) -> Optional[TenantMemberData]:
+    """
+    Read one membership entry with a field mask
+
+    Migrated documents cost a single masked read of the one map entry.
+    Legacy documents are migrated in place inside a transaction (so a
+    concurrent first request or membership edit is never overwritten), so
+    the slow path runs at most once per user.
+
+    Args:
+        db: Storage backend
+        user_id: User ID
+        tenant_id: Tenant ID
+
+    Returns:
+        Membership data dict or None if user is not a member
+    """
+    snapshot = db.get('users', user_id, field_paths=[membership_field_path(tenant_id), MIGRATED_FIELD])
+    if not snapshot.exists:
+        return None
+
+    data = snapshot.to_dict() or {}
+    if data.get(MIGRATED_FIELD):
+        return (data.get(MEMBERSHIPS_FIELD) or {}).get(tenant_id)
+
+    try:
+        return db.run_transaction(lambda transaction: migrate_user_memberships(transaction, user_id, tenant_id))
+    except ReadBudgetExceeded:
+        raise
+    except Exception as e:
+        print(f"Error migrating memberships for user {user_id}: {e}")
+
+    # Serve this request from the array; the next one retries the migration
+    legacy = db.get('users', user_id, field_paths=[MIGRATED_FIELD, LEGACY_TENANTS_FIELD])
+    return get_memberships(legacy.to_dict() or {}).get(tenant_id)
+
+
+def migrate_user_memberships(transaction, user_id: str, tenant_id: Optional[str] = None) -> Optional[TenantMemberData]:
+    """
+    Migrate one user's legacy `tenants` array to the map within a transaction
+
+    The write is conditioned on the document being unchanged since it was
+    read; documents already migrated (e.g. by a concurrent request) are left
+    alone.
+
+    Args:
+        transaction: Transaction to read and write in
+        user_id: User ID
+        tenant_id: Tenant whose membership is returned (optional)
+
+    Returns:
+        The tenant's membership data, or None
+    """
+    from services.membership_sweeper import schedule_membership_expiry
+
+    snapshot = transaction.get('users', user_id, field_paths=[MIGRATED_FIELD, MEMBERSHIPS_FIELD, LEGACY_TENANTS_FIELD])
+    if not snapshot.exists:
+        return None
+
+    data = snapshot.to_dict() or {}
+    if not data.get(MIGRATED_FIELD):
+        tenants = data.get(LEGACY_TENANTS_FIELD, [])
+        transaction.update('users', user_id, migration_update(tenants), last_update_time=snapshot.update_time)
+        for tenant_member in tenants:
+            if tenant_member.get('expiresAt') and tenant_member.get('tenantId'):
+                schedule_membership_expiry(
+                    transaction, user_id, tenant_member['tenantId'], tenant_member['expiresAt']
+                )
+
+    return get_memberships(data).get(tenant_id) if tenant_id else None
+
+
+async def read_membership_async(db, sync_db, user_id: str, tenant_id: str) -> Optional[TenantMemberData]:
+    """
+    read_membership for the async mode
+
+    Args:
+        db: AsyncStorage for the masked read
+        sync_db: Storage used (in a worker thread) to migrate legacy documents
+        user_id: User ID
+        tenant_id: Tenant ID
+
+    Returns:
+        Membership data dict or None if user is not a member
+    """
+    snapshot = await db.get('users', user_id, field_paths=[membership_field_path(tenant_id), MIGRATED_FIELD])
+    if not snapshot.exists:
+        return None
+
+    data = snapshot.to_dict() or {}
+    if data.get(MIGRATED_FIELD):
+        return (data.get(MEMBERSHIPS_FIELD) or {}).get(tenant_id)
+
+    # Legacy document (once per user): the sync path reads and migrates it
+    return await asyncio.to_thread(read_membership, sync_db, user_id, tenant_id)
@@ -0,0 +1,121 @@
+"""
+Role Catalog - Denormalized per-tenant role summaries
+tenant_role_catalogs/{tenantId} holds a copy of every custom role of the tenant
+(keyed by role ID) plus its effective permissions mask, so listing, filtering
+and searching roles is one document read plus in-memory filtering. The catalog
+is written in the same transaction as the role documents it summarizes.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from models.role import UserPermissions
+
+
+CATALOG_COLLECTION = 'tenant_role_catalogs'
+
+# Bumped when entries change shape; older catalogs are rebuilt from tenant_roles
+CATALOG_VERSION = 2
+
+# Bit i of a permissions mask is PERMISSION_FIELDS[i] (append only: masks are stored)
+PERMISSION_FIELDS = tuple(UserPermissions().dict().keys())
+
+# Role fields copied into catalog entries (every field of a tenant role document)
+SUMMARY_FIELDS = (
+    'tenantId', 'name', 'description', 'level', 'permissions', 'inheritsFrom',
+    'isActive', 'isCustom', 'createdBy', 'createdAt', 'updatedAt',
+)
+
+
+def permissions_to_mask(permissions: UserPermissions) -> int:
+    """Encode permissions as a bitmask"""
+    values = permissions.dict()
+    mask = 0
+    for bit, field in enumerate(PERMISSION_FIELDS):
+        if values.get(field):
+            mask |= 1 << bit
+    return mask
+
+
+def mask_to_permissions(mask: int) -> UserPermissions:
+    """Decode a bitmask back to permissions"""
+    return UserPermissions(**{
+        field: bool(mask & (1 << bit)) for bit, field in enumerate(PERMISSION_FIELDS)
+    })
+
+
+def role_summary(role_id: str, role: Dict[str, Any], permissions_mask: int) -> Dict[str, Any]:
+    """
+    Catalog entry for a role
+
+    `permissions` stays the role's own permissions, as in the role document;
+    `permissionsMask` is the effective mask, with inherited permissions merged in.
+    """
+    summary = {'id': role_id, 'permissionsMask': permissions_mask}
+    for field in SUMMARY_FIELDS:
+        if role.get(field) is not None:
+            summary[field] = role[field]
+    return summary
+
+
+def catalog_roles(catalog: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Entries of a catalog document, or None if it predates CATALOG_VERSION"""
+    if catalog.get('version') != CATALOG_VERSION:
+        return None
+    return catalog.get('roles') or {}
+
+
+def descendants(roles: Dict[str, Dict[str, Any]], role_id: str) -> List[str]:
+    """IDs of catalog roles inheriting (directly or not) from role_id, parents first"""
+    children: Dict[str, List[str]] = {}
+    for entry_id, entry in roles.items():
+        if entry.get('inheritsFrom'):
+            children.setdefault(entry['inheritsFrom'], []).append(entry_id)
+
+    found: List[str] = []
+    seen = {role_id}
+    frontier = [role_id]
+    while frontier:
+        next_frontier = []
+        for parent_id in frontier:
+            for child_id in children.get(parent_id, []):
+                if child_id not in seen:
+                    seen.add(child_id)
+                    found.append(child_id)
+                    next_frontier.append(child_id)
+        frontier = next_frontier
+    return found
+
+
+def filter_roles(roles: Iterable[Dict[str, Any]], filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Filter role summaries in memory
+
+    Args:
+        roles: Role summaries
+        filters: Optional isCustom, isActive, minLevel, maxLevel and search
+            (case-insensitive match on name/description); None values are ignored
+    """
+    filters = filters or {}
+    is_custom = filters.get('isCustom')
+    is_active = filters.get('isActive')
+    min_level = filters.get('minLevel')
+    max_level = filters.get('maxLevel')
+    search = (filters.get('search') or '').strip().lower()
+
+    matched = []
+    for role in roles:
+        if is_custom is not None and bool(role.get('isCustom')) != is_custom:
+            continue
+        if is_active is not None and role.get('isActive', True) != is_active:
+            continue
+        level = role.get('level', 0)
+        if min_level is not None and level < min_level:
+            continue
+        if max_level is not None and level > max_level:
+            continue
+        if search:
+            text = f"{role.get('name', '')} {role.get('description') or ''}".lower()
+            if search not in text:
+                continue
+        matched.append(role)
+    return matched
@@ -3,9 +3,10 @@ Role Service - Role lookup, permission resolution, and RBAC logic
 Handles both system roles and custom tenant roles
 """
 
-from typing import Optional, List, Dict, Any
-from firebase_admin import firestore
-from datetime import datetime
+import threading
+import time
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timezone
 
 from models.role import (
     SystemRole,
@@ -16,14 +17,85 @@ from models.role import (
     RoleLevel,
     DEFAULT_SYSTEM_ROLES,
 )
+from startup import lazy_import
+from observability.tracing import trace_methods, untraced
+from storage import Storage, get_storage
+from storage.instrumented import ReadBudgetExceeded
+from services.cache import TenantScopedCache
+from services.authz_epoch import AuthzEpochTracker, bump_authz_version
+from services.system_roles import SystemRoleReplica
+from services.single_flight import SingleFlight
+from services.batch_loader import request_batch_loader
+from services.role_catalog import (
+    CATALOG_COLLECTION,
+    CATALOG_VERSION,
+    catalog_roles,
+    descendants,
+    filter_roles,
+    mask_to_permissions,
+    permissions_to_mask,
+    role_summary,
+)
+from services.memberships import (
+    LEGACY_TENANTS_FIELD, MEMBERSHIPS_FIELD, MIGRATED_FIELD, membership_field_path,
+    memberships_from_array, read_membership,
+)
+from services.membership_sweeper import MembershipSweeper, as_utc
+
+firestore = lazy_import('firebase_admin.firestore')
 
+LEGACY_SCAN_TTL = 60  # Seconds one scan of unmigrated users serves member listings
 
+
+@trace_methods
 class RoleService:
     """Service for managing roles and permissions"""
 
-    def __init__(self):
-        self.db = firestore.client()
-        self._role_cache = {}  # Simple in-memory cache
+    def __init__(self, storage: Optional[Storage] = None):
+        self.db = storage or get_storage()
+        self._role_cache = TenantScopedCache('roles')  # Indexed by tenant and role
+        self._permissions_cache = TenantScopedCache('permissions')  # Flattened effective permissions
+        self._membership_cache = TenantScopedCache('memberships')  # (user_id, tenant_id) -> membership
+        self._catalog_cache = TenantScopedCache('role_catalogs')  # tenant_id -> role catalog entries
+        self._epochs = AuthzEpochTracker(self.db, on_change=self.invalidate_tenant_cache)
+        self._system_roles = SystemRoleReplica(self.db, on_change=self.invalidate_system_role_cache)
+        self._flights = SingleFlight()  # Coalesces concurrent cold lookups
+        self._sweeper = None  # Started on demand (see start_membership_sweeper)
+        self._legacy_scan: Optional[Tuple[float, Dict[str, Dict[str, Any]]]] = None  # (time, memberships)
+        self._legacy_done = False  # No unmigrated users left: the fallback scan is off
+        self._system_roles.start()
+
+    # Cache and epoch API, shared with AsyncRoleService (same entries, same invalidations)
+
+    @property
+    def role_cache(self) -> TenantScopedCache:
+        """(role_id, tenant_id) -> tenant role document"""
+        return self._role_cache
+
+    @property
+    def permissions_cache(self) -> TenantScopedCache:
+        """(role_id, tenant_id) -> flattened effective UserPermissions"""
+        return self._permissions_cache
+
+    @property
+    def membership_cache(self) -> TenantScopedCache:
+        """(user_id, tenant_id) -> membership"""
+        return self._membership_cache
+
+    @property
+    def catalog_cache(self) -> TenantScopedCache:
+        """tenant_id -> role catalog entries"""
+        return self._catalog_cache
+
+    @untraced
+    def ensure_fresh(self, tenant_id: Optional[str]) -> None:
+        """Drop the tenant's cached entries if its authz version moved (see AuthzEpochTracker)"""
+        self._epochs.ensure_fresh(tenant_id)
+
+    @untraced
+    async def ensure_fresh_async(self, tenant_id: Optional[str], db) -> None:
+        """ensure_fresh reading the authz version through an AsyncStorage"""
+        await self._epochs.ensure_fresh_async(tenant_id, db)
 
     def get_role(self, role_id: str, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
@@ -36,43 +108,45 @@ class RoleService:
         Returns:
             Role data dict or None if not found
         """
-        # Check cache first
-        cache_key = f"{role_id}:{tenant_id or 'system'}"
-        if cache_key in self._role_cache:
-            return self._role_cache[cache_key]
-
-        # Try system roles first
-        system_role = self._get_system_role(role_id)
+        # Try system roles first (in-memory replica, no cache needed)
+        system_role = self.get_system_role(role_id)
         if system_role:
-            self._role_cache[cache_key] = system_role
             return system_role
 
-        # Try tenant roles
+        # Check cache
+        self._epochs.ensure_fresh(tenant_id)
+        cache_key = (role_id, tenant_id)
+        cached = self._role_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Try tenant roles (one fetch per key, shared by concurrent callers)
         if tenant_id:
-            tenant_role = self._get_tenant_role(role_id, tenant_id)
-            if tenant_role:
-                self._role_cache[cache_key] = tenant_role
-                return tenant_role
+            return self._flights.do(
+                ('role', role_id, tenant_id), self._load_tenant_role, role_id, tenant_id
+            )
 
         return None
 
-    def _get_system_role(self, role_id: str) -> Optional[Dict[str, Any]]:
-        """Get system role from Firestore"""
-        try:
-            doc = self.db.collection('system_roles').document(role_id).get()
-            if doc.exists:
-                role_data = doc.to_dict()
-                role_data['id'] = doc.id
-                return role_data
-        except Exception as e:
-            print(f"Error fetching system role {role_id}: {e}")
+    def _load_tenant_role(self, role_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch tenant role and populate the cache"""
+        generation = self._role_cache.generation(tenant_id)
+        tenant_role = self._get_tenant_role(role_id, tenant_id)
+        if tenant_role:
+            self._role_cache.set(
+                (role_id, tenant_id), tenant_role, tenant_id, role_id, generation=generation
+            )
+        return tenant_role
 
-        return None
+    @untraced
+    def get_system_role(self, role_id: str) -> Optional[Dict[str, Any]]:
+        """Get system role from the in-memory replica"""
+        return self._system_roles.get(role_id)
 
     def _get_tenant_role(self, role_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
-        """Get tenant-specific custom role from Firestore"""
+        """Get tenant-specific custom role from storage"""
         try:
-            doc = self.db.collection('tenant_roles').document(role_id).get()
+            doc = self.db.get('tenant_roles', role_id)
             if doc.exists:
                 role_data = doc.to_dict()
 
@@ -84,11 +158,69 @@ class RoleService:
                 return role_data
         except Exception as e:
             print(f"Error fetching tenant role {role_id}: {e}")
-            if isinstance(e, PermissionError):
+            if isinstance(e, (PermissionError, ReadBudgetExceeded)):
                 raise
 
         return None
 
+    def get_roles(self, role_ids: List[str], tenant_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several roles at once (system, cached, then one batched read)
+
+        Args:
+            role_ids: Role IDs to lookup (duplicates allowed)
+            tenant_id: Tenant the custom roles must belong to
+
+        Returns:
+            Dict of role_id -> role data (roles not found are omitted)
+        """
+        self._epochs.ensure_fresh(tenant_id)
+        roles = {}
+        missing = []
+
+        for role_id in dict.fromkeys(role_ids):
+            role = self.get_system_role(role_id) or self._role_cache.get((role_id, tenant_id))
+            if role is not None:
+                roles[role_id] = role
+            elif tenant_id:
+                missing.append(role_id)
+
+        if len(missing) == 1:
+            # Single key: go through get_role to share the fetch with concurrent callers
+            role = self.get_role(missing[0], tenant_id)
+            if role:
+                roles[missing[0]] = role
+        elif missing:
+            roles.update(self._load_tenant_roles(missing, tenant_id))
+
+        return roles
+
+    def _load_tenant_roles(self, role_ids: List[str], tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        """Fetch tenant roles with one get_all() and populate the cache"""
+        generation = self._role_cache.generation(tenant_id)
+        loader = request_batch_loader(self.db)
+        snapshots = loader.load([('tenant_roles', role_id) for role_id in role_ids])
+
+        roles = {}
+        for role_id in role_ids:
+            doc = snapshots[('tenant_roles', role_id)]
+            if not doc.exists:
+                continue
+
+            role_data = doc.to_dict()
+            if role_data.get('tenantId') != tenant_id:
+                # Not visible from this tenant
+                print(f"Error fetching tenant role {role_id}: does not belong to tenant {tenant_id}")
+                continue
+
+            role_data['id'] = role_id
+            self._role_cache.set(
+                (role_id, tenant_id), role_data, tenant_id, role_id, generation=generation
+            )
+            roles[role_id] = role_data
+
+        return roles
+
     def get_effective_permissions(self, role_id: str, tenant_id: Optional[str] = None) -> UserPermissions:
         """
         Get effective permissions for a role (includes inherited permissions)
@@ -100,23 +232,130 @@ class RoleService:
         Returns:
             UserPermissions object with all effective permissions
         """
-        role = self.get_role(role_id, tenant_id)
+        return self.get_effective_permissions_many([role_id], tenant_id)[role_id]
+
+    def get_effective_permissions_many(
+        self, role_ids: List[str], tenant_id: Optional[str] = None
+    ) -> Dict[str, UserPermissions]:
+        """
+        Get effective permissions for several roles of one tenant
+
+        Inheritance chains are loaded level by level: every role missing at a
+        given depth of any chain is fetched in one batched read.
+
+        Args:
+            role_ids: Role IDs
+            tenant_id: Tenant ID (optional)
+
+        Returns:
+            Dict of role_id -> UserPermissions
+        """
+        self._epochs.ensure_fresh(tenant_id)
+        generation = self._permissions_cache.generation(tenant_id)
+        results: Dict[str, UserPermissions] = {}
+        roles: Dict[str, Dict[str, Any]] = {}
+        resolved: Dict[str, UserPermissions] = {}
+
+        frontier = []
+        for role_id in dict.fromkeys(role_ids):
+            cached = self._permissions_cache.get((role_id, tenant_id))
+            if cached is not None:
+                results[role_id] = cached
+            else:
+                frontier.append(role_id)
+
+        # Walk the chains one level at a time (one read per level, not per role)
+        requested = set(frontier)
+        while frontier:
+            loaded = self.get_roles(frontier, tenant_id)
+            roles.update(loaded)
+            frontier = []
+            for role in loaded.values():
+                parent_id = role.get('inheritsFrom')
+                if not parent_id or parent_id in requested:
+                    continue
+                requested.add(parent_id)
+                cached = self._permissions_cache.get((parent_id, tenant_id))
+                if cached is not None:
+                    resolved[parent_id] = cached  # Kept even if evicted before flattening
+                else:
+                    frontier.append(parent_id)
+
+        for role_id in role_ids:
+            if role_id not in results:
+                results[role_id] = self.flatten_permissions(
+                    role_id, tenant_id, roles, resolved, generation=generation
+                )
+
+        return results
+
+    @untraced
+    def flatten_permissions(
+        self,
+        role_id: str,
+        tenant_id: Optional[str],
+        roles: Dict[str, Dict[str, Any]],
+        resolved: Optional[Dict[str, UserPermissions]] = None,
+        generation: Optional[tuple] = None,
+    ) -> UserPermissions:
+        """
+        Merge a role's permissions over its (already loaded) ancestors (cached)
+
+        Args:
+            role_id: Role ID
+            tenant_id: Tenant ID (optional)
+            roles: Loaded roles by ID
+            resolved: Effective permissions already known, by role ID
+            generation: permissions_cache generation of the tenant, taken
+                before the roles were read (defaults to the current one)
+
+        Results are cached only when the whole chain was available: a role
+        whose parent is missing from roles is flattened over the defaults,
+        and that result is not cached.
+        """
+        if generation is None:
+            generation = self._permissions_cache.generation(tenant_id)
+        permissions, _ = self._flatten(role_id, tenant_id, roles, resolved or {}, generation, frozenset())
+        return permissions
+
+    def _flatten(
+        self,
+        role_id: str,
+        tenant_id: Optional[str],
+        roles: Dict[str, Dict[str, Any]],
+        resolved: Dict[str, UserPermissions],
+        generation: tuple,
+        seen: frozenset,
+    ) -> Tuple[UserPermissions, bool]:
+        """(permissions, whether the role and all its ancestors were available)"""
+        cache_key = (role_id, tenant_id)
+        cached = resolved.get(role_id) or self._permissions_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        role = roles.get(role_id)
         if not role:
             # Default to basic permissions if role not found
-            return UserPermissions()
+            return UserPermissions(), False
 
         # Get base permissions from role
         permissions = UserPermissions(**role['permissions'])
+        complete = True
 
-        # If role inherits from another, merge parent permissions
-        if role.get('inheritsFrom'):
-            parent_permissions = self.get_effective_permissions(
-                role['inheritsFrom'], tenant_id
+        # If role inherits from another, merge parent permissions (cycles are cut)
+        parent_id = role.get('inheritsFrom')
+        if parent_id and parent_id not in seen:
+            parent_permissions, complete = self._flatten(
+                parent_id, tenant_id, roles, resolved, generation, seen | {role_id}
             )
             # Merge: parent permissions + role permissions (role overrides)
             permissions = self._merge_permissions(parent_permissions, permissions)
 
-        return permissions
+        if complete:
+            self._permissions_cache.set(
+                cache_key, permissions, tenant_id, role_id, generation=generation
+            )
+        return permissions, complete
 
     def _merge_permissions(
         self, parent: UserPermissions, child: UserPermissions
@@ -165,49 +404,173 @@ class RoleService:
         return user_level >= required_level
 
     def list_roles(
-        self, tenant_id: Optional[str] = None, include_system: bool = True
+        self,
+        tenant_id: Optional[str] = None,
+        include_system: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         List all available roles (system + tenant custom roles)
 
+        System roles come from the in-memory replica and custom roles from the
+        tenant's role catalog, so this costs at most one document read.
+
         Args:
             tenant_id: Tenant ID to filter custom roles (optional)
             include_system: Whether to include system roles
+            filters: Optional isCustom/isActive/minLevel/maxLevel/search filters
 
         Returns:
-            List of role data dicts
+            List of role data dicts, each with the role's own `permissions` and
+            its effective `permissionsMask`
         """
-        roles = []
-
-        # Get system roles
-        if include_system:
-            try:
-                system_roles_docs = self.db.collection('system_roles').stream()
-                for doc in system_roles_docs:
-                    role_data = doc.to_dict()
-                    role_data['id'] = doc.id
-                    roles.append(role_data)
-            except Exception as e:
-                print(f"Error listing system roles: {e}")
+        catalog = {}
 
         # Get tenant roles
         if tenant_id:
             try:
-                query = self.db.collection('tenant_roles').where('tenantId', '==', tenant_id)
-                tenant_roles_docs = query.stream()
-
-                for doc in tenant_roles_docs:
-                    role_data = doc.to_dict()
-                    role_data['id'] = doc.id
-                    roles.append(role_data)
+                catalog = self.get_role_catalog(tenant_id)
+            except ReadBudgetExceeded:
+                raise
             except Exception as e:
                 print(f"Error listing tenant roles: {e}")
 
+        return self.build_role_list(catalog, include_system, filters)
+
+    def build_role_list(
+        self,
+        catalog: Dict[str, Dict[str, Any]],
+        include_system: bool,
+        filters: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """System roles + catalog entries, filtered and sorted (no I/O)"""
+        roles = []
+
+        # Get system roles
+        if include_system:
+            for role in self._system_roles.all():
+                mask = permissions_to_mask(UserPermissions(**role['permissions']))
+                roles.append({**role, 'permissionsMask': mask})
+
+        roles.extend(dict(entry) for entry in catalog.values())
+
+        roles = filter_roles(roles, filters)
+
         # Sort by level (descending)
         roles.sort(key=lambda r: r.get('level', 0), reverse=True)
 
         return roles
 
+    def get_role_catalog(self, tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the tenant's role catalog (role_id -> summary); treat as read-only
+
+        Args:
+            tenant_id: Tenant ID
+
+        Returns:
+            Dict of role_id -> role data (the role document's fields and id)
+            plus its effective permissionsMask
+        """
+        self._epochs.ensure_fresh(tenant_id)
+        cached = self._catalog_cache.get(tenant_id)
+        if cached is not None:
+            return cached
+
+        return self._flights.do(('catalog', tenant_id), self.load_role_catalog, tenant_id)
+
+    def load_role_catalog(self, tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        """Read the catalog document (building it if missing) and populate the cache"""
+        generation = self._catalog_cache.generation(tenant_id)
+        doc = self.db.get(CATALOG_COLLECTION, tenant_id)
+        roles = catalog_roles(doc.to_dict() or {}) if doc.exists else None
+        if roles is not None:
+            roles = self.with_current_masks(roles)
+        else:
+            # Tenant predates catalogs (or this catalog version): build it once from tenant_roles
+            def _build(transaction):
+                roles = self._read_catalog_for_write(transaction, tenant_id)
+                self._write_catalog(transaction, tenant_id, roles)
+                return roles
+
+            roles = self.db.run_transaction(_build)
+
+        self._catalog_cache.set(tenant_id, roles, tenant_id, generation=generation)
+        return roles
+
+    def _read_catalog_for_write(self, transaction, tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        """Read the catalog inside a transaction (rebuilt from tenant_roles if missing or outdated)"""
+        doc = transaction.get(CATALOG_COLLECTION, tenant_id)
+        roles = catalog_roles(doc.to_dict() or {}) if doc.exists else None
+        if roles is not None:
+            return self.with_current_masks(roles)
+
+        role_docs = {
+            role.id: role.to_dict()
+            for role in self.db.query('tenant_roles', filters=[('tenantId', '==', tenant_id)])
+        }
+        masks = self._effective_masks(role_docs, {})
+        return {
+            role_id: role_summary(role_id, role, masks[role_id])
+            for role_id, role in role_docs.items()
+        }
+
+    @untraced
+    def with_current_masks(self, roles: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Catalog entries with permissionsMask recomputed from their own permissions
+
+        Stored masks embed the permissions of inherited system roles as they
+        were when the catalog was written; entries carry their own permissions
+        and parent, so masks are resolved again against the current replica.
+        """
+        masks = self._effective_masks(roles, {})
+        return {
+            role_id: entry if entry.get('permissionsMask') == masks[role_id] else {**entry, 'permissionsMask': masks[role_id]}
+            for role_id, entry in roles.items()
+        }
+
+    def _write_catalog(self, transaction, tenant_id: str, roles: Dict[str, Dict[str, Any]]) -> None:
+        transaction.set(CATALOG_COLLECTION, tenant_id, {
+            'tenantId': tenant_id,
+            'version': CATALOG_VERSION,
+            'roles': roles,
+            'updatedAt': firestore.SERVER_TIMESTAMP,
+        })
+
+    def _effective_masks(
+        self, role_docs: Dict[str, Dict[str, Any]], catalog: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        Effective permission masks of role_docs
+
+        Parents are resolved from role_docs first, then system roles, then the
+        catalog entries (whose masks are already effective).
+        """
+        effective: Dict[str, UserPermissions] = {}
+
+        def resolve(role_id: str, seen: set) -> UserPermissions:
+            if role_id in effective:
+                return effective[role_id]
+
+            role = role_docs.get(role_id)
+            if role is None:
+                system_role = self.get_system_role(role_id)
+                if system_role:
+                    return UserPermissions(**system_role['permissions'])
+                entry = catalog.get(role_id)
+                return mask_to_permissions(entry['permissionsMask']) if entry else UserPermissions()
+
+            permissions = UserPermissions(**role.get('permissions', {}))
+            parent_id = role.get('inheritsFrom')
+            if parent_id and parent_id not in seen:
+                permissions = self._merge_permissions(resolve(parent_id, seen | {role_id}), permissions)
+
+            effective[role_id] = permissions
+            return permissions
+
+        return {role_id: permissions_to_mask(resolve(role_id, set())) for role_id in role_docs}
+
     def get_user_role_in_tenant(self, user_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
         """
         Get user's role assignment in a specific tenant
@@ -217,25 +580,55 @@ class RoleService:
             tenant_id: Tenant ID
 
         Returns:
-            User's role data for the tenant (includes roleId, customPermissions)
+            User's role data for the tenant (includes roleId, customPermissions),
+            or None if not a member, or the membership is suspended/inactive/expired
         """
-        try:
-            user_doc = self.db.collection('users').document(user_id).get()
-            if not user_doc.exists:
+        self._epochs.ensure_fresh(tenant_id)
+        cache_key = (user_id, tenant_id)
+        tenant_member = self._membership_cache.get(cache_key)
+
+        if tenant_member is None:
+            try:
+                tenant_member = self._flights.do(
+                    ('membership', user_id, tenant_id), self._load_membership, user_id, tenant_id
+                )
+            except ReadBudgetExceeded:
+                raise
+            except Exception as e:
+                print(f"Error getting user role in tenant: {e}")
                 return None
 
-            user_data = user_doc.to_dict()
-            tenants = user_data.get('tenants', [])
+        # Enforced on the already-loaded entry: no extra read
+        if tenant_member is None or not self.is_membership_active(tenant_member):
+            return None
 
-            # Find tenant membership
-            for tenant_member in tenants:
-                if tenant_member.get('tenantId') == tenant_id:
-                    return tenant_member
+        return tenant_member
 
-            return None
-        except Exception as e:
-            print(f"Error getting user role in tenant: {e}")
-            return None
+    @staticmethod
+    def is_membership_active(tenant_member: Dict[str, Any]) -> bool:
+        """Check membership status and expiresAt"""
+        if tenant_member.get('status', 'active') != 'active':
+            return False
+
+        expires_at = tenant_member.get('expiresAt')
+        if isinstance(expires_at, datetime) and as_utc(expires_at) <= datetime.now(timezone.utc):
+            return False
+
+        return True
+
+    def _load_membership(self, user_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch user's membership in tenant and populate the cache"""
+        generation = self._membership_cache.generation(tenant_id)
+
+        # Reads only users/{uid}.tenantMemberships.{tenantId} (O(1), field-masked)
+        tenant_member = read_membership(self.db, user_id, tenant_id)
+        if tenant_member:
+            self._membership_cache.set(
+                (user_id, tenant_id), tenant_member, tenant_id,
+                tenant_member.get('roleId'), generation=generation,
+            )
+
+        return tenant_member
 
     def get_user_effective_permissions(
         self, user_id: str, tenant_id: str
@@ -352,19 +745,11 @@ class RoleService:
         Raises:
             ValueError: If role name already exists in tenant
         """
-        # Validate name is unique within tenant
-        existing = self.db.collection('tenant_roles')\
-            .where('tenantId', '==', data['tenantId'])\
-            .where('name', '==', data['name'])\
-            .limit(1)\
-            .get()
-
-        if len(list(existing)) > 0:
-            raise ValueError('Role with this name already exists in tenant')
+        tenant_id = data['tenantId']
 
         # Validate inheritsFrom if provided
         if data.get('inheritsFrom'):
-            parent_role = self.get_role(data['inheritsFrom'], data['tenantId'])
+            parent_role = self.get_role(data['inheritsFrom'], tenant_id)
             if not parent_role:
                 raise ValueError('Parent role not found')
 
@@ -377,12 +762,27 @@ class RoleService:
             'createdAt': firestore.SERVER_TIMESTAMP,
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
+        role_id = self.db.new_id('tenant_roles')
+
+        # Write role, catalog entry and tenant authz version atomically
+        def _create(transaction):
+            roles = self._read_catalog_for_write(transaction, tenant_id)
+
+            # Validate name is unique within tenant (the catalog lists every role)
+            if any(entry.get('name') == data['name'] for entry in roles.values()):
+                raise ValueError('Role with this name already exists in tenant')
+
+            mask = self._effective_masks({role_id: role_data}, roles)[role_id]
+            roles[role_id] = role_summary(role_id, role_data, mask)
+
+            transaction.set('tenant_roles', role_id, role_data)
+            self._write_catalog(transaction, tenant_id, roles)
+            bump_authz_version(transaction, tenant_id)
 
-        doc_ref = self.db.collection('tenant_roles').add(role_data)
-        role_id = doc_ref[1].id
+        self.db.run_transaction(_create)
 
-        # Invalidate cache
-        self.clear_cache()
+        # Invalidate cache (only this tenant's entries)
+        self.invalidate_tenant_cache(tenant_id)
 
         return {**role_data, 'id': role_id}
 
@@ -410,24 +810,41 @@ class RoleService:
         if role.get('isSystemRole'):
             raise PermissionError('Cannot modify system roles')
 
-        # Validate name uniqueness if updating name
-        if 'name' in updates:
-            existing = self.db.collection('tenant_roles')\
-                .where('tenantId', '==', tenant_id)\
-                .where('name', '==', updates['name'])\
-                .limit(1)\
-                .get()
+        # Update role, its catalog entry (and those of roles inheriting from it)
+        # and the tenant authz version atomically
+        updates['updatedAt'] = firestore.SERVER_TIMESTAMP
 
-            for doc in existing:
-                if doc.id != role_id:
-                    raise ValueError('Role with this name already exists in tenant')
+        def _update(transaction):
+            roles = self._read_catalog_for_write(transaction, tenant_id)
 
-        # Update
-        updates['updatedAt'] = firestore.SERVER_TIMESTAMP
-        self.db.collection('tenant_roles').document(role_id).update(updates)
+            # Validate name uniqueness if updating name
+            if 'name' in updates:
+                for entry_id, entry in roles.items():
+                    if entry_id != role_id and entry.get('name') == updates['name']:
+                        raise ValueError('Role with this name already exists in tenant')
+
+            # Effective permissions of descendants embed this role's
+            affected = [role_id, *descendants(roles, role_id)]
+            role_docs = {
+                doc.id: doc.to_dict()
+                for doc in transaction.get_all([('tenant_roles', r) for r in affected])
+                if doc.exists
+            }
+            role_docs[role_id] = {**role_docs.get(role_id, role), **updates}
+
+            masks = self._effective_masks(role_docs, roles)
+            for entry_id, role_data in role_docs.items():
+                roles[entry_id] = role_summary(entry_id, role_data, masks[entry_id])
+
+            transaction.update('tenant_roles', role_id, updates)
+            self._write_catalog(transaction, tenant_id, roles)
+            bump_authz_version(transaction, tenant_id)
 
-        # Invalidate cache
-        self.invalidate_role_cache(role_id)
+        self.db.run_transaction(_update)
+
+        # Invalidate cache (and this request's batched copy)
+        self.invalidate_role_cache(role_id, tenant_id)
+        request_batch_loader(self.db).forget(('tenant_roles', role_id))
 
         return self.get_role(role_id, tenant_id)
 
@@ -456,14 +873,25 @@ class RoleService:
         if count > 0:
             raise ValueError(f'Cannot delete role. {count} users still have this role. Please reassign users first.')
 
-        # Soft delete (recommended)
-        self.db.collection('tenant_roles').document(role_id).update({
-            'isActive': False,
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
+        # Soft delete (recommended), together with its catalog entry
+        def _delete(transaction):
+            roles = self._read_catalog_for_write(transaction, tenant_id)
+            entry = roles.get(role_id)
+            if entry is None:
+                mask = self._effective_masks({role_id: role}, roles)[role_id]
+                entry = role_summary(role_id, role, mask)
+            deactivate = {'isActive': False, 'updatedAt': firestore.SERVER_TIMESTAMP}
+            roles[role_id] = {**entry, **deactivate}
 
-        # Invalidate cache
-        self.invalidate_role_cache(role_id)
+            transaction.update('tenant_roles', role_id, deactivate)
+            self._write_catalog(transaction, tenant_id, roles)
+            bump_authz_version(transaction, tenant_id)
+
+        self.db.run_transaction(_delete)
+
+        # Invalidate cache (and this request's batched copy)
+        self.invalidate_role_cache(role_id, tenant_id)
+        request_batch_loader(self.db).forget(('tenant_roles', role_id))
 
     def clone_role(self, role_id: str, new_name: str, tenant_id: str, cloned_by: str) -> dict:
         """
@@ -522,20 +950,112 @@ class RoleService:
         Returns:
             List of users with role assignment details
         """
-        users = []
-        all_users = self.db.collection('users').stream()
+        return self.enrich_members(self.get_role_members(role_id, tenant_id))
 
-        for user in all_users:
+    def get_role_members(self, role_id: str, tenant_id: str) -> List[dict]:
+        """
+        Get role assignments of users with specific role (without profiles)
+
+        Args:
+            role_id: Role ID
+            tenant_id: Tenant ID
+
+        Returns:
+            List of {'userId', 'roleAssignment'} dicts
+        """
+        members = []
+        # Map subfields are indexed automatically, so this only reads members
+        # holding the role instead of streaming the whole users collection.
+        query = self.db.query(
+            'users',
+            filters=[(membership_field_path(tenant_id, 'roleId'), '==', role_id)],
+            field_paths=[membership_field_path(tenant_id)],
+        )
+
+        for user in query:
             user_data = user.to_dict()
-            for tenant in user_data.get('tenants', []):
-                if tenant.get('tenantId') == tenant_id and tenant.get('roleId') == role_id:
-                    users.append({
-                        'userId': user.id,
-                        'email': user_data.get('email'),
-                        'profile': user_data.get('profile', {}),
-                        'roleAssignment': tenant
-                    })
-                    break
+            tenant = (user_data.get(MEMBERSHIPS_FIELD) or {}).get(tenant_id, {})
+            members.append({'userId': user.id, 'roleAssignment': tenant})
+
+        # Users still on the legacy `tenants` array hold roles too (delete_role
+        # must see them) until scripts/migrate_tenant_memberships.py has run
+        found = {member['userId'] for member in members}
+        for member in self.legacy_role_members(role_id, tenant_id):
+            if member['userId'] not in found:
+                members.append(member)
+
+        return members
+
+    def legacy_role_members(self, role_id: str, tenant_id: str) -> List[dict]:
+        """
+        Role assignments of users not yet migrated to the membership map
+
+        One scan of the users still holding a `tenants` array serves every
+        tenant for LEGACY_SCAN_TTL seconds. Once a scan finds none, the
+        fallback stops for the life of the process: users are created
+        migrated and migration never brings the array back.
+        """
+        members = []
+        for user_id, memberships in self._legacy_memberships().items():
+            tenant = memberships.get(tenant_id)
+            if tenant and tenant.get('roleId') == role_id:
+                members.append({'userId': user_id, 'roleAssignment': tenant})
+        return members
+
+    def _legacy_memberships(self) -> Dict[str, Dict[str, Any]]:
+        """user_id -> tenantId-keyed memberships of every unmigrated user (cached scan)"""
+        if self._legacy_done:
+            return {}
+        scan = self._legacy_scan
+        if scan is not None and time.monotonic() - scan[0] < LEGACY_SCAN_TTL:
+            return scan[1]
+        return self._flights.do(('legacy_memberships',), self._scan_legacy_memberships)
+
+    def _scan_legacy_memberships(self) -> Dict[str, Dict[str, Any]]:
+        # Only documents with a non-empty `tenants` array are read (migration removes the array)
+        scanned_at = time.monotonic()
+        query = self.db.query(
+            'users',
+            filters=[(LEGACY_TENANTS_FIELD, '!=', [])],
+            field_paths=[LEGACY_TENANTS_FIELD, MIGRATED_FIELD],
+        )
+        legacy = {}
+        for user in query:
+            user_data = user.to_dict() or {}
+            if not user_data.get(MIGRATED_FIELD):
+                legacy[user.id] = memberships_from_array(user_data.get(LEGACY_TENANTS_FIELD))
+
+        if not legacy:
+            self._legacy_done = True
+            print("✅ No users left on legacy tenant arrays: member listings skip the fallback scan")
+        self._legacy_scan = (scanned_at, legacy)
+        return legacy
+
+    def enrich_members(self, members: List[dict]) -> List[dict]:
+        """
+        Add email and profile to role members with one batched read
+
+        Args:
+            members: Entries from get_role_members (e.g. one page of them)
+
+        Returns:
+            List of users with role assignment details
+        """
+        loader = request_batch_loader(self.db)
+        snapshots = loader.load(
+            [('users', member['userId']) for member in members],
+            field_paths=['email', 'profile'],
+        )
+
+        users = []
+        for member in members:
+            user_data = snapshots[('users', member['userId'])].to_dict() or {}
+            users.append({
+                'userId': member['userId'],
+                'email': user_data.get('email'),
+                'profile': user_data.get('profile', {}),
+                'roleAssignment': member['roleAssignment']
+            })
 
         return users
 
@@ -550,27 +1070,126 @@ class RoleService:
         Returns:
             Count of users
         """
-        return len(self.get_users_with_role(role_id, tenant_id))
+        return len(self.get_role_members(role_id, tenant_id))
+
+    def get_membership_roles(self, memberships: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve the roles a user holds across tenants with one batched read
+
+        Args:
+            memberships: tenant_id -> membership (see services.memberships.get_memberships)
+
+        Returns:
+            Dict of tenant_id -> role data (memberships whose role is missing are omitted)
+        """
+        roles = {}
+        missing = {}
+
+        for tenant_id, member in memberships.items():
+            role_id = member.get('roleId')
+            if not role_id:
+                continue
+            self._epochs.ensure_fresh(tenant_id)
+            role = self.get_system_role(role_id) or self._role_cache.get((role_id, tenant_id))
+            if role is not None:
+                roles[tenant_id] = role
+            else:
+                missing[tenant_id] = role_id
+
+        if missing:
+            loader = request_batch_loader(self.db)
+            snapshots = loader.load([('tenant_roles', role_id) for role_id in missing.values()])
+            for tenant_id, role_id in missing.items():
+                doc = snapshots[('tenant_roles', role_id)]
+                if doc.exists and doc.to_dict().get('tenantId') == tenant_id:
+                    roles[tenant_id] = {**doc.to_dict(), 'id': role_id}
+
+        return roles
+
+    def describe_system_roles(self) -> Dict[str, Any]:
+        """Size and source ('firestore' or 'defaults') of the system role replica"""
+        return {'count': len(self._system_roles.all()), 'source': self._system_roles.source}
+
+    def memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """Entries and approximate bytes of each in-memory structure (see observability/memory.py)"""
+        return {
+            'roles': self._role_cache.memory_usage(),
+            'permissions': self._permissions_cache.memory_usage(),
+            'memberships': self._membership_cache.memory_usage(),
+            'role_catalogs': self._catalog_cache.memory_usage(),
+            'system_roles': self._system_roles.memory_usage(),
+            'authz_epochs': self._epochs.memory_usage(),
+        }
+
+    def preload_tenant(self, tenant_id: str) -> int:
+        """
+        Prime the role catalog, role documents and flattened permissions of a tenant
+
+        Returns:
+            Number of tenant roles loaded
+        """
+        catalog = self.get_role_catalog(tenant_id)
+        self.get_effective_permissions_many(list(catalog), tenant_id)
+        return len(catalog)
+
+    def start_membership_sweeper(self) -> MembershipSweeper:
+        """Start background revocation of expired memberships"""
+        if self._sweeper is None:
+            self._sweeper = MembershipSweeper(self.db, on_revoked=self.invalidate_tenant_cache)
+        self._sweeper.start()
+        return self._sweeper
 
     def clear_cache(self):
-        """Clear the role cache"""
-        self._role_cache = {}
+        """Clear role, permission and membership caches for every tenant"""
+        self._role_cache.clear()
+        self._permissions_cache.clear()
+        self._membership_cache.clear()
+        self._catalog_cache.clear()
+
+    def invalidate_role_cache(self, role_id: str, tenant_id: Optional[str] = None):
+        """
+        Invalidate cache entries for a specific role (all tenants)
+
+        Flattened permissions and the role catalog of the tenant are dropped
+        too, since roles inheriting from this one embed its permissions and the
+        catalog lists it.
+        """
+        self._role_cache.invalidate_role(role_id)
+        self._permissions_cache.invalidate_role(role_id)
+        if tenant_id:
+            self._permissions_cache.invalidate_tenant(tenant_id)
+            self._catalog_cache.invalidate_tenant(tenant_id)
+
+    def invalidate_system_role_cache(self, role_id: str):
+        """
+        Invalidate cache entries after a system role changed (replica listener)
+
+        Custom roles of any tenant may inherit from a system role, so flattened
+        permissions and role catalogs are dropped for every tenant; catalogs
+        recompute their masks when they are read again (with_current_masks).
+        """
+        self._role_cache.invalidate_role(role_id)
+        self._permissions_cache.clear()
+        self._catalog_cache.clear()
 
-    def invalidate_role_cache(self, role_id: str):
-        """Invalidate cache for a specific role"""
-        # Remove all cache entries for this role
-        keys_to_remove = [k for k in self._role_cache if k.startswith(f"{role_id}:")]
-        for key in keys_to_remove:
-            del self._role_cache[key]
+    def invalidate_tenant_cache(self, tenant_id: str):
+        """Invalidate cached roles, permissions and memberships for a tenant"""
+        self._role_cache.invalidate_tenant(tenant_id)
+        self._permissions_cache.invalidate_tenant(tenant_id)
+        self._membership_cache.invalidate_tenant(tenant_id)
+        self._catalog_cache.invalidate_tenant(tenant_id)
 
 
 # Singleton instance
 _role_service_instance = None
+_role_service_lock = threading.Lock()  # One instance (and one set of replica threads) per process
 
 
 def get_role_service() -> RoleService:
     """Get or create RoleService singleton"""
     global _role_service_instance
     if _role_service_instance is None:
-        _role_service_instance = RoleService()
+        with _role_service_lock:
+            if _role_service_instance is None:
+                _role_service_instance = RoleService()
     return _role_service_instance
@@ -0,0 +1,110 @@
+"""
+Single-flight - Coalesce concurrent identical lookups into one backend call
+The first caller for a key runs the fetch; callers arriving while it is in flight
+wait for its result. Errors reach every waiter and nothing is remembered afterwards.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """In-flight call shared by the leader and its waiters"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe request coalescing (safe under gunicorn gthread workers)
+
+    Usage:
+        flights = SingleFlight()
+        role = flights.do(('role', role_id, tenant_id), load_role, role_id, tenant_id)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0  # Calls served by another caller's fetch
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) unless a call for key is already in flight
+
+        Args:
+            key: Identity of the lookup (callers with equal keys share one call)
+            fn: Function performing the fetch
+
+        Returns:
+            Result of the (possibly shared) call
+
+        Raises:
+            Whatever fn raised, in the leader and in every waiter
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the call before waking waiters so later callers refetch
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Request coalescing for coroutines on one event loop
+
+    Usage:
+        flights = AsyncSingleFlight()
+        role = await flights.do(('role', role_id, tenant_id), load_role, role_id, tenant_id)
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs) unless a call for key is already in flight"""
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            # shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(call)
+
+        call = asyncio.ensure_future(fn(*args, **kwargs))
+        self._calls[key] = call
+
+        def forget(_):
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+        # Forget the call once it settles, even if the leader was cancelled
+        call.add_done_callback(forget)
+        return await asyncio.shield(call)
@@ -0,0 +1,106 @@
+"""
+System Role Replica - In-memory copy of the system_roles collection
+Loaded once at startup and kept in sync by a Firestore snapshot listener
+"""
+
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from models.role import DEFAULT_SYSTEM_ROLES
+
+
+def _freeze(roles: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """Build an immutable role_id -> role mapping"""
+    return MappingProxyType({
+        role_id: MappingProxyType(dict(role_data)) for role_id, role_data in roles.items()
+    })
+
+
+class SystemRoleReplica:
+    """
+    Read-only replica of system_roles
+
+    The whole collection is held in an immutable mapping that the listener
+    replaces in a single reference assignment, so readers never take a lock
+    and never see a half-applied update. Falls back to DEFAULT_SYSTEM_ROLES
+    when Firestore or the listener is unavailable.
+    """
+
+    def __init__(self, db, on_change: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            db: Storage backend
+            on_change: Called with role_id for every system role that changed
+        """
+        self.db = db
+        self.on_change = on_change
+        self._roles = _freeze({role['id']: role for role in DEFAULT_SYSTEM_ROLES})
+        self._unsubscribe = None
+        self.source = 'defaults'
+
+    def start(self) -> None:
+        """Load the collection and subscribe to changes"""
+        try:
+            self._replace([(doc.id, doc.to_dict()) for doc in self.db.query('system_roles')])
+        except Exception as e:
+            print(f"Error loading system roles, using defaults: {e}")
+
+        try:
+            self._unsubscribe = self.db.watch('system_roles', self._on_snapshot)
+        except Exception as e:
+            print(f"System roles listener unavailable, replica will not refresh: {e}")
+
+    def stop(self) -> None:
+        """Unsubscribe the snapshot listener"""
+        if self._unsubscribe is not None:
+            try:
+                self._unsubscribe()
+            except Exception as e:
+                print(f"Error stopping system roles listener: {e}")
+            self._unsubscribe = None
+
+    def _on_snapshot(self, docs) -> None:
+        """Snapshot listener callback (runs on the listener thread)"""
+        try:
+            self._replace([(doc.id, doc.to_dict()) for doc in docs])
+        except Exception as e:
+            print(f"Error applying system roles snapshot: {e}")
+
+    def _replace(self, docs: List[tuple]) -> None:
+        """Swap in a new immutable mapping built from (id, data) pairs"""
+        if not docs:
+            print("system_roles collection is empty, keeping current replica")
+            return
+
+        roles = {}
+        for doc_id, role_data in docs:
+            roles[doc_id] = {**role_data, 'id': doc_id}
+
+        previous = self._roles
+        self._roles = _freeze(roles)
+        self.source = 'firestore'
+
+        if self.on_change:
+            for role_id in set(previous) | set(roles):
+                if dict(previous.get(role_id) or {}) != roles.get(role_id, {}):
+                    self.on_change(role_id)
+
+    def get(self, role_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get system role by ID
+
+        Returns:
+            Copy of role data dict or None if not a system role
+        """
+        role = self._roles.get(role_id)
+        return dict(role) if role is not None else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Get copies of all system roles"""
+        return [dict(role) for role in self._roles.values()]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Entries and approximate bytes of the replica"""
+        from observability.memory import deep_size
+        roles = self._roles
+        return {'entries': len(roles), 'bytes': deep_size(roles)}
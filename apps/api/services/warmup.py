@@ -0,0 +1,131 @@
+"""
+Warmup - Prime connections and caches of a new instance
+Moves the first-request costs off the request path: Firestore gRPC channel and
+credential token, Firebase ID token signing keys, the system role replica and
+(optionally) the role caches of the busiest tenants. Run by the startup hook
+(start_background_services) and by GET /_ah/warmup.
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from startup import StartupReport, ensure_firebase
+
+# Sentinel document read to open the Firestore channel (absent documents are fine)
+WARMUP_DOC = ('system_roles', '_warmup')
+
+
+def warmup_tenants() -> List[str]:
+    """Tenants whose roles are preloaded (WARMUP_TENANTS, comma-separated)"""
+    return [tenant_id.strip() for tenant_id in os.getenv('WARMUP_TENANTS', '').split(',') if tenant_id.strip()]
+
+
+def open_firestore_channel() -> Dict[str, Any]:
+    """First RPC: gRPC channel setup and OAuth token fetch"""
+    from storage import get_storage
+
+    db = get_storage()
+    db.get(*WARMUP_DOC)
+    return {'backend': db.name}
+
+
+def prefetch_signing_keys() -> Dict[str, Any]:
+    """
+    Download the public keys used by auth.verify_id_token
+
+    The keys are fetched through the token verifier's own HTTP session, whose
+    cache (Cache-Control, typically hours) then serves later verifications.
+    That session is private to firebase_admin: if a release moves it, the step
+    is skipped and the first verification downloads the keys as before.
+    """
+    ensure_firebase()
+    from firebase_admin import auth
+
+    try:
+        from firebase_admin import _auth_utils, _token_gen
+
+        is_emulated = _auth_utils.is_emulated
+        fetch = auth._get_client(None)._token_verifier.request
+        cert_uri = _token_gen.ID_TOKEN_CERT_URI
+    except (ImportError, AttributeError) as e:
+        return {'skipped': f'firebase_admin token verifier internals not found ({e})'}
+
+    if is_emulated():
+        return {'skipped': 'auth emulator (tokens are not signed)'}
+
+    try:
+        response = fetch(cert_uri, method='GET')
+    except TypeError as e:
+        return {'skipped': f'firebase_admin token verifier request changed ({e})'}
+    if response.status != 200:
+        raise RuntimeError(f"Signing key download failed with HTTP {response.status}")
+    return {'status': response.status}
+
+
+def load_system_roles() -> Dict[str, Any]:
+    """Build the role service (loads system_roles and subscribes to changes)"""
+    from services.role_service import get_role_service
+
+    return get_role_service().describe_system_roles()
+
+
+def preload_tenant_roles(tenant_ids: List[str]) -> Dict[str, Any]:
+    """Role catalog, role documents and flattened permissions per tenant"""
+    from services.role_service import get_role_service
+
+    role_service = get_role_service()
+    roles = 0
+    for tenant_id in tenant_ids:
+        roles += role_service.preload_tenant(tenant_id)
+    return {'tenants': len(tenant_ids), 'roles': roles}
+
+
+def run_warmup(
+    tenant_ids: Optional[List[str]] = None,
+    report: Optional[StartupReport] = None,
+) -> Dict[str, Any]:
+    """
+    Run every warmup step; a failing step does not stop the others
+
+    Args:
+        tenant_ids: Tenants to preload (default: WARMUP_TENANTS)
+        report: Startup report the step timings are also recorded in
+
+    Returns:
+        {'ok': bool, 'totalMs': float, 'steps': [{step, ok, ms, detail}]}
+    """
+    tenant_ids = warmup_tenants() if tenant_ids is None else tenant_ids
+    plan: List[tuple] = [
+        ('firestore_channel', open_firestore_channel),
+        ('firebase_signing_keys', prefetch_signing_keys),
+        ('system_roles', load_system_roles),
+    ]
+    if tenant_ids:
+        plan.append(('tenant_roles', lambda: preload_tenant_roles(tenant_ids)))
+
+    steps = []
+    started = time.perf_counter()
+    for name, step in plan:
+        steps.append(_run_step(name, step, report))
+
+    return {
+        'ok': all(step['ok'] for step in steps),
+        'totalMs': round((time.perf_counter() - started) * 1000, 2),
+        'steps': steps,
+    }
+
+
+def _run_step(name: str, step: Callable[[], Dict[str, Any]], report: Optional[StartupReport]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        detail, ok = step(), True
+    except Exception as e:
+        print(f"⚠️  Warmup step {name} failed: {e}")
+        detail, ok = {'error': str(e)}, False
+    end = time.perf_counter()
+
+    if report is not None:
+        report.record(f'warmup:{name}', start, end)
+
+    return {'step': name, 'ok': ok, 'ms': round((end - start) * 1000, 2), 'detail': detail}
@@ -0,0 +1,223 @@
+"""
+Startup - Firebase initialization, lazy imports and cold-start accounting
+STARTUP_MODE=lazy defers Firebase initialization and heavy SDK imports until
+first use, and builds the service singletons in a background thread right after
+boot; STARTUP_MODE=eager (default) initializes everything at import.
+Every initialization step is timed in `report` (see benchmarks/startup_report.py).
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+_PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    """Durations of initialization steps since process start"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps: List[Dict[str, Any]] = []
+        self.ready_ms: Optional[float] = None  # App importable and routes registered
+        self.warm_ms: Optional[float] = None  # Background warmup finished
+        self.warm = threading.Event()
+
+    @contextmanager
+    def step(self, name: str):
+        """Time a block as a named step"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """Add a step timed by the caller (perf_counter values)"""
+        with self._lock:
+            self.steps.append({
+                'step': name,
+                'ms': round((end - start) * 1000, 2),
+                'atMs': round((start - _PROCESS_START) * 1000, 2),
+                'thread': threading.current_thread().name,
+            })
+
+    def mark_ready(self) -> None:
+        self.ready_ms = round((time.perf_counter() - _PROCESS_START) * 1000, 2)
+
+    def mark_warm(self) -> None:
+        self.warm_ms = round((time.perf_counter() - _PROCESS_START) * 1000, 2)
+        self.warm.set()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = list(self.steps)
+        return {
+            'mode': startup_mode(),
+            'readyMs': self.ready_ms,
+            'warmMs': self.warm_ms,
+            'steps': steps,
+        }
+
+    def print(self) -> None:
+        data = self.as_dict()
+        print(f"🚀 Startup ({data['mode']}): ready in {data['readyMs']} ms, warm in {data['warmMs']} ms")
+        for step in data['steps']:
+            print(f"   {step['ms']:>9.2f} ms  {step['step']}  (at {step['atMs']} ms, {step['thread']})")
+
+
+report = StartupReport()
+
+
+def startup_mode() -> str:
+    return os.getenv('STARTUP_MODE', 'eager').lower()
+
+
+def is_lazy() -> bool:
+    return startup_mode() == 'lazy'
+
+
+# Firebase
+
+_firebase_lock = threading.Lock()
+_firebase_ready = False
+
+
+def init_firebase():
+    """Initialize Firebase Admin SDK (no-op if already initialized)"""
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if firebase_admin._apps:
+        print("ℹ️  Firebase Admin SDK already initialized")
+        return
+
+    try:
+        # Try to initialize with service account file
+        service_account_path = os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH')
+        if service_account_path and os.path.exists(service_account_path):
+            cred = credentials.Certificate(service_account_path)
+            firebase_admin.initialize_app(cred)
+            print("✅ Firebase Admin SDK initialized with service account")
+        else:
+            # Fallback: Initialize with default credentials (for deployment)
+            firebase_admin.initialize_app()
+            print("✅ Firebase Admin SDK initialized with default credentials")
+    except ValueError as e:
+        # App already initialized
+        print("ℹ️  Firebase Admin SDK already initialized")
+    except Exception as e:
+        print(f"⚠️  Firebase initialization error: {e}")
+        print("   Some features may not work without Firebase configuration")
+
+
+def ensure_firebase() -> None:
+    """Initialize Firebase once per process (called before first SDK use)"""
+    global _firebase_ready
+    if _firebase_ready:
+        return
+    with _firebase_lock:
+        if not _firebase_ready:
+            with report.step('firebase_init'):
+                init_firebase()
+            _firebase_ready = True
+
+
+def reset_firebase() -> None:
+    """Delete Firebase apps so ensure_firebase() re-creates them (after fork)"""
+    global _firebase_ready
+    firebase_admin = sys.modules.get('firebase_admin')
+
+    with _firebase_lock:
+        if firebase_admin:
+            for firebase_app in list(firebase_admin._apps.values()):
+                firebase_admin.delete_app(firebase_app)
+        _firebase_ready = False
+
+
+def firebase_initialized() -> bool:
+    firebase_admin = sys.modules.get('firebase_admin')
+    return bool(firebase_admin and firebase_admin._apps)
+
+
+# Lazy imports
+
+class LazyModule:
+    """Module proxy that imports the module on first attribute access"""
+
+    def __init__(self, name: str, before: Optional[Callable[[], None]] = None):
+        self._name = name
+        self._before = before
+        self._module = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            if self._before:
+                self._before()
+            with report.step(f'import {self._name}'):
+                self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str, before: Optional[Callable[[], None]] = None):
+    """
+    Import a module now (eager mode) or on first use (lazy mode)
+
+    Args:
+        name: Module name, e.g. 'firebase_admin.auth'
+        before: Called once before the deferred import (e.g. ensure_firebase)
+    """
+    if is_lazy():
+        return LazyModule(name, before)
+    return importlib.import_module(name)
+
+
+# Background warmup
+
+def warm_singletons() -> None:
+    """Initialize Firebase, heavy SDK modules and the service singletons"""
+    ensure_firebase()
+
+    with report.step('import firebase_admin.auth'):
+        importlib.import_module('firebase_admin.auth')
+
+    from storage import get_storage
+    with report.step('storage'):
+        get_storage()
+
+    from services.auth_service import get_auth_service
+    with report.step('auth_service'):
+        get_auth_service()
+
+    from services.role_service import get_role_service
+    with report.step('role_service'):
+        get_role_service()
+
+
+def start_background_warmup(extra: Optional[Callable[[], None]] = None) -> threading.Thread:
+    """
+    Build singletons in a daemon thread right after boot
+
+    Args:
+        extra: Optional further warmup run after the singletons
+    """
+    def run():
+        try:
+            warm_singletons()
+            if extra:
+                extra()
+        except Exception as e:
+            print(f"⚠️  Background warmup error: {e}")
+        finally:
+            report.mark_warm()
+            if os.getenv('STARTUP_REPORT', 'false').lower() == 'true':
+                report.print()
+
+    thread = threading.Thread(target=run, name='startup-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,89 @@
+"""
+Storage layer for TOKO ANAK BANGSA API
+Backend-neutral document access used by the services (Firestore or in-memory)
+"""
+
+import os
+import threading
+from typing import Optional
+
+from storage.base import ASCENDING, DESCENDING, Snapshot, Storage, Transaction, WriteBatch
+
+
+_storage_instance: Optional[Storage] = None
+_async_storage_instance = None
+_storage_lock = threading.Lock()  # Startup warmup thread and first requests race to create it
+
+
+def create_storage(backend: Optional[str] = None) -> Storage:
+    """
+    Create a storage backend
+
+    Args:
+        backend: 'firestore' or 'memory' (default: STORAGE_BACKEND env or 'firestore')
+    """
+    backend = (backend or os.getenv('STORAGE_BACKEND', 'firestore')).lower()
+    if backend == 'memory':
+        from storage.memory import MemoryStorage
+        return MemoryStorage()
+    if backend == 'firestore':
+        from storage.firestore_backend import FirestoreStorage
+        return FirestoreStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_storage() -> Storage:
+    """
+    Get or create the process-wide Storage singleton
+
+    Wrapped in InstrumentedStorage for per-request accounting unless
+    STORAGE_ACCOUNTING=false.
+    """
+    global _storage_instance
+    if _storage_instance is None:
+        with _storage_lock:
+            if _storage_instance is None:
+                storage = create_storage()
+                if os.getenv('STORAGE_ACCOUNTING', 'true').lower() != 'false':
+                    from storage.instrumented import InstrumentedStorage
+                    storage = InstrumentedStorage(storage)
+                _storage_instance = storage
+    return _storage_instance
+
+
+def set_storage(storage: Optional[Storage]) -> None:
+    """Replace the process-wide Storage (e.g. with MemoryStorage for benchmarks)"""
+    global _storage_instance
+    _storage_instance = storage
+
+
+def create_async_storage(backend: Optional[str] = None):
+    """
+    Create an AsyncStorage backend (async execution mode, see asgi.py)
+
+    Args:
+        backend: 'firestore' or 'memory' (default: STORAGE_BACKEND env or 'firestore').
+            The memory backend reads the documents of the sync MemoryStorage singleton.
+    """
+    backend = (backend or os.getenv('STORAGE_BACKEND', 'firestore')).lower()
+    if backend == 'memory':
+        from storage.async_memory import AsyncMemoryStorage
+        return AsyncMemoryStorage(get_storage())
+    if backend == 'firestore':
+        from storage.async_firestore import AsyncFirestoreStorage
+        return AsyncFirestoreStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_async_storage():
+    """Get or create the process-wide AsyncStorage singleton"""
+    global _async_storage_instance
+    if _async_storage_instance is None:
+        _async_storage_instance = create_async_storage()
+    return _async_storage_instance
+
+
+def set_async_storage(storage) -> None:
+    """Replace the process-wide AsyncStorage"""
+    global _async_storage_instance
+    _async_storage_instance = storage
@@ -0,0 +1,50 @@
+"""
+Async storage interface - Coroutine reads for the async execution mode (asgi.py)
+Covers the read paths served by the async services; writes stay on the
+synchronous Storage, which the async services call from a worker thread.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from storage.base import DocKey, Filter, Order, Snapshot
+
+
+class AsyncStorage(ABC):
+    """Async document reads"""
+
+    name = 'abstract'
+
+    @abstractmethod
+    async def get(self, collection: str, doc_id: str, field_paths: Optional[Sequence[str]] = None) -> Snapshot:
+        """Read one document (optionally only the given field paths)"""
+
+    @abstractmethod
+    async def get_all(self, keys: Sequence[DocKey], field_paths: Optional[Sequence[str]] = None) -> List[Snapshot]:
+        """Read many documents in one round trip; results follow the order of keys"""
+
+    @abstractmethod
+    async def query(
+        self,
+        collection: str,
+        filters: Iterable[Filter] = (),
+        order_by: Iterable[Order] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Snapshot] = None,
+        field_paths: Optional[Sequence[str]] = None,
+    ) -> List[Snapshot]:
+        """Documents matching all filters (AND)"""
+
+    async def get_fields(
+        self, collection: str, doc_id: str, field_paths: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read only the given fields of a document (field mask)
+
+        Returns:
+            Dict of the present fields plus 'id', or None if the document is missing
+        """
+        snapshot = await self.get(collection, doc_id, field_paths=list(field_paths))
+        if not snapshot.exists:
+            return None
+        return {**(snapshot.to_dict() or {}), 'id': snapshot.id}
@@ -0,0 +1,86 @@
+"""
+Async Firestore storage backend - AsyncStorage over google.cloud.firestore.AsyncClient
+The client reuses the credentials and project of the default firebase_admin app.
+"""
+
+from typing import Iterable, List, Optional, Sequence
+
+import firebase_admin
+from google.cloud import firestore
+
+from observability.tracing import with_trace_context
+from storage.async_base import AsyncStorage
+from storage.base import DocKey, Filter, Order, Snapshot
+from storage.firestore_backend import _snapshot
+
+
+class TracedAsyncClient(firestore.AsyncClient):
+    """AsyncClient sending the current traceparent with every RPC"""
+
+    @property
+    def _rpc_metadata(self):
+        return with_trace_context(super()._rpc_metadata)
+
+
+def create_async_client() -> TracedAsyncClient:
+    """AsyncClient for the default firebase_admin app"""
+    from startup import ensure_firebase
+    ensure_firebase()
+    app = firebase_admin.get_app()
+    return TracedAsyncClient(
+        project=app.project_id,
+        credentials=app.credential.get_credential(),
+    )
+
+
+class AsyncFirestoreStorage(AsyncStorage):
+    """AsyncStorage backed by Cloud Firestore"""
+
+    name = 'firestore'
+
+    def __init__(self, client: Optional[firestore.AsyncClient] = None):
+        self.client = client or create_async_client()
+
+    def ref(self, collection: str, doc_id: str):
+        """AsyncDocumentReference for a key"""
+        return self.client.collection(collection).document(doc_id)
+
+    async def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        return _snapshot(await self.ref(collection, doc_id).get(field_paths=field_paths))
+
+    async def get_all(self, keys: Sequence[DocKey], field_paths=None) -> List[Snapshot]:
+        if not keys:
+            return []
+        refs = [self.ref(collection, doc_id) for collection, doc_id in keys]
+        # get_all yields documents in arbitrary order; restore the key order
+        found = {}
+        async for doc in self.client.get_all(refs, field_paths=field_paths):
+            found[doc.reference.path] = _snapshot(doc)
+        return [
+            found.get(f"{collection}/{doc_id}") or Snapshot(collection, doc_id, None)
+            for collection, doc_id in keys
+        ]
+
+    async def query(
+        self,
+        collection: str,
+        filters: Iterable[Filter] = (),
+        order_by: Iterable[Order] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Snapshot] = None,
+        field_paths: Optional[Sequence[str]] = None,
+    ) -> List[Snapshot]:
+        query = self.client.collection(collection)
+        for field_path, op, value in filters:
+            query = query.where(field_path, op, value)
+        for field_path, direction in order_by:
+            query = query.order_by(field_path, direction=direction)
+        if field_paths is not None:
+            query = query.select(list(field_paths))
+        if start_after is not None:
+            cursor = start_after.raw or await self.ref(collection, start_after.id).get()
+            query = query.start_after(cursor)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [_snapshot(doc) async for doc in query.stream()]
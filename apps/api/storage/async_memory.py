@@ -0,0 +1,57 @@
+"""
+Async in-memory storage backend - AsyncStorage over a MemoryStorage
+Shares the documents (and stats) of the wrapped store. The simulated round-trip
+latency is awaited here without blocking the event loop (leave the wrapped
+store's own latency at 0), which makes sync vs async throughput comparable
+in benchmarks.
+"""
+
+import asyncio
+from typing import Iterable, List, Optional, Sequence
+
+from storage.async_base import AsyncStorage
+from storage.base import DocKey, Filter, Order, Snapshot
+from storage.memory import MemoryStorage
+
+
+class AsyncMemoryStorage(AsyncStorage):
+    """AsyncStorage backed by a MemoryStorage"""
+
+    name = 'memory'
+
+    def __init__(self, storage: Optional[MemoryStorage] = None, latency: float = 0.0):
+        """
+        Args:
+            storage: Store to read from (default: a new empty MemoryStorage)
+            latency: Simulated seconds per round trip
+        """
+        self.storage = storage or MemoryStorage()
+        self.latency = latency
+
+    async def _round_trip(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        await self._round_trip()
+        return self.storage.get(collection, doc_id, field_paths=field_paths)
+
+    async def get_all(self, keys: Sequence[DocKey], field_paths=None) -> List[Snapshot]:
+        if not keys:
+            return []
+        await self._round_trip()
+        return self.storage.get_all(keys, field_paths=field_paths)
+
+    async def query(
+        self,
+        collection: str,
+        filters: Iterable[Filter] = (),
+        order_by: Iterable[Order] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Snapshot] = None,
+        field_paths: Optional[Sequence[str]] = None,
+    ) -> List[Snapshot]:
+        await self._round_trip()
+        return list(self.storage.query(
+            collection, filters, order_by, limit, start_after, field_paths
+        ))
@@ -0,0 +1,180 @@
+"""
+Storage interface - Backend-neutral document storage used by the services
+Documents are addressed as (collection, doc_id). Field paths use Firestore's
+dotted syntax (quote segments with FieldPath(...).to_api_repr() when needed),
+and write values may contain Firestore sentinels (SERVER_TIMESTAMP, Increment,
+DELETE_FIELD, ArrayUnion, ArrayRemove), which every backend understands.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+
+# (field_path, op, value), op is one of QUERY_OPERATORS
+Filter = Tuple[str, str, Any]
+# (field_path, ASCENDING | DESCENDING)
+Order = Tuple[str, str]
+DocKey = Tuple[str, str]
+
+QUERY_OPERATORS = (
+    '==', '!=', '<', '<=', '>', '>=',
+    'in', 'not-in', 'array-contains', 'array-contains-any',
+)
+
+
+class Snapshot:
+    """Result of reading one document"""
+
+    __slots__ = ('collection', 'id', '_data', 'update_time', 'raw')
+
+    def __init__(
+        self,
+        collection: str,
+        doc_id: str,
+        data: Optional[Dict[str, Any]],
+        update_time: Optional[datetime] = None,
+        raw: Any = None,
+    ):
+        self.collection = collection
+        self.id = doc_id
+        self._data = data
+        self.update_time = update_time
+        self.raw = raw  # Backend-native snapshot, if any
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    @property
+    def key(self) -> DocKey:
+        return (self.collection, self.id)
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        """Document data (owned by the caller), or None if missing"""
+        return self._data
+
+
+class WriteBatch(ABC):
+    """Atomic group of writes, applied by commit()"""
+
+    @abstractmethod
+    def set(self, collection: str, doc_id: str, data: Dict[str, Any], merge: bool = False) -> None:
+        ...
+
+    @abstractmethod
+    def update(
+        self, collection: str, doc_id: str, data: Dict[str, Any],
+        last_update_time: Optional[datetime] = None,
+    ) -> None:
+        """Update fields (dotted paths allowed); fails if document is missing"""
+
+    @abstractmethod
+    def delete(
+        self, collection: str, doc_id: str, last_update_time: Optional[datetime] = None
+    ) -> None:
+        """Delete document; with last_update_time, fails if it changed since"""
+
+    @abstractmethod
+    def commit(self) -> None:
+        ...
+
+
+class Transaction(WriteBatch):
+    """Read-then-write unit of work; reads must happen before writes"""
+
+    @abstractmethod
+    def get(self, collection: str, doc_id: str, field_paths: Optional[Sequence[str]] = None) -> Snapshot:
+        ...
+
+    @abstractmethod
+    def get_all(self, keys: Sequence[DocKey], field_paths: Optional[Sequence[str]] = None) -> List[Snapshot]:
+        ...
+
+    def commit(self) -> None:
+        """Transactions are committed by Storage.run_transaction()"""
+        raise RuntimeError('Transactions are committed by run_transaction()')
+
+
+class Storage(ABC):
+    """Document storage backend"""
+
+    name = 'abstract'
+
+    @abstractmethod
+    def get(self, collection: str, doc_id: str, field_paths: Optional[Sequence[str]] = None) -> Snapshot:
+        """Read one document (optionally only the given field paths)"""
+
+    @abstractmethod
+    def get_all(self, keys: Sequence[DocKey], field_paths: Optional[Sequence[str]] = None) -> List[Snapshot]:
+        """Read many documents in one round trip; results follow the order of keys"""
+
+    @abstractmethod
+    def query(
+        self,
+        collection: str,
+        filters: Iterable[Filter] = (),
+        order_by: Iterable[Order] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Snapshot] = None,
+        field_paths: Optional[Sequence[str]] = None,
+    ) -> Iterator[Snapshot]:
+        """Stream documents matching all filters (AND)"""
+
+    @abstractmethod
+    def set(self, collection: str, doc_id: str, data: Dict[str, Any], merge: bool = False) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, collection: str, doc_id: str, data: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, collection: str, doc_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def new_id(self, collection: str) -> str:
+        """Allocate an auto-generated document ID"""
+
+    def add(self, collection: str, data: Dict[str, Any]) -> str:
+        """Create document with an auto-generated ID and return the ID"""
+        doc_id = self.new_id(collection)
+        self.set(collection, doc_id, data)
+        return doc_id
+
+    def get_fields(
+        self, collection: str, doc_id: str, field_paths: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read only the given fields of a document (field mask)
+
+        Returns:
+            Dict of the present fields plus 'id', or None if the document is missing
+        """
+        snapshot = self.get(collection, doc_id, field_paths=list(field_paths))
+        if not snapshot.exists:
+            return None
+        return {**(snapshot.to_dict() or {}), 'id': snapshot.id}
+
+    @abstractmethod
+    def batch(self) -> WriteBatch:
+        ...
+
+    @abstractmethod
+    def run_transaction(self, fn: Callable[[Transaction], Any], max_attempts: int = 5) -> Any:
+        """Run fn(transaction), retrying on contention, and return its result"""
+
+    @abstractmethod
+    def watch(
+        self, collection: str, callback: Callable[[List[Snapshot]], None]
+    ) -> Callable[[], None]:
+        """
+        Subscribe to a collection; callback receives every document on each change
+
+        Returns:
+            Function that unsubscribes
+        """
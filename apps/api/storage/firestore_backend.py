@@ -0,0 +1,178 @@
+"""
+Firestore storage backend - Storage interface over the Firebase Admin Firestore client
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import firebase_admin
+from firebase_admin import firestore
+
+from observability.tracing import with_trace_context
+from storage.base import (
+    DocKey,
+    Filter,
+    Order,
+    Snapshot,
+    Storage,
+    Transaction,
+    WriteBatch,
+)
+
+
+def _snapshot(doc) -> Snapshot:
+    """Convert a Firestore DocumentSnapshot"""
+    return Snapshot(
+        doc.reference.parent.id,
+        doc.id,
+        doc.to_dict() if doc.exists else None,
+        doc.update_time,
+        raw=doc,
+    )
+
+
+class FirestoreWriteBatch(WriteBatch):
+    """WriteBatch over firestore.WriteBatch (also used for transaction writes)"""
+
+    def __init__(self, storage: 'FirestoreStorage', batch):
+        self._storage = storage
+        self._batch = batch
+
+    def _option(self, last_update_time):
+        if last_update_time is None:
+            return None
+        return self._storage.client.write_option(last_update_time=last_update_time)
+
+    def set(self, collection: str, doc_id: str, data: Dict[str, Any], merge: bool = False) -> None:
+        self._batch.set(self._storage.ref(collection, doc_id), data, merge=merge)
+
+    def update(self, collection, doc_id, data, last_update_time=None) -> None:
+        option = self._option(last_update_time)
+        ref = self._storage.ref(collection, doc_id)
+        if option is None:
+            self._batch.update(ref, data)
+        else:
+            self._batch.update(ref, data, option=option)
+
+    def delete(self, collection, doc_id, last_update_time=None) -> None:
+        self._batch.delete(self._storage.ref(collection, doc_id), option=self._option(last_update_time))
+
+    def commit(self) -> None:
+        self._batch.commit()
+
+
+class FirestoreTransaction(FirestoreWriteBatch, Transaction):
+    """Transaction over firestore.Transaction"""
+
+    def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        doc = self._storage.ref(collection, doc_id).get(
+            field_paths=field_paths, transaction=self._batch
+        )
+        return _snapshot(doc)
+
+    def get_all(self, keys, field_paths=None) -> List[Snapshot]:
+        return self._storage._get_all(keys, field_paths, transaction=self._batch)
+
+    def commit(self) -> None:
+        Transaction.commit(self)
+
+
+class TracedClient(firestore.Client):
+    """Firestore client sending the current traceparent with every RPC"""
+
+    @property
+    def _rpc_metadata(self):
+        return with_trace_context(super()._rpc_metadata)
+
+
+def create_client() -> TracedClient:
+    """Client for the default firebase_admin app (as firestore.client(), with trace propagation)"""
+    from startup import ensure_firebase
+    ensure_firebase()
+    app = firebase_admin.get_app()
+    return TracedClient(project=app.project_id, credentials=app.credential.get_credential())
+
+
+class FirestoreStorage(Storage):
+    """Storage backed by Cloud Firestore"""
+
+    name = 'firestore'
+
+    def __init__(self, client=None):
+        self.client = client or create_client()
+
+    def ref(self, collection: str, doc_id: str):
+        """Firestore DocumentReference for a key"""
+        return self.client.collection(collection).document(doc_id)
+
+    def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        return _snapshot(self.ref(collection, doc_id).get(field_paths=field_paths))
+
+    def get_all(self, keys: Sequence[DocKey], field_paths=None) -> List[Snapshot]:
+        return self._get_all(keys, field_paths)
+
+    def _get_all(self, keys, field_paths=None, transaction=None) -> List[Snapshot]:
+        if not keys:
+            return []
+        refs = [self.ref(collection, doc_id) for collection, doc_id in keys]
+        # get_all returns documents in arbitrary order; restore the key order
+        found = {}
+        for doc in self.client.get_all(refs, field_paths=field_paths, transaction=transaction):
+            found[doc.reference.path] = _snapshot(doc)
+        return [
+            found.get(f"{collection}/{doc_id}") or Snapshot(collection, doc_id, None)
+            for collection, doc_id in keys
+        ]
+
+    def query(
+        self,
+        collection: str,
+        filters: Iterable[Filter] = (),
+        order_by: Iterable[Order] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Snapshot] = None,
+        field_paths: Optional[Sequence[str]] = None,
+    ) -> Iterator[Snapshot]:
+        query = self.client.collection(collection)
+        for field_path, op, value in filters:
+            query = query.where(field_path, op, value)
+        for field_path, direction in order_by:
+            query = query.order_by(field_path, direction=direction)
+        if field_paths is not None:
+            query = query.select(list(field_paths))
+        if start_after is not None:
+            cursor = start_after.raw or self.ref(collection, start_after.id).get()
+            query = query.start_after(cursor)
+        if limit is not None:
+            query = query.limit(limit)
+
+        for doc in query.stream():
+            yield _snapshot(doc)
+
+    def set(self, collection, doc_id, data, merge=False) -> None:
+        self.ref(collection, doc_id).set(data, merge=merge)
+
+    def update(self, collection, doc_id, data) -> None:
+        self.ref(collection, doc_id).update(data)
+
+    def delete(self, collection, doc_id) -> None:
+        self.ref(collection, doc_id).delete()
+
+    def new_id(self, collection: str) -> str:
+        return self.client.collection(collection).document().id
+
+    def batch(self) -> WriteBatch:
+        return FirestoreWriteBatch(self, self.client.batch())
+
+    def run_transaction(self, fn: Callable[[Transaction], Any], max_attempts: int = 5) -> Any:
+        @firestore.transactional
+        def _run(transaction):
+            return fn(FirestoreTransaction(self, transaction))
+
+        return _run(self.client.transaction(max_attempts=max_attempts))
+
+    def watch(self, collection, callback) -> Callable[[], None]:
+        def on_snapshot(docs, changes, read_time):
+            callback([_snapshot(doc) for doc in docs])
+
+        watch = self.client.collection(collection).on_snapshot(on_snapshot)
+        return watch.unsubscribe
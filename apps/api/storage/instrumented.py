@@ -0,0 +1,264 @@
+"""
+Instrumented storage - Per-request accounting of storage calls
+Wraps a Storage so that every read and write made while an Accounting is
+active (see observability/storage.py) is counted: round trips, billed
+document reads, documents returned, writes and wall time. Single-document gets
+and unbounded queries are recorded so N+1 patterns and collection scans can be
+flagged. Calls made outside a request (background threads) are passed through.
+Inside a sampled trace every call also gets a `<backend>.<operation>` span.
+"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from observability.tracing import NOOP_SPAN, span
+from storage.base import DocKey, Snapshot, Storage, Transaction, WriteBatch
+
+
+class ReadBudgetExceeded(Exception):
+    """Raised before a read that would exceed the request's read budget"""
+
+
+class Accounting:
+    """Storage calls of one request"""
+
+    def __init__(self, read_budget: Optional[int] = None, enforce: bool = False):
+        self.read_budget = read_budget
+        self.enforce = enforce  # Raise ReadBudgetExceeded instead of only reporting
+        self.budget_exceeded = False
+        self.rejected = False  # A read was refused (ReadBudgetExceeded raised)
+        self.calls = 0  # Round trips
+        self.reads = 0  # Billed document reads (a query costs at least one)
+        self.documents = 0  # Documents returned
+        self.writes = 0  # Document writes
+        self.seconds = 0.0  # Wall time spent in storage calls
+        self.single_gets: Counter = Counter()  # DocKey -> single-document gets
+        self.unbounded_queries: List[Dict[str, Any]] = []
+
+    def check_budget(self, reads: int) -> None:
+        """Called before a read of `reads` documents"""
+        if self.read_budget is None or self.reads + reads <= self.read_budget:
+            return
+        self.budget_exceeded = True
+        if self.enforce:
+            self.rejected = True
+            raise ReadBudgetExceeded(
+                f"Read budget of {self.read_budget} documents exceeded ({self.reads} read so far)"
+            )
+
+    def add_read(self, documents: int, seconds: float, billed: Optional[int] = None) -> None:
+        self.calls += 1
+        self.documents += documents
+        self.reads += documents if billed is None else billed
+        self.seconds += seconds
+        if self.read_budget is not None and self.reads > self.read_budget:
+            self.budget_exceeded = True
+
+    def add_write(self, documents: int, seconds: float) -> None:
+        self.calls += 1
+        self.writes += documents
+        self.seconds += seconds
+
+
+_current: ContextVar[Optional[Accounting]] = ContextVar('storage_accounting', default=None)
+
+
+def start_accounting(accounting: Accounting):
+    """Make accounting current (returns a token for stop_accounting)"""
+    return _current.set(accounting)
+
+
+def stop_accounting(token) -> None:
+    _current.reset(token)
+
+
+def current_accounting() -> Optional[Accounting]:
+    return _current.get()
+
+
+class _CountingBatch(WriteBatch):
+    """WriteBatch counting staged writes at commit"""
+
+    def __init__(self, batch: WriteBatch, accounting: Accounting):
+        self._batch = batch
+        self._accounting = accounting
+        self._staged = 0
+
+    def set(self, collection, doc_id, data, merge=False) -> None:
+        self._staged += 1
+        self._batch.set(collection, doc_id, data, merge=merge)
+
+    def update(self, collection, doc_id, data, last_update_time=None) -> None:
+        self._staged += 1
+        self._batch.update(collection, doc_id, data, last_update_time=last_update_time)
+
+    def delete(self, collection, doc_id, last_update_time=None) -> None:
+        self._staged += 1
+        self._batch.delete(collection, doc_id, last_update_time=last_update_time)
+
+    def commit(self) -> None:
+        with span('batch.commit', 'client', writes=self._staged):
+            start = time.perf_counter()
+            try:
+                self._batch.commit()
+            finally:
+                self._accounting.add_write(self._staged, time.perf_counter() - start)
+
+
+class _CountingTransaction(_CountingBatch, Transaction):
+    """Transaction counting reads immediately and writes when it commits"""
+
+    def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        self._accounting.check_budget(1)
+        start = time.perf_counter()
+        snapshot = self._batch.get(collection, doc_id, field_paths=field_paths)
+        self._accounting.add_read(1, time.perf_counter() - start)
+        return snapshot
+
+    def get_all(self, keys, field_paths=None) -> List[Snapshot]:
+        self._accounting.check_budget(len(keys))
+        start = time.perf_counter()
+        snapshots = self._batch.get_all(keys, field_paths=field_paths)
+        self._accounting.add_read(len(snapshots), time.perf_counter() - start)
+        return snapshots
+
+    def commit(self) -> None:
+        Transaction.commit(self)
+
+
+class InstrumentedStorage(Storage):
+    """Storage wrapper feeding the current request's Accounting"""
+
+    def __init__(self, storage: Storage):
+        self.inner = storage
+        self.name = storage.name
+
+    def __getattr__(self, attr: str) -> Any:
+        # Backend-specific helpers (MemoryStorage.seed/stats, FirestoreStorage.client, ...)
+        return getattr(self.inner, attr)
+
+    def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        with span(f'{self.name}.get', 'client', collection=collection):
+            accounting = _current.get()
+            if accounting is None:
+                return self.inner.get(collection, doc_id, field_paths=field_paths)
+
+            accounting.check_budget(1)
+            start = time.perf_counter()
+            snapshot = self.inner.get(collection, doc_id, field_paths=field_paths)
+            accounting.add_read(1, time.perf_counter() - start)
+            accounting.single_gets[(collection, doc_id)] += 1
+            return snapshot
+
+    def get_all(self, keys: Sequence[DocKey], field_paths=None) -> List[Snapshot]:
+        with span(f'{self.name}.get_all', 'client', documents=len(keys)):
+            accounting = _current.get()
+            if accounting is None or not keys:
+                return self.inner.get_all(keys, field_paths=field_paths)
+
+            accounting.check_budget(len(keys))
+            start = time.perf_counter()
+            snapshots = self.inner.get_all(keys, field_paths=field_paths)
+            accounting.add_read(len(snapshots), time.perf_counter() - start)
+            return snapshots
+
+    def query(self, collection, filters=(), order_by=(), limit=None, start_after=None, field_paths=None) -> Iterator[Snapshot]:
+        filters = list(filters)
+        iterator = self.inner.query(
+            collection, filters=filters, order_by=order_by, limit=limit,
+            start_after=start_after, field_paths=field_paths,
+        )
+        accounting = _current.get()
+        # Not entered: the span stays open across yields, outside the caller's context
+        trace = span(f'{self.name}.query', 'client', collection=collection, filters=len(filters), limit=limit)
+        if accounting is None and trace is NOOP_SPAN:
+            return iterator
+        return self._count_stream(iterator, accounting, trace, collection, filters, limit)
+
+    @staticmethod
+    def _count_stream(iterator, accounting: Optional[Accounting], trace, collection, filters, limit) -> Iterator[Snapshot]:
+        documents = 0
+        seconds = 0.0
+        try:
+            while True:
+                if accounting is not None:
+                    accounting.check_budget(documents + 1)
+                start = time.perf_counter()
+                try:
+                    snapshot = next(iterator)
+                except StopIteration:
+                    seconds += time.perf_counter() - start
+                    break
+                seconds += time.perf_counter() - start
+                documents += 1
+                yield snapshot
+        finally:
+            trace.set_attribute('documents', documents)
+            trace.end()
+            if accounting is None:
+                return
+            # A query is billed at least one read, even when it returns nothing
+            accounting.add_read(documents, seconds, billed=max(documents, 1))
+            if limit is None:
+                accounting.unbounded_queries.append({
+                    'collection': collection,
+                    'filtered': bool(filters),
+                    'documents': documents,
+                })
+
+    def set(self, collection, doc_id, data, merge=False) -> None:
+        self._write('set', self.inner.set, collection, doc_id, data, merge=merge)
+
+    def update(self, collection, doc_id, data) -> None:
+        self._write('update', self.inner.update, collection, doc_id, data)
+
+    def delete(self, collection, doc_id) -> None:
+        self._write('delete', self.inner.delete, collection, doc_id)
+
+    def _write(self, operation: str, fn: Callable, collection, *args, **kwargs) -> None:
+        with span(f'{self.name}.{operation}', 'client', collection=collection):
+            accounting = _current.get()
+            if accounting is None:
+                return fn(collection, *args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return fn(collection, *args, **kwargs)
+            finally:
+                accounting.add_write(1, time.perf_counter() - start)
+
+    def new_id(self, collection: str) -> str:
+        return self.inner.new_id(collection)
+
+    def batch(self) -> WriteBatch:
+        accounting = _current.get()
+        batch = self.inner.batch()
+        return batch if accounting is None else _CountingBatch(batch, accounting)
+
+    def run_transaction(self, fn: Callable[[Transaction], Any], max_attempts: int = 5) -> Any:
+        with span(f'{self.name}.run_transaction', 'client'):
+            return self._run_transaction(fn, max_attempts)
+
+    def _run_transaction(self, fn: Callable[[Transaction], Any], max_attempts: int) -> Any:
+        accounting = _current.get()
+        if accounting is None:
+            return self.inner.run_transaction(fn, max_attempts=max_attempts)
+
+        staged = [0]  # Writes of the latest attempt
+
+        def counted(transaction: Transaction) -> Any:
+            counting = _CountingTransaction(transaction, accounting)
+            staged[0] = 0
+            result = fn(counting)
+            staged[0] = counting._staged
+            return result
+
+        result = self.inner.run_transaction(counted, max_attempts=max_attempts)
+        # Only the attempt that committed applied its writes
+        accounting.writes += staged[0]
+        return result
+
+    def watch(self, collection, callback) -> Callable[[], None]:
+        return self.inner.watch(collection, callback)
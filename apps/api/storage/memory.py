@@ -0,0 +1,496 @@
+"""
+In-memory storage backend - Fast in-process implementation of the Storage interface
+Supports the same field paths, field masks, query operators, sentinels, batches,
+transactions and watches as the Firestore backend, so the real service code can
+run in tests and benchmarks without the emulator. Every backend call is counted
+in `stats`, which makes round trips and documents read/written measurable.
+"""
+
+import copy
+import functools
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from google.api_core import exceptions
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.field_path import parse_field_path
+
+from storage.base import (
+    DESCENDING,
+    DocKey,
+    Filter,
+    Order,
+    QUERY_OPERATORS,
+    Snapshot,
+    Storage,
+    Transaction,
+    WriteBatch,
+)
+
+
+_MISSING = object()
+DOCUMENT_ID = '__name__'
+
+
+def _split(field_path: str) -> List[str]:
+    return parse_field_path(field_path)
+
+
+def _get_path(data: Dict[str, Any], parts: Sequence[str]) -> Any:
+    """Value at nested path, or _MISSING"""
+    value = data
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_path(data: Dict[str, Any], parts: Sequence[str], value: Any) -> None:
+    for part in parts[:-1]:
+        child = data.get(part)
+        if not isinstance(child, dict):
+            child = data[part] = {}
+        data = child
+    data[parts[-1]] = value
+
+
+def _delete_path(data: Dict[str, Any], parts: Sequence[str]) -> None:
+    for part in parts[:-1]:
+        data = data.get(part)
+        if not isinstance(data, dict):
+            return
+    data.pop(parts[-1], None)
+
+
+def _normalize(value: Any) -> Any:
+    """Make naive datetimes (written with utcnow()) comparable with aware ones"""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _type_rank(value: Any) -> int:
+    """Firestore cross-type ordering"""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, list):
+        return 8
+    if isinstance(value, dict):
+        return 9
+    return 7
+
+
+def _compare(a: Any, b: Any) -> int:
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    a, b = _normalize(a), _normalize(b)
+    if isinstance(a, list):
+        for item_a, item_b in zip(a, b):
+            result = _compare(item_a, item_b)
+            if result:
+                return result
+        return (len(a) > len(b)) - (len(a) < len(b))
+    if isinstance(a, dict):
+        return _compare(sorted(a.items()), sorted(b.items()))
+    try:
+        return (a > b) - (a < b)
+    except TypeError:
+        return 0
+
+
+def _equal(a: Any, b: Any) -> bool:
+    return _type_rank(a) == _type_rank(b) and _normalize(a) == _normalize(b)
+
+
+def _matches(value: Any, op: str, target: Any) -> bool:
+    """Evaluate one filter against a field value (_MISSING never matches)"""
+    if value is _MISSING:
+        return False
+    if op == '==':
+        return _equal(value, target)
+    if op == '!=':
+        return value is not None and not _equal(value, target)
+    if op == 'in':
+        return any(_equal(value, t) for t in target)
+    if op == 'not-in':
+        return value is not None and not any(_equal(value, t) for t in target)
+    if op == 'array-contains':
+        return isinstance(value, list) and any(_equal(v, target) for v in value)
+    if op == 'array-contains-any':
+        return isinstance(value, list) and any(_equal(v, t) for v in value for t in target)
+
+    # Range operators only match values of the same type
+    if _type_rank(value) != _type_rank(target):
+        return False
+    result = _compare(value, target)
+    return {
+        '<': result < 0,
+        '<=': result <= 0,
+        '>': result > 0,
+        '>=': result >= 0,
+    }[op]
+
+
+def _project(data: Dict[str, Any], field_paths: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Apply a field mask"""
+    if field_paths is None:
+        return copy.deepcopy(data)
+    projected: Dict[str, Any] = {}
+    for field_path in field_paths:
+        parts = _split(field_path)
+        value = _get_path(data, parts)
+        if value is not _MISSING:
+            _set_path(projected, parts, copy.deepcopy(value))
+    return projected
+
+
+class _Write:
+    """Staged write"""
+
+    __slots__ = ('kind', 'key', 'data', 'merge', 'last_update_time')
+
+    def __init__(self, kind, key, data=None, merge=False, last_update_time=None):
+        self.kind = kind
+        self.key = key
+        self.data = data
+        self.merge = merge
+        self.last_update_time = last_update_time
+
+
+class MemoryWriteBatch(WriteBatch):
+    """Staged writes applied atomically on commit()"""
+
+    def __init__(self, storage: 'MemoryStorage'):
+        self._storage = storage
+        self._writes: List[_Write] = []
+
+    def set(self, collection, doc_id, data, merge=False) -> None:
+        self._writes.append(_Write('set', (collection, doc_id), copy.deepcopy(data), merge))
+
+    def update(self, collection, doc_id, data, last_update_time=None) -> None:
+        self._writes.append(
+            _Write('update', (collection, doc_id), copy.deepcopy(data), last_update_time=last_update_time)
+        )
+
+    def delete(self, collection, doc_id, last_update_time=None) -> None:
+        self._writes.append(_Write('delete', (collection, doc_id), last_update_time=last_update_time))
+
+    def commit(self) -> None:
+        self._storage._round_trip()
+        self._storage._count('commit')
+        self._storage._apply(self._writes)
+        self._writes = []
+
+
+class MemoryTransaction(MemoryWriteBatch, Transaction):
+    """Transaction; the storage lock is held for its whole duration"""
+
+    def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        return self._storage.get(collection, doc_id, field_paths)
+
+    def get_all(self, keys, field_paths=None) -> List[Snapshot]:
+        return self._storage.get_all(keys, field_paths)
+
+    def commit(self) -> None:
+        Transaction.commit(self)
+
+
+class MemoryStorage(Storage):
+    """Thread-safe in-process document store"""
+
+    name = 'memory'
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Simulated seconds per round trip (slept outside the lock)
+        """
+        self.latency = latency
+        # collection -> doc_id -> (data, update_time)
+        self._collections: Dict[str, Dict[str, Tuple[Dict[str, Any], datetime]]] = {}
+        self._watchers: Dict[str, List[Callable[[List[Snapshot]], None]]] = {}
+        self._lock = threading.RLock()
+        self._last_time = datetime.fromtimestamp(0, timezone.utc)
+        self.stats: Counter = Counter()
+
+    # Accounting
+
+    def _count(self, op: str, documents_read: int = 0) -> None:
+        self.stats[op] += 1
+        self.stats['round_trips'] += 1
+        if documents_read:
+            self.stats['documents_read'] += documents_read
+
+    def reset_stats(self) -> None:
+        self.stats = Counter()
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    # Reads
+
+    def _snapshot(self, collection, doc_id, field_paths=None) -> Snapshot:
+        entry = self._collections.get(collection, {}).get(doc_id)
+        if entry is None:
+            return Snapshot(collection, doc_id, None)
+        data, update_time = entry
+        return Snapshot(collection, doc_id, _project(data, field_paths), update_time)
+
+    def get(self, collection, doc_id, field_paths=None) -> Snapshot:
+        self._round_trip()
+        with self._lock:
+            self._count('get', 1)
+            return self._snapshot(collection, doc_id, field_paths)
+
+    def get_all(self, keys: Sequence[DocKey], field_paths=None) -> List[Snapshot]:
+        if not keys:
+            return []
+        self._round_trip()
+        with self._lock:
+            self._count('get_all', len(keys))
+            return [self._snapshot(collection, doc_id, field_paths) for collection, doc_id in keys]
+
+    def query(
+        self,
+        collection: str,
+        filters: Iterable[Filter] = (),
+        order_by: Iterable[Order] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Snapshot] = None,
+        field_paths: Optional[Sequence[str]] = None,
+    ) -> Iterator[Snapshot]:
+        filters = [(f, op, v) for f, op, v in filters]
+        for _, op, _ in filters:
+            if op not in QUERY_OPERATORS:
+                raise ValueError(f"Unsupported query operator: {op}")
+
+        orders = [(_split(f) if f != DOCUMENT_ID else None, d) for f, d in order_by]
+        if not any(parts is None for parts, _ in orders):
+            orders.append((None, orders[-1][1] if orders else 'ASCENDING'))
+
+        def field(doc_id, data, parts):
+            return doc_id if parts is None else _get_path(data, parts)
+
+        self._round_trip()
+        with self._lock:
+            matched = []
+            for doc_id, (data, update_time) in self._collections.get(collection, {}).items():
+                if all(
+                    _matches(field(doc_id, data, None if f == DOCUMENT_ID else _split(f)), op, v)
+                    for f, op, v in filters
+                ):
+                    # Ordering by a field excludes documents without it
+                    if all(field(doc_id, data, parts) is not _MISSING for parts, _ in orders):
+                        matched.append((doc_id, data, update_time))
+
+            def cmp(a, b):
+                for parts, direction in orders:
+                    result = _compare(field(a[0], a[1], parts), field(b[0], b[1], parts))
+                    if result:
+                        return -result if direction == DESCENDING else result
+                return 0
+
+            matched.sort(key=functools.cmp_to_key(cmp))
+
+            if start_after is not None:
+                entry = self._collections.get(collection, {}).get(start_after.id)
+                cursor = (start_after.id, entry[0] if entry else (start_after.to_dict() or {}), None)
+                matched = [item for item in matched if cmp(item, cursor) > 0]
+
+            if limit is not None:
+                matched = matched[:limit]
+
+            self._count('query', len(matched))
+            results = [
+                Snapshot(collection, doc_id, _project(data, field_paths), update_time)
+                for doc_id, data, update_time in matched
+            ]
+
+        return iter(results)
+
+    # Writes
+
+    def set(self, collection, doc_id, data, merge=False) -> None:
+        batch = self.batch()
+        batch.set(collection, doc_id, data, merge=merge)
+        batch.commit()
+
+    def update(self, collection, doc_id, data) -> None:
+        batch = self.batch()
+        batch.update(collection, doc_id, data)
+        batch.commit()
+
+    def delete(self, collection, doc_id) -> None:
+        batch = self.batch()
+        batch.delete(collection, doc_id)
+        batch.commit()
+
+    def new_id(self, collection: str) -> str:
+        return uuid.uuid4().hex[:20]
+
+    def batch(self) -> WriteBatch:
+        return MemoryWriteBatch(self)
+
+    def run_transaction(self, fn: Callable[[Transaction], Any], max_attempts: int = 5) -> Any:
+        with self._lock:
+            transaction = MemoryTransaction(self)
+            result = fn(transaction)
+            self._count('commit')
+            self._apply(transaction._writes)
+            return result
+
+    def watch(self, collection, callback) -> Callable[[], None]:
+        with self._lock:
+            self._watchers.setdefault(collection, []).append(callback)
+            snapshots = self._collection_snapshots(collection)
+        callback(snapshots)  # Initial snapshot, like on_snapshot
+
+        def unsubscribe():
+            with self._lock:
+                watchers = self._watchers.get(collection, [])
+                if callback in watchers:
+                    watchers.remove(callback)
+
+        return unsubscribe
+
+    def seed(self, collection: str, documents: Dict[str, Dict[str, Any]]) -> None:
+        """Load documents directly (not counted in stats)"""
+        with self._lock:
+            now = self._next_time()
+            docs = self._collections.setdefault(collection, {})
+            for doc_id, data in documents.items():
+                docs[doc_id] = (copy.deepcopy(data), now)
+
+    def _collection_snapshots(self, collection: str) -> List[Snapshot]:
+        return [
+            Snapshot(collection, doc_id, copy.deepcopy(data), update_time)
+            for doc_id, (data, update_time) in self._collections.get(collection, {}).items()
+        ]
+
+    def _next_time(self) -> datetime:
+        """Strictly increasing update times"""
+        now = datetime.now(timezone.utc)
+        if now <= self._last_time:
+            now = self._last_time + timedelta(microseconds=1)
+        self._last_time = now
+        return now
+
+    def _apply(self, writes: List[_Write]) -> None:
+        """Validate and apply writes atomically, then notify watchers"""
+        if not writes:
+            return
+
+        with self._lock:
+            now = self._next_time()
+            staged: Dict[DocKey, Optional[Dict[str, Any]]] = {}
+
+            def current(key):
+                if key in staged:
+                    return staged[key]
+                entry = self._collections.get(key[0], {}).get(key[1])
+                return copy.deepcopy(entry[0]) if entry else None
+
+            for write in writes:
+                existing = current(write.key)
+                if write.last_update_time is not None:
+                    entry = self._collections.get(write.key[0], {}).get(write.key[1])
+                    if entry is None or entry[1] != write.last_update_time:
+                        raise exceptions.FailedPrecondition(
+                            f"{write.key[0]}/{write.key[1]} changed since last read"
+                        )
+
+                if write.kind == 'delete':
+                    staged[write.key] = None
+                elif write.kind == 'update':
+                    if existing is None:
+                        raise exceptions.NotFound(f"No document to update: {write.key[0]}/{write.key[1]}")
+                    for field_path, value in write.data.items():
+                        self._write_field(existing, _split(field_path), value, now)
+                    staged[write.key] = existing
+                else:
+                    base = existing if (write.merge and existing is not None) else {}
+                    self._merge_into(base, write.data, now, merge=write.merge)
+                    staged[write.key] = base
+
+            self.stats['documents_written'] += len(staged)
+            for (collection, doc_id), data in staged.items():
+                docs = self._collections.setdefault(collection, {})
+                if data is None:
+                    docs.pop(doc_id, None)
+                else:
+                    docs[doc_id] = (data, now)
+
+            notify = [
+                (callback, self._collection_snapshots(collection))
+                for collection in {key[0] for key in staged}
+                for callback in list(self._watchers.get(collection, []))
+            ]
+
+        for callback, snapshots in notify:
+            callback(snapshots)
+
+    def _merge_into(self, target: Dict[str, Any], data: Dict[str, Any], now, merge: bool) -> None:
+        """Write a set() payload; with merge, nested maps merge field by field"""
+        for key, value in data.items():
+            if merge and isinstance(value, dict) and value:
+                child = target.get(key)
+                if not isinstance(child, dict):
+                    child = target[key] = {}
+                self._merge_into(child, value, now, merge)
+            else:
+                self._write_field(target, [key], value, now)
+
+    def _write_field(self, target: Dict[str, Any], parts: List[str], value: Any, now) -> None:
+        """Write one field, resolving Firestore sentinels"""
+        if value is transforms.DELETE_FIELD:
+            _delete_path(target, parts)
+            return
+
+        current = _get_path(target, parts)
+        _set_path(target, parts, self._resolve(value, current, now))
+
+    def _resolve(self, value: Any, current: Any, now) -> Any:
+        if value is transforms.SERVER_TIMESTAMP:
+            return now
+        if isinstance(value, transforms.Increment):
+            base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+            return base + value.value
+        if isinstance(value, transforms.Maximum):
+            return value.value if not isinstance(current, (int, float)) else max(current, value.value)
+        if isinstance(value, transforms.Minimum):
+            return value.value if not isinstance(current, (int, float)) else min(current, value.value)
+        if isinstance(value, transforms.ArrayUnion):
+            items = list(current) if isinstance(current, list) else []
+            for item in value.values:
+                if not any(_equal(item, existing) for existing in items):
+                    items.append(item)
+            return items
+        if isinstance(value, transforms.ArrayRemove):
+            items = list(current) if isinstance(current, list) else []
+            return [item for item in items if not any(_equal(item, r) for r in value.values)]
+        if isinstance(value, dict):
+            return {
+                key: self._resolve(
+                    child, current.get(key, _MISSING) if isinstance(current, dict) else _MISSING, now
+                )
+                for key, child in value.items()
+                if child is not transforms.DELETE_FIELD
+            }
+        return value
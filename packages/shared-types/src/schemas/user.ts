@@ -82,7 +82,11 @@ export const UserSchema = z.object({
   emailVerified: z.boolean().default(false),
   profile: UserProfileSchema,
 
-  // Multi-tenant memberships
+  // Multi-tenant memberships, keyed by tenantId
+  tenantMemberships: z.record(z.string(), TenantMemberSchema).default({}),
+  membershipsMigrated: z.boolean().default(false),
+
+  // Legacy membership array (deprecated, superseded by tenantMemberships)
   tenants: z.array(TenantMemberSchema).default([]),
 
   // Platform-level status